@@ -6,4 +6,6 @@ class AccountsConfig(AppConfig):
     name = 'accounts'
 
     def ready(self):
-        import accounts.signals
\ No newline at end of file
+        import accounts.signals
+        # Connects the statistics cache invalidation in every process
+        import accounts.utils
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""
+Data provider for the admin dashboard
+"""
+from django.db.models import Count, F, Func, Max, Q, Subquery
+
+from crm.pagination import paginate_keyset
+from customer.models import Customer
+from product.models import Order
+
+
+def get_dashboard_counts():
+    """
+    Get the dashboard card counts with a single conditional-aggregate query
+    """
+    # SELECT COUNT(id) FROM customer without a GROUP BY, usable as a scalar subquery
+    customer_count = Customer.objects.order_by().annotate(
+        count=Func(F('id'), function='COUNT')
+    ).values('count')
+
+    counts = Order.objects.aggregate(
+        total_orders=Count('id'),
+        pending_orders=Count('id', filter=Q(status='pending')),
+        total_customers=Max(Subquery(customer_count)),
+    )
+
+    # An aggregate over zero orders yields NULL for the subquery column
+    if counts['total_customers'] is None:
+        counts['total_customers'] = Customer.objects.count()
+
+    return counts
+
+
+def get_recent_orders(queryset=None, cursor=None, limit=None, direction='next'):
+    """
+    Get one keyset page of recent orders with customer and product joined in
+    """
+    if queryset is None:
+        queryset = Order.objects.all()
+
+    queryset = queryset.select_related('customer', 'product').only(
+        'id', 'status', 'created_at',
+        'customer__id', 'customer__name',
+        'product__id', 'product__name',
+    )
+
+    return paginate_keyset(queryset, cursor=cursor, limit=limit, direction=direction)
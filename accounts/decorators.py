@@ -1,6 +1,8 @@
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import redirect
 
+from .roles import has_role
+
 def unauthorized_user(view_func):
   def wrapper_func(request, *args, **kwargs):
     if request.user.is_authenticated:
@@ -12,12 +14,9 @@ def unauthorized_user(view_func):
 def allowed_user(allowed_roles=[]):
   def decorator(view_func):
     def wrapper_func(request, *args, **kwargs):
-      group = ''
-      if request.user.groups.exists():
-        group = request.user.groups.all()[0].name
-      if group in allowed_roles:
+      if has_role(request.user, allowed_roles):
         return view_func(request, *args, **kwargs)
-      else: 
+      else:
         return HttpResponse('You are not authorized to access this page')
     return wrapper_func
   return decorator
@@ -25,13 +24,21 @@ def allowed_user(allowed_roles=[]):
 
 def admin_only(view_func):
   def wrapper_func(request, *args, **kwargs):
-    group = None
-    if request.user.groups.exists():
-      group = request.user.groups.all()[0].name
-
-    if group == 'admin':
+    if has_role(request.user, 'admin'):
       return view_func(request, *args, **kwargs)
     else:
       return redirect('user')
-    
-  return wrapper_func
\ No newline at end of file
+
+  return wrapper_func
+
+
+def admin_api(view_func):
+  # API views answer with a JSON status instead of redirecting to the login page
+  def wrapper_func(request, *args, **kwargs):
+    if not request.user.is_authenticated:
+      return JsonResponse({'error': 'Authentication required'}, status=401)
+    if not has_role(request.user, 'admin'):
+      return JsonResponse({'error': 'Admin role required'}, status=403)
+    return view_func(request, *args, **kwargs)
+
+  return wrapper_func
@@ -1,8 +1,35 @@
 import django_filters
-from product.models import Order
+from django import forms
+from django.urls import reverse_lazy
+from django_filters.widgets import RangeWidget
+from customer.models import Customer
+from product.models import Order, Product
+
+
+def lookup_input(url_name, options_id):
+  # Plain text input holding the pk; choices come from the lookup endpoint,
+  # so rendering the form never loads the whole related table
+  return forms.TextInput(attrs={
+    'list': options_id,
+    'data-lookup-url': reverse_lazy(url_name),
+    'autocomplete': 'off',
+  })
 
 
 class OrderFilter(django_filters.FilterSet):
+  created_at = django_filters.DateFromToRangeFilter(
+    label='Date',
+    widget=RangeWidget(attrs={'type': 'date'}),
+  )
+  customer = django_filters.ModelChoiceFilter(
+    queryset=Customer.objects.all(),
+    widget=lookup_input('customer_lookup', 'customer-options'),
+  )
+  product = django_filters.ModelChoiceFilter(
+    queryset=Product.objects.all(),
+    widget=lookup_input('product_lookup', 'product-options'),
+  )
+
   class Meta:
     model = Order
-    fields = '__all__'
\ No newline at end of file
+    fields = ['status', 'created_at', 'customer', 'product']
@@ -0,0 +1,56 @@
+"""
+Management command to deactivate users who have not logged in for a while
+"""
+from django.core.management.base import BaseCommand
+from accounts.utils import cleanup_inactive_users
+import time
+
+class Command(BaseCommand):
+    help = (
+        'Deactivate users whose last login is older than --days. Users are updated '
+        'in small committed batches, so the job can run while people are logging in.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=90,
+            help='Days since the last login (default: 90)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of users updated per transaction (default: 1000)'
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.1,
+            help='Seconds to sleep between batches (default: 0.1)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            started = time.monotonic()
+            count = cleanup_inactive_users(
+                days_inactive=options['days'],
+                batch_size=options['batch_size'],
+                pause=options['pause'],
+                progress=self.report,
+            )
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Successfully deactivated {count} users in {time.monotonic() - started:.1f}s'
+                )
+            )
+
+        except Exception as e:
+            self.stdout.write(
+                self.style.ERROR(f'Error cleaning up inactive users: {str(e)}')
+            )
+
+    def report(self, count, last_id):
+        self.stdout.write(f'Deactivated {count} users (up to id {last_id})')
@@ -0,0 +1,78 @@
+"""
+Management command to delete expired sessions in batches
+"""
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from crm.config import AppConfig
+from importlib import import_module
+import time
+
+DB_ENGINES = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+)
+
+class Command(BaseCommand):
+    help = (
+        'Delete expired sessions. Database-backed sessions are deleted in small '
+        'committed batches instead of one long DELETE; other engines expire their '
+        'sessions themselves.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=AppConfig.SESSION_CONFIG['PURGE_BATCH_SIZE'],
+            help='Number of sessions deleted per transaction (default: SESSION_CONFIG PURGE_BATCH_SIZE)'
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.05,
+            help='Seconds to sleep between batches (default: 0.05)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            started = time.monotonic()
+
+            if settings.SESSION_ENGINE not in DB_ENGINES:
+                import_module(settings.SESSION_ENGINE).SessionStore.clear_expired()
+                self.stdout.write(
+                    self.style.SUCCESS(f'Nothing to purge: {settings.SESSION_ENGINE} expires sessions itself')
+                )
+                return
+
+            deleted = self.purge(options['batch_size'], options['pause'])
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Successfully purged {deleted} expired sessions in {time.monotonic() - started:.1f}s'
+                )
+            )
+
+        except Exception as e:
+            self.stdout.write(
+                self.style.ERROR(f'Error purging sessions: {str(e)}')
+            )
+
+    def purge(self, batch_size, pause):
+        """Delete sessions that expired before now, batch by batch"""
+        expired = Session.objects.filter(expire_date__lt=timezone.now())
+        deleted = 0
+        while True:
+            keys = list(expired.values_list('session_key', flat=True)[:batch_size])
+            if not keys:
+                return deleted
+
+            with transaction.atomic():
+                count, _ = Session.objects.filter(session_key__in=keys).delete()
+            deleted += count
+            self.stdout.write(f'Purged {deleted} sessions')
+
+            if pause:
+                time.sleep(pause)
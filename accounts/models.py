@@ -1 +1,10 @@
 from django.db import models
+
+class LoginFailureCounter(models.Model):
+  # Failed login counts for deployments without a shared cache, see accounts.throttle
+  key = models.CharField(max_length=100, unique=True)
+  count = models.PositiveIntegerField(default=0)
+  expires_at = models.DateTimeField(db_index=True)
+
+  def __str__(self):
+    return f'{self.key}: {self.count}'
@@ -0,0 +1,160 @@
+"""
+Account creation: single registrations and bulk imports
+
+Every account is a User in the ``customer`` group with a Customer profile.
+Registrations create all three in one transaction; imports do the same for
+whole batches with ``bulk_create``, so they bypass the signals and keep the
+derived customer data up to date themselves.
+
+Password hashing is deliberately slow and dominates the cost of an import, so
+PasswordHasherPool spreads it over worker processes, one per available core.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from crm.cache import invalidate_stats
+from crm.config import AppConfig
+from customer.models import Customer
+from customer.rollups import record_new_customers
+
+from .roles import get_group_id
+
+CUSTOMER_GROUP = 'customer'
+DEFAULT_IMPORT_SOURCE = 'import'
+
+Membership = User.groups.through
+
+# Below this many passwords per worker, hashing in-process is cheaper
+MIN_PASSWORDS_PER_WORKER = 4
+
+
+def available_cores():
+    """
+    Get the number of cores this process may run on
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _init_hash_worker():
+    # Workers started with spawn rather than fork have to load the settings
+    django.setup()
+
+
+class PasswordHasherPool:
+    """
+    Hash passwords with ``make_password`` across a pool of worker processes.
+
+    Use as a context manager so the workers are started once for a whole
+    import. Workers only hash; they never touch the database.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or AppConfig.SECURITY_CONFIG['PASSWORD_HASH_WORKERS'] or available_cores()
+        self.executor = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            self.executor = ProcessPoolExecutor(self.workers, initializer=_init_hash_worker)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.executor:
+            self.executor.shutdown()
+            self.executor = None
+
+    def hash(self, passwords):
+        """
+        Hash raw passwords, keeping their order; empty ones become unusable
+        """
+        hashed = [None if password else make_password(None) for password in passwords]
+        pending = [i for i, password in enumerate(passwords) if password]
+        raw = [passwords[i] for i in pending]
+
+        if not self.executor or len(raw) < self.workers * MIN_PASSWORDS_PER_WORKER:
+            results = map(make_password, raw)
+        else:
+            chunksize = max(1, len(raw) // (self.workers * 4))
+            results = self.executor.map(make_password, raw, chunksize=chunksize)
+
+        for i, encoded in zip(pending, results):
+            hashed[i] = encoded
+        return hashed
+
+
+def create_customer_profile(user):
+    """
+    Put a new user in the customer group and give them a Customer profile
+    """
+    with transaction.atomic():
+        # A brand new user has no cached roles, so m2m_changed is not needed
+        Membership.objects.create(user_id=user.pk, group_id=get_group_id(CUSTOMER_GROUP))
+        Customer.objects.create(user=user, name=user.username)
+
+
+def register_user(form):
+    """
+    Save a valid user creation form together with the user's group membership
+    and Customer profile, or nothing at all
+    """
+    with transaction.atomic():
+        return form.save()
+
+
+def import_users(rows, source=DEFAULT_IMPORT_SOURCE, hasher=None):
+    """
+    Create one batch of users with memberships and customer profiles.
+
+    ``rows`` are dicts with ``username`` and optional ``email``, ``password``,
+    ``name`` and ``phone``; rows without a password get an unusable one.
+    Passwords are hashed by ``hasher``, a PasswordHasherPool, or in-process.
+    Usernames that already exist, or repeat within the batch, are skipped.
+    Returns the created users and the skipped rows.
+    """
+    usernames = {row['username'] for row in rows}
+    taken = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+
+    users, profiles, skipped = [], [], []
+    for row in rows:
+        if row['username'] in taken:
+            skipped.append(row)
+            continue
+        taken.add(row['username'])
+        users.append(User(username=row['username'], email=row.get('email') or ''))
+        profiles.append(row)
+
+    if not users:
+        return [], skipped
+
+    passwords = [row.get('password') for row in profiles]
+    hashed = hasher.hash(passwords) if hasher else PasswordHasherPool(workers=1).hash(passwords)
+    for user, password in zip(users, hashed):
+        user.password = password
+
+    group_id = get_group_id(CUSTOMER_GROUP)
+    with transaction.atomic():
+        User.objects.bulk_create(users)
+        Membership.objects.bulk_create([
+            Membership(user_id=user.pk, group_id=group_id) for user in users
+        ])
+        customers = Customer.objects.bulk_create([
+            Customer(
+                user_id=user.pk,
+                name=row.get('name') or user.username,
+                phone=row.get('phone') or None,
+                source=source,
+            )
+            for user, row in zip(users, profiles)
+        ])
+        # bulk_create sends no post_save signals
+        record_new_customers(customers)
+
+    invalidate_stats('auth.User', 'customer.Customer')
+    return users, skipped
@@ -0,0 +1,82 @@
+"""
+Role resolution for the permission decorators
+
+A user's roles are the names of all their groups. They are resolved once and
+kept on the user object for the rest of the request. When the cache backend
+is shared by all workers they are also stored there under versioned keys, so
+the decorators normally run without queries. A process-local cache would miss
+the version bumps made in other workers and keep serving revoked roles, so
+there roles and group ids are read from the database on every request.
+"""
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+
+from crm.cache import bump_version, cache_is_shared, get_versions
+
+ROLE_CACHE_TIMEOUT = 60 * 60
+GLOBAL_VERSION_KEY = 'accounts:roles:version'
+USER_VERSION_KEY = 'accounts:roles:version:%s'
+GROUP_ID_KEY = 'accounts:group_id:%s:%s'
+
+
+def bump_role_version(user_id=None):
+    """
+    Invalidate cached roles for one user, or for everybody if no id is given
+    """
+    bump_version(GLOBAL_VERSION_KEY if user_id is None else USER_VERSION_KEY % user_id)
+
+
+def get_user_roles(user):
+    """
+    Get the set of group names for a user
+    """
+    if not user.is_authenticated:
+        return frozenset()
+
+    roles = getattr(user, '_role_cache', None)
+    if roles is not None:
+        return roles
+
+    if not cache_is_shared():
+        roles = user._role_cache = frozenset(user.groups.values_list('name', flat=True))
+        return roles
+
+    global_version, user_version = get_versions([GLOBAL_VERSION_KEY, USER_VERSION_KEY % user.pk])
+    key = 'accounts:roles:%s:%s:%s' % (global_version, user.pk, user_version)
+    roles = cache.get(key)
+    if roles is None:
+        roles = frozenset(user.groups.values_list('name', flat=True))
+        cache.set(key, roles, ROLE_CACHE_TIMEOUT)
+
+    user._role_cache = roles
+    return roles
+
+
+def has_role(user, allowed_roles):
+    """
+    Check whether a user holds any of the allowed roles
+    """
+    if isinstance(allowed_roles, str):
+        allowed_roles = [allowed_roles]
+    return not get_user_roles(user).isdisjoint(allowed_roles)
+
+
+def get_group_id(name):
+    """
+    Get the id of a group by name, creating the group if needed.
+
+    The id is cached under the global role version, which every group save or
+    delete bumps, so a recreated group is never served with a stale id.
+    """
+    if not cache_is_shared():
+        return Group.objects.get_or_create(name=name)[0].pk
+
+    version, = get_versions([GLOBAL_VERSION_KEY])
+    key = GROUP_ID_KEY % (version, name)
+    group_id = cache.get(key)
+    if group_id is None:
+        group_id = Group.objects.get_or_create(name=name)[0].pk
+        # get_or_create may have bumped the version by creating the group
+        version, = get_versions([GLOBAL_VERSION_KEY])
+        cache.set(GROUP_ID_KEY % (version, name), group_id, ROLE_CACHE_TIMEOUT)
+    return group_id
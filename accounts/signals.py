@@ -1,15 +1,33 @@
 from django.contrib.auth.models import User, Group
-from django.db.models.signals import post_save
-from customer.models import Customer
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from .provisioning import create_customer_profile
+from .roles import bump_role_version
 
 def customer_profile(sender, instance, created, **kwargs):
   if created:
-    group = Group.objects.get(name='customer')
-    instance.groups.add(group)
+    create_customer_profile(instance)
 
-    Customer.objects.create(
-      user=instance,
-      name=instance.username,
-    )
+post_save.connect(customer_profile, sender=User)
 
-post_save.connect(customer_profile, sender=User)
\ No newline at end of file
+
+def user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+  if action not in ('post_add', 'post_remove', 'post_clear'):
+    return
+
+  if not reverse:
+    bump_role_version(instance.pk)
+  elif pk_set:
+    for user_id in pk_set:
+      bump_role_version(user_id)
+  else:
+    # group.user_set.clear() does not tell us which users were affected
+    bump_role_version()
+
+m2m_changed.connect(user_groups_changed, sender=User.groups.through)
+
+
+def group_changed(sender, instance, **kwargs):
+  bump_role_version()
+
+post_save.connect(group_changed, sender=Group)
+post_delete.connect(group_changed, sender=Group)
\ No newline at end of file
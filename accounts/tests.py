@@ -1,3 +1,409 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
 from django.test import TestCase
+from django.contrib.auth.hashers import check_password, is_password_usable
+from django.contrib.auth.models import AnonymousUser, User, Group
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from crm.config import AppConfig
+from customer.models import Customer
+from product.models import Order, Product
+from customer.rollups import get_daily_signups
+
+from .dashboard import get_dashboard_counts, get_recent_orders
+from .filters import OrderFilter
+from .forms import CreateUserForm
+from .models import LoginFailureCounter
+from .provisioning import PasswordHasherPool, import_users, register_user
+from .roles import get_group_id, get_user_roles, has_role
+from .utils import cleanup_inactive_users, get_user_statistics
+
+SECURITY_CONFIG = AppConfig.SECURITY_CONFIG
+
+
+class RoleResolutionTestCase(TestCase):
+    """Test case for cached role resolution"""
+
+    def setUp(self):
+        """Set up groups and a user"""
+        cache.clear()
+        self.customer_group = Group.objects.create(name='customer')
+        self.admin_group = Group.objects.create(name='admin')
+        self.user = User.objects.create_user(username='alice', password='secret-pass-1')
+
+    def fresh_user(self):
+        return User.objects.get(pk=self.user.pk)
+
+    def test_all_groups_are_roles(self):
+        """Every group counts, not just the first one"""
+        self.user.groups.add(self.admin_group)
+        roles = get_user_roles(self.fresh_user())
+        self.assertEqual(roles, {'customer', 'admin'})
+        self.assertTrue(has_role(self.fresh_user(), ['admin']))
+        self.assertTrue(has_role(self.fresh_user(), 'customer'))
+
+    @mock.patch('accounts.roles.cache_is_shared', lambda: True)
+    def test_cached_roles_need_no_queries(self):
+        """Roles are served from a shared cache once resolved"""
+        get_user_roles(self.fresh_user())
+        user = self.fresh_user()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_user_roles(user), {'customer'})
+
+    def test_process_local_cache_is_not_trusted(self):
+        """Without a shared cache roles are only kept for the request"""
+        get_user_roles(self.fresh_user())
+        user = self.fresh_user()
+        with self.assertNumQueries(1):
+            self.assertEqual(get_user_roles(user), {'customer'})
+        with self.assertNumQueries(0):
+            self.assertEqual(get_user_roles(user), {'customer'})
+
+    @mock.patch('accounts.roles.cache_is_shared', lambda: True)
+    def test_group_change_invalidates_cache(self):
+        """Adding or removing groups is reflected immediately"""
+        self.assertFalse(has_role(self.fresh_user(), 'admin'))
+
+        self.user.groups.add(self.admin_group)
+        self.assertTrue(has_role(self.fresh_user(), 'admin'))
+
+        self.admin_group.user_set.remove(self.user)
+        self.assertFalse(has_role(self.fresh_user(), 'admin'))
+
+        self.customer_group.user_set.clear()
+        self.assertEqual(get_user_roles(self.fresh_user()), frozenset())
+
+    def test_anonymous_user_has_no_roles(self):
+        """Anonymous users resolve to an empty role set"""
+        with self.assertNumQueries(0):
+            self.assertFalse(has_role(AnonymousUser(), ['admin']))
+
+
+class OrderFilterTestCase(TestCase):
+    """Test case for the dashboard order filter and its lookup endpoints"""
+
+    def setUp(self):
+        """Set up orders for two customers and two products, and an admin"""
+        cache.clear()
+        Group.objects.create(name='customer')
+        self.admin = User.objects.create_user(username='boss', password='secret-pass-1')
+        self.admin.groups.add(Group.objects.create(name='admin'))
+        self.john = Customer.objects.create(name="John Doe", email="john@example.com")
+        self.joan = Customer.objects.create(name="joan Smith", email="joan@example.com")
+        Customer.objects.create(name="Bob Johnson", email="bob@example.com")
+        self.pen = Product.objects.create(name="Pen", price=1.0)
+        self.paper = Product.objects.create(name="Paper", price=2.0)
+        self.first = Order.objects.create(customer=self.john, product=self.pen, status='pending')
+        self.second = Order.objects.create(customer=self.joan, product=self.paper, status='delivered')
+        Order.objects.filter(pk=self.first.pk).update(created_at=timezone.now() - timedelta(days=10))
+
+    def filtered(self, **params):
+        return set(OrderFilter(params, queryset=Order.objects.all()).qs)
+
+    def test_each_field_filters(self):
+        """Status, customer, product and the date range narrow the orders"""
+        self.assertEqual(self.filtered(status='pending'), {self.first})
+        self.assertEqual(self.filtered(customer=str(self.joan.pk)), {self.second})
+        self.assertEqual(self.filtered(product=str(self.pen.pk)), {self.first})
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+        self.assertEqual(self.filtered(created_at_min=since), {self.second})
+
+    def test_lookups_match_name_prefixes(self):
+        """Lookups match the start of the name in any case, in name order"""
+        self.client.force_login(self.admin)
+
+        response = self.client.get(reverse('customer_lookup'), {'q': 'JO'})
+        self.assertEqual([row['name'] for row in response.json()['results']], ['joan Smith', 'John Doe'])
+
+        response = self.client.get(reverse('product_lookup'), {'q': 'pa'})
+        self.assertEqual(response.json()['results'], [{'id': self.paper.pk, 'name': 'Paper'}])
+
+    def test_lookups_need_login(self):
+        """Anonymous visitors are sent to the login page"""
+        self.assertEqual(self.client.get(reverse('customer_lookup'), {'q': 'jo'}).status_code, 302)
+        self.assertEqual(self.client.get(reverse('product_lookup'), {'q': 'p'}).status_code, 302)
+
+
+class DashboardTestCase(TestCase):
+    """Test case for the dashboard counts and its keyset-paged recent orders"""
+
+    def setUp(self):
+        """Set up 25 orders created at the same instant, and an admin"""
+        cache.clear()
+        Group.objects.create(name='customer')
+        self.admin = User.objects.create_user(username='boss', password='secret-pass-1')
+        self.admin.groups.add(Group.objects.create(name='admin'))
+        customer = Customer.objects.create(name="John Doe", email="john@example.com")
+        product = Product.objects.create(name="Pen", price=1.0)
+        Order.objects.bulk_create([
+            Order(customer=customer, product=product, status='pending' if i % 5 else 'delivered')
+            for i in range(25)
+        ])
+        # Equal timestamps leave the id to order the pages
+        Order.objects.update(created_at=timezone.now() - timedelta(days=1))
+        self.expected = list(Order.objects.order_by('-id').values_list('id', flat=True))
+
+    def ids(self, page):
+        return [order.id for order in page['items']]
+
+    def test_counts_in_one_query(self):
+        """Order, pending and customer counts come from a single query"""
+        with self.assertNumQueries(1):
+            counts = get_dashboard_counts()
+        # The admin's profile is a customer too
+        self.assertEqual(counts, {'total_orders': 25, 'pending_orders': 20, 'total_customers': 2})
+
+    def test_counts_without_orders(self):
+        """Customers are still counted when there are no orders"""
+        Order.objects.all().delete()
+        self.assertEqual(
+            get_dashboard_counts(), {'total_orders': 0, 'pending_orders': 0, 'total_customers': 2}
+        )
+
+    def test_recent_orders_both_directions(self):
+        """Cursors page forward and back through orders with the same timestamp"""
+        first = get_recent_orders()
+        second = get_recent_orders(cursor=first['next_cursor'])
+        self.assertEqual(self.ids(first) + self.ids(second), self.expected)
+        self.assertFalse(second['has_next'])
+
+        back = get_recent_orders(cursor=second['prev_cursor'], direction='prev')
+        self.assertEqual(self.ids(back), self.ids(first))
+        self.assertFalse(back['has_prev'])
+
+    def test_recent_orders_join_related_rows(self):
+        """Customer and product names are read without a query per order"""
+        page = get_recent_orders()
+        with self.assertNumQueries(0):
+            [(order.customer.name, order.product.name) for order in page['items']]
+
+    def test_view_follows_cursor(self):
+        """The dashboard shows the page the cursor points to"""
+        self.client.force_login(self.admin)
+        first = self.client.get(reverse('dashboard')).context['page']
+
+        response = self.client.get(reverse('dashboard'), {'cursor': first['next_cursor']})
+        self.assertEqual([order.id for order in response.context['recent_orders']], self.expected[20:])
+
+    def test_view_malformed_cursor(self):
+        """A malformed cursor falls back to the first page"""
+        self.client.force_login(self.admin)
+
+        response = self.client.get(reverse('dashboard'), {'cursor': 'not-a-cursor', 'direction': 'prev'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([order.id for order in response.context['recent_orders']], self.expected[:20])
+
+
+class ProvisioningTestCase(TestCase):
+    """Test case for registration and bulk user import"""
+
+    def setUp(self):
+        """Clear cached group ids"""
+        cache.clear()
+
+    def test_new_user_gets_group_and_customer(self):
+        """Creating a user adds the customer group and a Customer profile"""
+        user = User.objects.create_user(username='bob', password='secret-pass-1')
+        self.assertEqual(get_user_roles(User.objects.get(pk=user.pk)), {'customer'})
+        self.assertEqual(Customer.objects.get(user=user).name, 'bob')
+
+    @mock.patch('accounts.roles.cache_is_shared', lambda: True)
+    def test_group_id_is_cached(self):
+        """With a shared cache only the first registration looks the customer group up"""
+        User.objects.create_user(username='first')
+        group = Group.objects.get(name='customer')
+        with self.assertNumQueries(0):
+            self.assertEqual(get_group_id('customer'), group.pk)
+
+    def test_registration_is_atomic(self):
+        """A failing profile leaves no user behind"""
+        form = CreateUserForm({
+            'username': 'carol', 'email': 'carol@example.com',
+            'password1': 'Secret-pass-123', 'password2': 'Secret-pass-123',
+        })
+        self.assertTrue(form.is_valid())
+        with mock.patch('accounts.provisioning.Customer.objects.create', side_effect=IntegrityError):
+            with self.assertRaises(IntegrityError):
+                register_user(form)
+        self.assertFalse(User.objects.filter(username='carol').exists())
+
+    def test_import_users(self):
+        """Imported users get memberships and profiles; existing names are skipped"""
+        User.objects.create_user(username='dave')
+        users, skipped = import_users([
+            {'username': 'dave'},
+            {'username': 'erin', 'email': 'erin@example.com', 'password': 'Secret-pass-1', 'name': 'Erin E'},
+            {'username': 'frank', 'phone': '0977000000'},
+            {'username': 'frank'},
+        ])
+
+        self.assertEqual([user.username for user in users], ['erin', 'frank'])
+        self.assertEqual([row['username'] for row in skipped], ['dave', 'frank'])
+        erin = User.objects.get(username='erin')
+        self.assertTrue(erin.check_password('Secret-pass-1'))
+        self.assertFalse(User.objects.get(username='frank').has_usable_password())
+        self.assertEqual(get_user_roles(erin), {'customer'})
+        self.assertEqual(erin.customer.name, 'Erin E')
+        self.assertEqual(erin.customer.source, 'import')
+        self.assertEqual(sum(row['count'] for row in get_daily_signups()), 3)
+
+    def test_hasher_pool(self):
+        """Passwords hashed by worker processes verify and keep their order"""
+        passwords = [f'Secret-pass-{i}' for i in range(8)] + ['']
+        with PasswordHasherPool(workers=2) as hasher:
+            hashed = hasher.hash(passwords)
+
+        for password, encoded in zip(passwords[:-1], hashed):
+            self.assertTrue(check_password(password, encoded))
+        self.assertFalse(is_password_usable(hashed[-1]))
+
+
+class LoginThrottleTestCase(TestCase):
+    """Test case for login attempt throttling"""
+
+    def setUp(self):
+        """Set up a user"""
+        cache.clear()
+        Group.objects.create(name='customer')
+        User.objects.create_user(username='alice', password='secret-pass-1')
+        self.url = reverse('login')
+
+    def attempt(self, username, password='wrong', **extra):
+        return self.client.post(self.url, {'username': username, 'password': password}, **extra)
+
+    def test_locked_out_after_max_attempts(self):
+        """Over the limit, attempts are refused without checking the password"""
+        for i in range(SECURITY_CONFIG['MAX_LOGIN_ATTEMPTS']):
+            self.assertEqual(self.attempt('alice').status_code, 200)
+
+        with mock.patch('accounts.views.authenticate') as authenticate:
+            response = self.attempt('Alice', 'secret-pass-1')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        authenticate.assert_not_called()
+
+    def test_success_resets_count(self):
+        """A successful login forgets earlier failures"""
+        for i in range(SECURITY_CONFIG['MAX_LOGIN_ATTEMPTS'] - 1):
+            self.attempt('alice')
+        self.assertEqual(self.attempt('alice', 'secret-pass-1').status_code, 302)
+        self.client.logout()
+
+        self.assertEqual(self.attempt('alice').status_code, 200)
+
+    @mock.patch.dict(SECURITY_CONFIG, {'MAX_LOGIN_ATTEMPTS_PER_IP': 3})
+    def test_ip_limit_spans_usernames(self):
+        """One client cycling through usernames is limited by its IP"""
+        for username in ['a', 'b', 'c']:
+            self.attempt(username)
+        self.assertEqual(self.attempt('d').status_code, 429)
+        self.assertEqual(self.attempt('d', REMOTE_ADDR='198.51.100.7').status_code, 200)
+
+    def test_count_is_shared_by_workers(self):
+        """Without a shared cache every worker still sees the same count"""
+        for i in range(SECURITY_CONFIG['MAX_LOGIN_ATTEMPTS']):
+            self.attempt('alice')
+            # Each attempt lands on a worker with its own empty cache
+            cache.clear()
+        self.assertEqual(self.attempt('alice').status_code, 429)
+
+
+@mock.patch('accounts.throttle.cache_is_shared', lambda: True)
+class SharedCacheLoginThrottleTestCase(LoginThrottleTestCase):
+    """Test case for login attempt throttling with counters in a shared cache"""
+
+    def test_count_is_shared_by_workers(self):
+        """Counters stay in the cache, which the workers share"""
+        for i in range(SECURITY_CONFIG['MAX_LOGIN_ATTEMPTS']):
+            self.attempt('alice')
+        self.assertEqual(self.attempt('alice').status_code, 429)
+        self.assertFalse(LoginFailureCounter.objects.exists())
+
+
+class PurgeSessionsTestCase(TestCase):
+    """Test case for the purge_sessions command"""
+
+    def test_only_expired_sessions_are_deleted(self):
+        """Expired sessions go in batches, live ones stay"""
+        now = timezone.now()
+        for i in range(5):
+            Session.objects.create(session_key=f'expired{i}', session_data='', expire_date=now - timedelta(hours=1))
+        Session.objects.create(session_key='live', session_data='', expire_date=now + timedelta(hours=1))
+
+        out = StringIO()
+        call_command('purge_sessions', batch_size=2, pause=0, stdout=out)
+
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['live'])
+        self.assertIn('Successfully purged 5 expired sessions', out.getvalue())
+
+
+class CleanupInactiveUsersTestCase(TestCase):
+    """Test case for batched deactivation of inactive users"""
+
+    def setUp(self):
+        """Set up 25 users who last logged in long ago"""
+        cache.clear()
+        import_users([{'username': f'old{i}'} for i in range(25)])
+        self.stale = timezone.now() - timedelta(days=200)
+        User.objects.update(last_login=self.stale)
+
+    def test_deactivates_in_batches(self):
+        """Every stale user is deactivated, one batch at a time"""
+        progress = []
+        self.assertEqual(cleanup_inactive_users(batch_size=10, progress=lambda *args: progress.append(args)), 25)
+        self.assertEqual([count for count, last_id in progress], [10, 20, 25])
+        self.assertFalse(User.objects.filter(is_active=True).exists())
+
+    def test_batches_commit_separately(self):
+        """A failure after the first batch keeps that batch deactivated"""
+        def fail(count, last_id):
+            raise RuntimeError('stop')
+
+        with self.assertRaises(RuntimeError):
+            cleanup_inactive_users(batch_size=10, progress=fail)
+        self.assertEqual(User.objects.filter(is_active=False).count(), 10)
+
+    def test_user_logging_in_meanwhile_is_skipped(self):
+        """A login between reading a batch's ids and updating them is respected"""
+        atomic = transaction.atomic
+
+        def login_then_atomic(*args, **kwargs):
+            User.objects.filter(username='old0').update(last_login=timezone.now())
+            return atomic(*args, **kwargs)
+
+        with mock.patch('accounts.utils.transaction.atomic', side_effect=login_then_atomic):
+            self.assertEqual(cleanup_inactive_users(batch_size=10), 24)
+        self.assertTrue(User.objects.get(username='old0').is_active)
+
+
+@mock.patch('crm.cache.cache_is_shared', lambda: True)
+class UserStatisticsCacheTestCase(TestCase):
+    """Test case for user statistics cached in a shared cache"""
+
+    def setUp(self):
+        """Start from an empty cache"""
+        cache.clear()
+        Group.objects.create(name='customer')
+        User.objects.create_user(username='cached')
+
+    def test_statistics_are_cached(self):
+        """Repeated calls are served from the cache"""
+        get_user_statistics()
+        with self.assertNumQueries(0):
+            stats = get_user_statistics()
+        self.assertEqual(stats['total'], 1)
 
-# Create your tests here.
+    def test_writes_invalidate_statistics(self):
+        """Creating or deleting a user invalidates the cached statistics"""
+        self.assertEqual(get_user_statistics()['total'], 1)
+        user = User.objects.create_user(username='another')
+        self.assertEqual(get_user_statistics()['total'], 2)
+        user.delete()
+        self.assertEqual(get_user_statistics()['total'], 1)
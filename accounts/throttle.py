@@ -0,0 +1,158 @@
+"""
+Login attempt throttling
+
+Failed logins are counted per username and per client IP with a sliding
+window counter: the count for the current fixed window plus the previous
+window's count weighted by how much of it still overlaps the sliding window.
+Checking an attempt costs one read, so requests over the limit are refused
+before any password is hashed.
+
+Counters live in the cache when it is shared by all workers, where
+``cache.add`` and ``cache.incr`` are atomic. A process-local cache would give
+every worker its own count and multiply the real limit by the number of
+workers, so there they are kept in the LoginFailureCounter table instead.
+"""
+import hashlib
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from crm.cache import cache_is_shared
+from crm.config import AppConfig
+
+from .models import LoginFailureCounter
+
+SECURITY_CONFIG = AppConfig.SECURITY_CONFIG
+KEY_PREFIX = 'accounts:login'
+
+
+def _limits():
+    return {
+        'user': SECURITY_CONFIG['MAX_LOGIN_ATTEMPTS'],
+        'ip': SECURITY_CONFIG['MAX_LOGIN_ATTEMPTS_PER_IP'],
+    }
+
+
+def get_client_ip(request):
+    """
+    Get the client address, from X-Forwarded-For only when configured to
+    trust the proxy in front of us
+    """
+    if SECURITY_CONFIG['TRUST_X_FORWARDED_FOR']:
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+        if forwarded:
+            # The last entry was added by our own proxy and cannot be spoofed
+            return forwarded.split(',')[-1].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _identities(request, username):
+    identities = {'ip': get_client_ip(request)}
+    if username:
+        identities['user'] = username.strip().lower()
+    return identities
+
+
+def _keys(scope, identity, now):
+    window = SECURITY_CONFIG['LOCKOUT_DURATION']
+    digest = hashlib.sha256(identity.encode()).hexdigest()[:32]
+    current = int(now // window)
+    return (
+        f'{KEY_PREFIX}:{scope}:{digest}:{current}',
+        f'{KEY_PREFIX}:{scope}:{digest}:{current - 1}',
+    )
+
+
+def _get_counts(keys):
+    if cache_is_shared():
+        return cache.get_many(keys)
+    return dict(LoginFailureCounter.objects.filter(key__in=keys).values_list('key', 'count'))
+
+
+def _increment(key, timeout):
+    if cache_is_shared():
+        cache.add(key, 0, timeout)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Evicted between add and incr
+            cache.set(key, 1, timeout)
+        return
+
+    counters = LoginFailureCounter.objects.filter(key=key)
+    if counters.update(count=F('count') + 1):
+        return
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            LoginFailureCounter.objects.create(key=key, count=1, expires_at=now + timedelta(seconds=timeout))
+    except IntegrityError:
+        # Another worker created the counter first
+        counters.update(count=F('count') + 1)
+    else:
+        # Windows start rarely enough to sweep out the expired counters here
+        LoginFailureCounter.objects.filter(expires_at__lte=now).delete()
+
+
+def _delete(keys):
+    if cache_is_shared():
+        cache.delete_many(keys)
+    else:
+        LoginFailureCounter.objects.filter(key__in=keys).delete()
+
+
+def _estimate(current, previous, now):
+    window = SECURITY_CONFIG['LOCKOUT_DURATION']
+    overlap = 1 - (now % window) / window
+    return current + previous * overlap
+
+
+def login_retry_after(request, username):
+    """
+    Get the number of seconds until a login attempt is allowed again, or 0
+    if the username and client IP are both under their limits
+    """
+    now = time.time()
+    window = SECURITY_CONFIG['LOCKOUT_DURATION']
+    limits = _limits()
+    keys = {
+        scope: _keys(scope, identity, now)
+        for scope, identity in _identities(request, username).items()
+    }
+    counts = _get_counts([key for pair in keys.values() for key in pair])
+
+    retry_after = 0
+    for scope, (current_key, previous_key) in keys.items():
+        current = counts.get(current_key, 0)
+        previous = counts.get(previous_key, 0)
+        if _estimate(current, previous, now) < limits[scope]:
+            continue
+        if current >= limits[scope]:
+            # Blocked until the current window becomes the previous one and decays
+            wait = window - now % window + window * (1 - limits[scope] / current)
+        else:
+            # Blocked until enough of the previous window has slid out
+            wait = (1 - (limits[scope] - current) / previous) * window - now % window
+        retry_after = max(retry_after, int(wait) + 1)
+    return retry_after
+
+
+def record_failed_login(request, username):
+    """
+    Count a failed attempt against the username and the client IP
+    """
+    now = time.time()
+    timeout = 2 * SECURITY_CONFIG['LOCKOUT_DURATION']
+    for scope, identity in _identities(request, username).items():
+        _increment(_keys(scope, identity, now)[0], timeout)
+
+
+def reset_failed_logins(username):
+    """
+    Forget the failed attempts of a username after a successful login
+    """
+    _delete(_keys('user', username.strip().lower(), time.time()))
@@ -1,12 +1,16 @@
 """
 Utility functions for account management
 """
+import time
 from datetime import datetime, timedelta
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
 from django.db.models import Q, Count
 from django.contrib.auth import authenticate
-from .models import Profile
+from crm.cache import invalidate_stats, versioned_stat
 
+@versioned_stat('user_statistics', ['auth.User'])
 def get_user_statistics():
     """
     Get comprehensive user statistics
@@ -206,17 +210,39 @@ def get_user_analytics():
         'total_users': active_users + inactive_users
     }
 
-def cleanup_inactive_users(days_inactive=90):
+def cleanup_inactive_users(days_inactive=90, batch_size=1000, pause=0, progress=None):
     """
-    Mark users as inactive if they haven't logged in for specified days
-    """
-    cutoff_date = datetime.now() - timedelta(days=days_inactive)
-    inactive_users = User.objects.filter(
-        last_login__lt=cutoff_date,
-        is_active=True
-    )
-    
-    count = inactive_users.count()
-    inactive_users.update(is_active=False)
+    Mark users as inactive if they haven't logged in for specified days.
+
+    Users are deactivated in primary key order, ``batch_size`` at a time, each
+    batch in its own short transaction so logins are never blocked for long;
+    ``pause`` seconds are slept between batches. ``progress`` is called with
+    the running total and the last processed id after every batch.
+    """
+    cutoff_date = timezone.now() - timedelta(days=days_inactive)
+    stale = User.objects.filter(last_login__lt=cutoff_date, is_active=True)
+    
+    count = 0
+    last_id = 0
+    while True:
+        ids = list(
+            stale.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        
+        with transaction.atomic():
+            # Re-check the filter: someone may have logged in since the ids were read
+            count += stale.filter(pk__in=ids).update(is_active=False)
+        last_id = ids[-1]
+        
+        if progress:
+            progress(count, last_id)
+        if pause:
+            time.sleep(pause)
+    
+    if count:
+        # update() sends no signals
+        invalidate_stats('auth.User')
     
     return count
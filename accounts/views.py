@@ -1,15 +1,18 @@
 from django.shortcuts import render, redirect
 from .forms import CreateUserForm
 from .filters import OrderFilter
+from .dashboard import get_dashboard_counts, get_recent_orders
+from .provisioning import register_user
+from .throttle import login_retry_after, record_failed_login, reset_failed_logins
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required
 
 from .decorators import unauthorized_user, allowed_user, admin_only
 from django.contrib import messages
 
-from customer.models import Customer
 from product.models import Order
 from customer.forms import CustomerForm
+from customer.ledger import get_customer_ledger
 
 
 @unauthorized_user
@@ -17,11 +20,22 @@ def loginPage(request):
   if request.method == 'POST':
     username = request.POST.get('username')
     password = request.POST.get('password')
+
+    # Refuse over-limit attempts before authenticate spends time hashing
+    retry_after = login_retry_after(request, username)
+    if retry_after:
+      messages.info(request, f'Too many failed login attempts. Try again in {(retry_after + 59) // 60} minutes')
+      response = render(request, 'accounts/login.html', status=429)
+      response['Retry-After'] = str(retry_after)
+      return response
+
     user = authenticate(request, password=password, username=username)
     if user is not None:
+      reset_failed_logins(username)
       login(request, user)
       return redirect('/')
     else: 
+      record_failed_login(request, username)
       messages.info(request, 'Username or password is incorrect')
   
   return render(request, 'accounts/login.html')
@@ -38,7 +52,7 @@ def registerPage(request):
   if request.method == 'POST':
     form = CreateUserForm(request.POST)
     if form.is_valid():
-      form.save()
+      register_user(form)
       username = form.cleaned_data.get('username')
 
       messages.success(request, 'An account for ' + username + ' was created')
@@ -63,20 +77,15 @@ def settingsPage(request):
 
 
 def userPage(request):
-  order = request.user.customer.order_set.all()
+  ledger = get_customer_ledger(request.user.customer)
 
   # price += request.user.product.price
-  total_orders = order.count
-  intransit = order.filter(status='Intransit').count()
-  delivered = order.filter(status='delivered').count()
-  pending = order.filter(status='pending').count()
-  
   context = {
     # 'price':price,
-    'total_orders':total_orders,
-    'intransit':intransit,
-    'delivered':delivered,
-    'pending':pending,
+    'total_orders':ledger.order_count,
+    'intransit':ledger.intransit_count,
+    'delivered':ledger.delivered_count,
+    'pending':ledger.pending_count,
   }
   return render(request, 'accounts/user.html', context)
 
@@ -84,18 +93,22 @@ def userPage(request):
 @login_required(login_url='login')
 @admin_only
 def dashboard(request):
-  order_list = Order.objects.all()
-  total_customers = Customer.objects.all().count()
-  pending_orders = order_list.filter(status='pending').count()
-  total_orders = order_list.count()
-  myFilter = OrderFilter(request.GET, queryset=order_list)
-  order_list = myFilter.qs
+  counts = get_dashboard_counts()
+  myFilter = OrderFilter(request.GET, queryset=Order.objects.all())
+
+  cursor = request.GET.get('cursor')
+  direction = request.GET.get('direction', 'next')
+  try:
+    page = get_recent_orders(myFilter.qs, cursor=cursor, direction=direction)
+  except ValueError:
+    page = get_recent_orders(myFilter.qs)
 
   context = {
-    'pending_orders': pending_orders,
-    'total_orders':total_orders,
-    'total_customers': total_customers,
-    'recent_orders':order_list,
+    'pending_orders': counts['pending_orders'],
+    'total_orders': counts['total_orders'],
+    'total_customers': counts['total_customers'],
+    'recent_orders': page['items'],
+    'page': page,
     'myFilter':myFilter,
   }
   return render(request, 'accounts/dashboard.html', context)
\ No newline at end of file
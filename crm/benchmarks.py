@@ -0,0 +1,335 @@
+"""
+Benchmark suite for views, utility functions and the data processing scripts
+
+Each benchmark is a zero-argument callable run a fixed number of times against
+the configured database (normally filled by ``generate_load_data``). Wall-time
+percentiles and the query count are recorded per benchmark and compared with a
+stored JSON baseline; a benchmark regresses when its p95 grows past the
+threshold or it runs more queries than before.
+
+Each suite is built for the temporary admin made by ``benchmark_user``, which
+is deleted again when the run ends.
+"""
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+from django.db import connection
+from django.db.models.query import QuerySet
+from django.http import StreamingHttpResponse
+from django.test.utils import CaptureQueriesContext
+
+from .config import BASE_DIR
+
+DEFAULT_REPEAT = 20
+# Benchmarks that read whole tables run fewer times
+HEAVY_REPEAT = 3
+DEFAULT_THRESHOLD = 1.25
+# p95 changes smaller than this are noise, whatever the ratio
+MIN_REGRESSION_MS = 2.0
+
+BENCHMARK_USERNAME = 'benchmark-%s'
+
+
+class Benchmark:
+    """A named callable plus how many times to run it"""
+
+    def __init__(self, name, func, repeat=None, heavy=False):
+        self.name = name
+        self.func = func
+        self.repeat = repeat or (HEAVY_REPEAT if heavy else DEFAULT_REPEAT)
+
+
+def _consume(result):
+    # Lazy results must be evaluated inside the timed region
+    if isinstance(result, QuerySet):
+        return list(result)
+    if isinstance(result, StreamingHttpResponse):
+        for _ in result.streaming_content:
+            pass
+    return result
+
+
+def measure(benchmark, repeat=None, warmup=1):
+    """
+    Run a benchmark and return its timings in milliseconds and query count
+    """
+    repeat = repeat or benchmark.repeat
+    for _ in range(warmup):
+        _consume(benchmark.func())
+
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            _consume(benchmark.func())
+            timings.append((time.perf_counter() - started) * 1000)
+        queries = max(queries, len(ctx.captured_queries))
+
+    timings.sort()
+    p95_index = min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))
+    return {
+        'runs': repeat,
+        'p50_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(timings[p95_index], 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'queries': queries,
+    }
+
+
+def run_suite(benchmarks, repeat=None, only=None, log=None):
+    """
+    Measure every benchmark, recording failures instead of stopping
+    """
+    results = {}
+    for benchmark in benchmarks:
+        if only and only not in benchmark.name:
+            continue
+        try:
+            results[benchmark.name] = measure(benchmark, repeat and min(repeat, benchmark.repeat))
+        except Exception as e:
+            results[benchmark.name] = {'error': f'{type(e).__name__}: {e}'}
+        if log:
+            log(benchmark.name, results[benchmark.name])
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, min_regression_ms=MIN_REGRESSION_MS):
+    """
+    List the regressions of ``results`` against ``baseline`` results
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or 'error' in base:
+            continue
+        if 'error' in result:
+            regressions.append(f"{name}: now fails ({result['error']})")
+            continue
+        if result['p95_ms'] > base['p95_ms'] * threshold and result['p95_ms'] - base['p95_ms'] > min_regression_ms:
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {result['p95_ms']}ms")
+        if result['queries'] > base['queries']:
+            regressions.append(f"{name}: queries {base['queries']} -> {result['queries']}")
+    return regressions
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['results']
+
+
+def save_baseline(path, results):
+    data = {
+        'created_at': datetime.now().isoformat(),
+        'database': connection.vendor,
+        'results': results,
+    }
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _get(client, url):
+    response = client.get(url)
+    if response.status_code >= 400:
+        raise AssertionError(f'GET {url} returned {response.status_code}')
+    return response
+
+
+@contextmanager
+def benchmark_user():
+    """
+    Create a temporary admin to run the benchmarks as, and delete it and any
+    role group made for it afterwards
+    """
+    from django.contrib.auth.models import Group, User
+
+    admin, admin_created = Group.objects.get_or_create(name='admin')
+    customer, customer_created = Group.objects.get_or_create(name='customer')
+    # The post_save signal gives every new user a customer profile
+    user = User.objects.create_user(BENCHMARK_USERNAME % uuid.uuid4().hex[:12], password=None)
+    user.groups.add(admin)
+    try:
+        yield user
+    finally:
+        # Deleting the user also deletes its customer profile
+        user.delete()
+        for group, created in [(admin, admin_created), (customer, customer_created)]:
+            if created:
+                group.delete()
+
+
+def view_benchmarks(user):
+    """
+    GET every page and read-only API endpoint of accounts, customer and product
+    as the admin ``user``; login and register pages are fetched anonymously
+    """
+    from django.test import Client
+    from customer.models import Customer
+    from product.models import Order, Product
+
+    client = Client(HTTP_HOST='localhost')
+    client.force_login(user)
+    anonymous = Client(HTTP_HOST='localhost')
+
+    customer = Customer.objects.filter(ledger__order_count__gt=0).order_by('-id').first() or Customer.objects.order_by('-id').first()
+    order = Order.objects.order_by('-id').first()
+    product = Product.objects.order_by('-id').first()
+
+    pages = [
+        ('accounts.dashboard', client, '/'),
+        ('accounts.dashboard_filtered', client, '/?status=pending'),
+        ('accounts.login', anonymous, '/login/'),
+        ('accounts.register', anonymous, '/register/'),
+        ('accounts.user', client, '/user/'),
+        ('accounts.settings', client, '/settings/'),
+        ('product.products', client, '/products/'),
+        ('product.lookup', client, '/products/lookup/?q=Lo'),
+        ('product.status', client, '/status/'),
+        ('product.total_orders', client, '/orders/'),
+        ('product.create_product', client, '/create_product/'),
+        ('customer.customers', client, '/customers/'),
+        ('customer.create_customer', client, '/create_customer/'),
+        ('customer.lookup', client, '/customers/lookup/?q=Jo'),
+        ('customer.api_list', client, '/api/customers/'),
+        ('customer.api_list_cursor', client, '/api/customers/?pagination=cursor'),
+        ('customer.api_search', client, '/api/customers/?search=banda'),
+        ('customer.api_statistics', client, '/api/customers/statistics/'),
+    ]
+    if customer:
+        pages += [
+            ('customer.detail', client, f'/customer/{customer.id}/'),
+            ('customer.api_detail', client, f'/api/customers/{customer.id}/'),
+            ('product.create_order', client, f'/create_order/{customer.id}/'),
+        ]
+    if order:
+        pages += [
+            ('product.update_order', client, f'/update_order/{order.id}/'),
+            ('product.delete_order', client, f'/delete_order/{order.id}/'),
+        ]
+    if product:
+        pages.append(('product.delete_product', client, f'/delete_product/{product.id}/'))
+
+    benchmarks = [
+        Benchmark(f'view:{name}', lambda client=http, url=url: _get(client, url))
+        for name, http, url in pages
+    ]
+    benchmarks.append(Benchmark(
+        'view:customer.api_export', lambda: _get(client, '/api/customers/export/'), heavy=True
+    ))
+    return benchmarks
+
+
+def utils_benchmarks(user):
+    """
+    Call every read-only function of the apps' utils modules
+    """
+    benchmarks = []
+
+    from customer import utils as customer_utils
+    customer_sample = {'name': 'Bench Customer', 'email': 'bench@example.com', 'phone': '0999000111'}
+    benchmarks += [
+        Benchmark('utils:customer.get_customer_statistics', customer_utils.get_customer_statistics.uncached),
+        Benchmark('utils:customer.search_customers', lambda: customer_utils.search_customers('banda')[:50]),
+        Benchmark('utils:customer.get_customer_analytics', customer_utils.get_customer_analytics),
+        Benchmark('utils:customer.validate_customer_data', lambda: customer_utils.validate_customer_data(customer_sample)),
+        Benchmark('utils:customer.validate_customers_bulk', lambda: customer_utils.validate_customers_bulk(
+            [dict(customer_sample, email=f'bench{i}@example.com') for i in range(500)]
+        )),
+        Benchmark('utils:customer.export_customer_data', customer_utils.export_customer_data, heavy=True),
+    ]
+
+    from product import utils as product_utils
+    product_sample = {'name': 'Bench Product', 'price': '9.99', 'quantity': '3'}
+    benchmarks += [
+        Benchmark('utils:product.get_product_statistics', product_utils.get_product_statistics.uncached),
+        Benchmark('utils:product.get_product_choices', product_utils.get_product_choices.uncached),
+        Benchmark('utils:product.get_product_analytics', product_utils.get_product_analytics),
+        Benchmark('utils:product.search_products', lambda: product_utils.search_products('Lo')),
+        Benchmark('utils:product.calculate_order_total', lambda: product_utils.calculate_order_total(
+            [{'quantity': 2, 'price': 9.99}] * 100
+        )),
+        Benchmark('utils:product.validate_product_data', lambda: product_utils.validate_product_data(product_sample)),
+        Benchmark('utils:product.get_low_stock_products', product_utils.get_low_stock_products),
+        Benchmark('utils:product.get_recent_orders', product_utils.get_recent_orders),
+        Benchmark('utils:product.export_product_data', product_utils.export_product_data, heavy=True),
+        Benchmark('utils:product.generate_sales_report', product_utils.generate_sales_report),
+        Benchmark('utils:product.get_status_board', product_utils.get_status_board),
+    ]
+
+    try:
+        from accounts import utils as accounts_utils
+    except ImportError as e:
+        error = str(e)
+
+        def broken():
+            raise ImportError(error)
+
+        return benchmarks + [Benchmark('utils:accounts', broken, repeat=1)]
+
+    benchmarks += [
+        Benchmark('utils:accounts.get_user_statistics', accounts_utils.get_user_statistics.uncached),
+        Benchmark('utils:accounts.search_users', lambda: accounts_utils.search_users('bench')),
+        Benchmark('utils:accounts.validate_user_data', lambda: accounts_utils.validate_user_data(
+            {'username': 'bench-user', 'email': 'bench-user@example.com', 'password': 'Bench-pass-1'}
+        )),
+        Benchmark('utils:accounts.get_user_activity', lambda: accounts_utils.get_user_activity(user.id)),
+        Benchmark('utils:accounts.export_user_data', accounts_utils.export_user_data, heavy=True),
+        Benchmark('utils:accounts.get_user_permissions', lambda: accounts_utils.get_user_permissions(user)),
+        Benchmark('utils:accounts.get_user_analytics', accounts_utils.get_user_analytics),
+    ]
+    return benchmarks
+
+
+def processor_benchmarks(user):
+    """
+    Run the DataProcessor and DataAnalyzer methods on frames loaded once up
+    front; ``user`` is not needed here
+    """
+    scripts = str(BASE_DIR / 'scripts')
+    if scripts not in sys.path:
+        sys.path.insert(0, scripts)
+    from data_loader import load_customers_frame, load_orders_frame, load_products_frame
+    from data_processor import DataAnalyzer, DataProcessor
+
+    customers = load_customers_frame()
+    products = load_products_frame()
+    orders = load_orders_frame()
+    records = customers.head(1000).to_dict('records')
+    processor = DataProcessor()
+    analyzer = DataAnalyzer()
+    output = tempfile.mkdtemp(prefix='crm-bench-')
+
+    return [
+        Benchmark('processor:process_customer_data', lambda: processor.process_customer_data(customers), heavy=True),
+        Benchmark('processor:process_product_data', lambda: processor.process_product_data(products)),
+        Benchmark('processor:process_order_data', lambda: processor.process_order_data(orders), heavy=True),
+        Benchmark('processor:generate_report', processor.generate_report),
+        Benchmark('processor:validate_data', lambda: processor.validate_data(records, ['name', 'email'])),
+        Benchmark('processor:export_to_csv', lambda: processor.export_to_csv(
+            records, os.path.join(output, 'customers.csv')
+        )),
+        Benchmark('processor:export_to_json', lambda: processor.export_to_json(
+            processor.generate_report(), os.path.join(output, 'report.json')
+        )),
+        Benchmark('analyzer:analyze_customer_trends', lambda: analyzer.analyze_customer_trends(customers), heavy=True),
+        Benchmark('analyzer:analyze_sales_patterns', lambda: analyzer.analyze_sales_patterns(orders), heavy=True),
+        Benchmark('analyzer:forecast_series', lambda: analyzer.forecast_series(
+            orders, 'product_id', 'total_amount'
+        ), heavy=True),
+    ]
+
+
+SUITES = {
+    'views': view_benchmarks,
+    'utils': utils_benchmarks,
+    'processor': processor_benchmarks,
+}
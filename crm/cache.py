@@ -0,0 +1,144 @@
+"""
+Versioned caching helpers
+
+Cached values are stored under keys that embed one or more version numbers.
+Invalidating is a matter of bumping a version, which makes every key built
+from it unreachable at once without having to know or delete those keys.
+"""
+import functools
+import time
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache
+from django.db.models.signals import post_delete, post_save
+
+from .config import is_shared_cache
+
+STATS_CACHE_TIMEOUT = 5 * 60
+STATS_LOCK_TIMEOUT = 30
+STATS_WAIT_INTERVAL = 0.05
+STATS_WAIT_STEPS = 20
+
+
+def cache_is_shared(alias=DEFAULT_CACHE_ALIAS):
+    """
+    Check whether every worker process sees the same cache, which state that
+    must agree across workers (versions, counters) depends on
+    """
+    return is_shared_cache(settings.CACHES, alias)
+
+
+def _new_version():
+    # Time based, so a version key lost to eviction never reuses an old value
+    return int(time.time() * 1000)
+
+
+def get_versions(keys):
+    """
+    Get the current value of each version key, creating missing ones
+    """
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _new_version(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_version(key):
+    """
+    Move a version key forward, invalidating every value cached under it
+    """
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), None)
+
+
+def get_or_compute(key, compute, timeout, fallback_key=None):
+    """
+    Get a cached value, computing it in at most one worker at a time.
+
+    When another worker holds the recompute lock the last value stored under
+    ``fallback_key`` is served, or we wait briefly for the fresh one.
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    lock_key = key + ':lock'
+    if cache.add(lock_key, 1, STATS_LOCK_TIMEOUT):
+        try:
+            value = compute()
+            cache.set(key, value, timeout)
+            if fallback_key:
+                cache.set(fallback_key, value, None)
+        finally:
+            cache.delete(lock_key)
+        return value
+
+    if fallback_key:
+        value = cache.get(fallback_key)
+        if value is not None:
+            return value
+
+    for _ in range(STATS_WAIT_STEPS):
+        time.sleep(STATS_WAIT_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+
+    # The lock holder is slow or gone; don't keep the caller waiting any longer
+    return compute()
+
+
+def model_version_key(label):
+    return 'stats:version:%s' % label.lower()
+
+
+def invalidate_stats(*labels):
+    """
+    Invalidate statistics depending on the given models, for writes that send
+    no signals such as ``bulk_create`` and ``QuerySet.update``
+    """
+    for label in labels:
+        bump_version(model_version_key(label))
+
+
+def _bump_model_version(sender, update_fields=None, **kwargs):
+    # Logins save only last_login, which no statistic depends on
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_stats(sender._meta.label)
+
+
+def versioned_stat(name, models, timeout=STATS_CACHE_TIMEOUT):
+    """
+    Cache a zero-argument statistics function until one of ``models`` changes.
+
+    ``models`` are "app_label.ModelName" labels; saving or deleting an instance
+    of any of them bumps its version. The undecorated function stays available
+    as ``.uncached``. Without a shared cache the bumps would not reach other
+    workers, so the function is then computed on every call.
+
+    Receivers are connected when the decorated function's module is imported;
+    apps import those modules in ``AppConfig.ready()``.
+    """
+    version_keys = [model_version_key(label) for label in models]
+    for label in models:
+        post_save.connect(_bump_model_version, sender=label, dispatch_uid=f'stats:{label}:save')
+        post_delete.connect(_bump_model_version, sender=label, dispatch_uid=f'stats:{label}:delete')
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper():
+            if not cache_is_shared():
+                return func()
+            versions = get_versions(version_keys)
+            key = 'stats:%s:%s' % (name, ':'.join(str(version) for version in versions))
+            return get_or_compute(key, func, timeout, fallback_key='stats:%s:latest' % name)
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
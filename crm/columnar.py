@@ -0,0 +1,263 @@
+"""
+Append-only columnar snapshots stored as NumPy arrays
+
+A snapshot is a directory holding one ``.npy`` file per column and a
+``manifest.json`` that records the committed row count, each column's kind and
+the dictionaries of string columns, which are stored as integer codes.
+Readers memory-map the files, so any number of processes share one copy of
+the data through the page cache without touching the database.
+
+Writers append to the files first and publish the new row count by atomically
+replacing the manifest last; readers only ever look at committed rows, and a
+writer that dies mid-append leaves a tail that the next writer cuts off.
+This module has no Django dependency so plain scripts can read snapshots.
+"""
+import io
+import json
+import os
+import shutil
+
+import numpy as np
+
+MANIFEST = 'manifest.json'
+FORMAT_VERSION = 1
+
+KIND_DTYPES = {
+    'int': np.dtype(np.int64),
+    'float': np.dtype(np.float64),
+    'datetime': np.dtype('datetime64[ns]'),
+    'bool': np.dtype(np.bool_),
+    'category': np.dtype(np.int32),
+}
+
+# Stored in place of NULL for kinds without a natural missing value
+NULL_INT = -1
+
+
+def _column_path(path, name):
+    return os.path.join(path, f'{name}.npy')
+
+
+def _read_manifest(path):
+    with open(os.path.join(path, MANIFEST), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_manifest(path, manifest):
+    tmp = os.path.join(path, MANIFEST + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(path, MANIFEST))
+
+
+def _write_header(f, dtype, rows):
+    f.seek(0)
+    np.lib.format.write_array_header_1_0(
+        f, {'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False, 'shape': (rows,)}
+    )
+
+
+def _header_length(dtype, rows):
+    buffer = io.BytesIO()
+    _write_header(buffer, dtype, rows)
+    return buffer.tell()
+
+
+class ColumnarWriter:
+    """
+    Append rows to a snapshot directory, creating it on first use.
+
+    ``schema`` maps column names to kinds: ``int``, ``float``, ``datetime``,
+    ``bool`` or ``category``. Appended data becomes visible to readers only
+    when ``commit`` is called.
+    """
+
+    def __init__(self, path, schema):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        try:
+            self.manifest = _read_manifest(path)
+        except FileNotFoundError:
+            self.manifest = {
+                'version': FORMAT_VERSION,
+                'rows': 0,
+                'columns': dict(schema),
+                'dictionaries': {name: [] for name, kind in schema.items() if kind == 'category'},
+                'meta': {},
+            }
+            for name, kind in schema.items():
+                with open(_column_path(path, name), 'wb') as f:
+                    _write_header(f, KIND_DTYPES[kind], 0)
+            _write_manifest(path, self.manifest)
+
+        if self.manifest['columns'] != dict(schema):
+            raise ValueError(f'Snapshot at {path} has a different schema')
+
+        self.rows = self.manifest['rows']
+        self.lookups = {
+            name: {value: code for code, value in enumerate(values)}
+            for name, values in self.manifest['dictionaries'].items()
+        }
+        for name in self.manifest['columns']:
+            self._truncate(name, self.rows)
+
+    @property
+    def meta(self):
+        """Free-form JSON state kept with the snapshot, e.g. the last exported id"""
+        return self.manifest['meta']
+
+    def _truncate(self, name, rows):
+        # Drop anything a failed writer appended after the last commit
+        dtype = KIND_DTYPES[self.manifest['columns'][name]]
+        path = _column_path(self.path, name)
+        size = rows * dtype.itemsize
+        with open(path, 'r+b') as f:
+            np.lib.format.read_magic(f)
+            shape, _, _ = np.lib.format.read_array_header_1_0(f)
+            offset = f.tell()
+            if shape == (rows,) and os.fstat(f.fileno()).st_size == offset + size:
+                return
+            if offset == _header_length(dtype, rows):
+                # Shrink the header first so readers never see a shape past the end of the file
+                _write_header(f, dtype, rows)
+                f.truncate(offset + size)
+                return
+        self._rewrite(path, dtype, rows)
+
+    def _encode(self, name, values):
+        lookup = self.lookups[name]
+        return np.fromiter(
+            (NULL_INT if value is None else lookup.setdefault(value, len(lookup)) for value in values),
+            dtype=KIND_DTYPES['category'],
+            count=len(values),
+        )
+
+    def append(self, columns):
+        """
+        Append one chunk, given as a mapping of column name to a sequence of
+        values; every column of the schema must be present and equally long
+        """
+        lengths = {len(columns[name]) for name in self.manifest['columns']}
+        if len(lengths) != 1:
+            raise ValueError('All columns of a chunk must have the same length')
+        count = lengths.pop()
+        if not count:
+            return
+
+        for name, kind in self.manifest['columns'].items():
+            if kind == 'category':
+                data = self._encode(name, columns[name])
+            else:
+                data = np.asarray(columns[name], dtype=KIND_DTYPES[kind])
+
+            with open(_column_path(self.path, name), 'ab') as f:
+                f.write(np.ascontiguousarray(data).tobytes())
+        self.rows += count
+
+    def commit(self):
+        """Publish the appended rows to readers"""
+        for name, kind in self.manifest['columns'].items():
+            dtype = KIND_DTYPES[kind]
+            path = _column_path(self.path, name)
+            if _header_length(dtype, self.rows) == _header_length(dtype, self.manifest['rows']):
+                with open(path, 'r+b') as f:
+                    _write_header(f, dtype, self.rows)
+            else:
+                # The shape no longer fits the header padding; rewrite the file
+                self._rewrite(path, dtype, self.rows)
+
+        self.manifest['rows'] = self.rows
+        self.manifest['dictionaries'] = {
+            name: list(lookup) for name, lookup in self.lookups.items()
+        }
+        _write_manifest(self.path, self.manifest)
+
+    def _rewrite(self, path, dtype, rows):
+        tmp = path + '.tmp'
+        remaining = rows * dtype.itemsize
+        with open(path, 'rb') as src, open(tmp, 'wb') as dst:
+            np.lib.format.read_magic(src)
+            np.lib.format.read_array_header_1_0(src)
+            _write_header(dst, dtype, rows)
+            while remaining:
+                block = src.read(min(remaining, 1 << 20))
+                if not block:
+                    raise ValueError(f'{path} is shorter than its committed rows')
+                dst.write(block)
+                remaining -= len(block)
+        os.replace(tmp, path)
+
+
+class ColumnarSnapshot:
+    """
+    Read-only, memory-mapped view of the committed rows of a snapshot
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.manifest = _read_manifest(path)
+        self.rows = self.manifest['rows']
+        self._columns = {}
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def columns(self):
+        return list(self.manifest['columns'])
+
+    @property
+    def meta(self):
+        return self.manifest['meta']
+
+    def kind(self, name):
+        return self.manifest['columns'][name]
+
+    def categories(self, name):
+        """Get the values behind the codes of a category column"""
+        return self.manifest['dictionaries'][name]
+
+    def column(self, name):
+        """
+        Get a column as a memory-mapped array; category columns hold codes,
+        with -1 for NULL
+        """
+        if name not in self._columns:
+            data = np.load(_column_path(self.path, name), mmap_mode='r')
+            self._columns[name] = data[:self.rows]
+        return self._columns[name]
+
+    def to_frame(self, columns=None):
+        """
+        Build a pandas DataFrame over the mapped columns, with categoricals
+        for category columns
+        """
+        import pandas as pd
+
+        data = {}
+        for name in columns or self.columns:
+            values = self.column(name)
+            if self.kind(name) == 'category':
+                values = pd.Categorical.from_codes(values, categories=self.categories(name))
+            data[name] = values
+        return pd.DataFrame(data, copy=False)
+
+
+def replace_snapshot(path, build):
+    """
+    Build a fresh snapshot next to ``path`` with ``build(tmp_path)`` and swap
+    it in; processes that still map the old files keep reading them
+    """
+    tmp = path.rstrip(os.sep) + '.building'
+    shutil.rmtree(tmp, ignore_errors=True)
+    result = build(tmp)
+
+    old = path.rstrip(os.sep) + '.old'
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+    return result
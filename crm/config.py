@@ -7,6 +7,12 @@ from pathlib import Path
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Cache backends whose data lives inside a single process
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
 # Application configuration
 class AppConfig:
     """Application configuration class"""
@@ -53,6 +59,8 @@ class AppConfig:
     API_CONFIG = {
         'DEFAULT_PAGE_SIZE': 10,
         'MAX_PAGE_SIZE': 50,
+        'MAX_BULK_ITEMS': 5000,
+        'BULK_BATCH_SIZE': 500,
         'DEFAULT_RENDERER_CLASSES': [
             'rest_framework.renderers.JSONRenderer',
         ],
@@ -61,6 +69,12 @@ class AppConfig:
         ],
     }
     
+    # Search settings
+    SEARCH_CONFIG = {
+        # Dotted path to a customer search backend; None picks one from the database vendor
+        'CUSTOMER_BACKEND': None,
+    }
+    
     # Security settings
     SECURITY_CONFIG = {
         'PASSWORD_MIN_LENGTH': 8,
@@ -71,6 +85,24 @@ class AppConfig:
         'SESSION_TIMEOUT': 3600,  # 1 hour
         'MAX_LOGIN_ATTEMPTS': 5,
         'LOCKOUT_DURATION': 900,  # 15 minutes
+        # Failed logins from one client IP, across usernames, within LOCKOUT_DURATION
+        'MAX_LOGIN_ATTEMPTS_PER_IP': 50,
+        # Only enable behind a reverse proxy that sets X-Forwarded-For
+        'TRUST_X_FORWARDED_FOR': False,
+        # Processes hashing passwords during bulk imports; None uses every available core
+        'PASSWORD_HASH_WORKERS': None,
+    }
+    
+    # Session settings
+    SESSION_CONFIG = {
+        # 'db', 'cached_db', 'cache' or 'signed_cookies'. 'cached_db' and
+        # 'cache' need a CACHE_CONFIG backend shared by all workers (not
+        # LocMemCache), or a logout in one worker leaves the session alive in
+        # the others; 'cache' also needs it persistent. 'signed_cookies'
+        # stores sessions client-side.
+        'ENGINE': 'db',
+        'CACHE_ALIAS': 'default',
+        'PURGE_BATCH_SIZE': 1000,
     }
     
     # Notification settings
@@ -96,6 +128,21 @@ class AppConfig:
         'TRACK_PAGE_VIEWS': True,
         'TRACK_SEARCH_QUERIES': True,
         'ANALYTICS_RETENTION_DAYS': 90,
+        # Columnar order snapshot read by analytics jobs instead of the database
+        'ORDER_SNAPSHOT_PATH': BASE_DIR / 'snapshots' / 'orders',
+    }
+    
+    # Monitoring settings
+    MONITORING_CONFIG = {
+        # Count and time the SQL of every request (crm.middleware)
+        'SQL_INSTRUMENTATION': True,
+        # A query shape run more often than this in one request is a likely N+1
+        'N_PLUS_ONE_THRESHOLD': 5,
+        # X-SQL-* response headers for staff, when the view already loaded the user
+        'SQL_HEADERS_FOR_STAFF': True,
+        # Request metrics served at /metrics (crm.metrics)
+        'METRICS_ENABLED': True,
+        'METRICS_ALLOWED_IPS': ['127.0.0.1', '::1'],
     }
     
     # Backup settings
@@ -184,8 +231,20 @@ def validate_config(config):
         if sec_config.get('PASSWORD_MIN_LENGTH', 0) < 6:
             errors.append("Password minimum length should be at least 6 characters")
     
+    # Validate session settings
+    if hasattr(config, 'SESSION_CONFIG') and hasattr(config, 'CACHE_CONFIG'):
+        session_config = config.SESSION_CONFIG
+        if session_config.get('ENGINE') in ('cached_db', 'cache') and not is_shared_cache(
+            config.CACHE_CONFIG, session_config.get('CACHE_ALIAS', 'default')
+        ):
+            errors.append("Cached sessions need a cache backend shared by all workers")
+    
     return errors
 
+def is_shared_cache(cache_config, alias='default'):
+    """Check whether a cache alias is shared by all worker processes"""
+    return cache_config[alias]['BACKEND'] not in PROCESS_LOCAL_CACHE_BACKENDS
+
 def get_setting(config, key, default=None):
     """Get a configuration setting with fallback"""
     if hasattr(config, key):
@@ -0,0 +1,240 @@
+"""
+Request metrics in the Prometheus text format
+
+MetricsMiddleware records, per resolved URL name, a latency histogram, a
+response size histogram and response counts by status code, plus the number
+of requests in flight. Every thread writes only to its own shard of counters,
+so recording takes no lock; the ``/metrics`` view sums the shards when it is
+scraped. When a thread exits its shard is folded into a retired total, so
+servers that recycle threads keep a bounded number of shards. Values are per process: with several workers, scrape each one or
+run a single worker behind the endpoint.
+"""
+import threading
+import time
+import weakref
+from collections import defaultdict
+
+from django.http import HttpResponse, HttpResponseForbidden
+
+from .config import AppConfig
+from .middleware import get_view_name, is_staff_request, query_stats
+
+MONITORING_CONFIG = AppConfig.MONITORING_CONFIG
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histogram:
+    """Bucket counts, sum and count of observed values"""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other):
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.sum += other.sum
+        self.count += other.count
+
+
+class _Shard:
+    """Counters written by a single thread"""
+
+    def __init__(self):
+        self.started = 0
+        self.finished = 0
+        self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self.size = defaultdict(lambda: Histogram(SIZE_BUCKETS))
+        self.responses = defaultdict(int)
+
+    def merge(self, other):
+        self.started += other.started
+        self.finished += other.finished
+        # Copy before iterating; the owning thread may add a view meanwhile
+        for view, histogram in list(other.latency.items()):
+            self.latency[view].merge(histogram)
+        for view, histogram in list(other.size.items()):
+            self.size[view].merge(histogram)
+        for key, count in list(other.responses.items()):
+            self.responses[key] += count
+
+
+class _ThreadToken:
+    """Lives in a thread's locals only, so it is released when the thread exits"""
+
+
+class MetricsRegistry:
+    """
+    Per-thread shards of request counters, merged on read
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = set()
+        # Counters of threads that have exited
+        self._retired = _Shard()
+        # Only taken when a thread records its first request or exits, and on scrape
+        self._lock = threading.Lock()
+
+    def shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            self._local.token = token = _ThreadToken()
+            weakref.finalize(token, self._retire, shard)
+            with self._lock:
+                self._shards.add(shard)
+        return shard
+
+    def _retire(self, shard):
+        with self._lock:
+            # Shards dropped by reset() are not counted again
+            if shard in self._shards:
+                self._shards.remove(shard)
+                self._retired.merge(shard)
+
+    def collect(self):
+        """
+        Sum every shard into one set of counters
+        """
+        total = _Shard()
+        with self._lock:
+            total.merge(self._retired)
+            shards = list(self._shards)
+        for shard in shards:
+            total.merge(shard)
+        return total
+
+    def reset(self):
+        with self._lock:
+            self._shards.clear()
+            self._retired = _Shard()
+        # Outside the lock: dropping the old locals runs the retire finalizers
+        self._local = threading.local()
+
+
+registry = MetricsRegistry()
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _histogram_lines(name, histograms):
+    lines = []
+    for view, histogram in sorted(histograms.items()):
+        view = _label(view)
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{view="{view}",le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{view="{view}",le="+Inf"}} {histogram.count}')
+        lines.append(f'{name}_sum{{view="{view}"}} {histogram.sum}')
+        lines.append(f'{name}_count{{view="{view}"}} {histogram.count}')
+    return lines
+
+
+def render_metrics():
+    """
+    Render the current counters in the Prometheus text exposition format
+    """
+    total = registry.collect()
+    lines = [
+        '# HELP crm_http_requests_in_flight Requests currently being handled.',
+        '# TYPE crm_http_requests_in_flight gauge',
+        f'crm_http_requests_in_flight {total.started - total.finished}',
+        '# HELP crm_http_request_duration_seconds Request latency by URL name.',
+        '# TYPE crm_http_request_duration_seconds histogram',
+    ]
+    lines += _histogram_lines('crm_http_request_duration_seconds', total.latency)
+    lines += [
+        '# HELP crm_http_response_size_bytes Response body size by URL name.',
+        '# TYPE crm_http_response_size_bytes histogram',
+    ]
+    lines += _histogram_lines('crm_http_response_size_bytes', total.size)
+    lines += [
+        '# HELP crm_http_responses_total Responses by URL name and status code.',
+        '# TYPE crm_http_responses_total counter',
+    ]
+    for (view, status), count in sorted(total.responses.items()):
+        lines.append(f'crm_http_responses_total{{view="{_label(view)}",status="{status}"}} {count}')
+
+    sql = query_stats.snapshot()
+    if sql:
+        lines += [
+            '# HELP crm_sql_queries_total SQL queries run by URL name.',
+            '# TYPE crm_sql_queries_total counter',
+        ]
+        lines += [f'crm_sql_queries_total{{view="{_label(view)}"}} {stats["queries"]}' for view, stats in sorted(sql.items())]
+        lines += [
+            '# HELP crm_sql_duration_seconds_total Time spent in SQL by URL name.',
+            '# TYPE crm_sql_duration_seconds_total counter',
+        ]
+        lines += [f'crm_sql_duration_seconds_total{{view="{_label(view)}"}} {stats["sql_time"]}' for view, stats in sorted(sql.items())]
+        lines += [
+            '# HELP crm_sql_n_plus_one_requests_total Requests with a likely N+1 query pattern.',
+            '# TYPE crm_sql_n_plus_one_requests_total counter',
+        ]
+        lines += [
+            f'crm_sql_n_plus_one_requests_total{{view="{_label(view)}"}} {stats["n_plus_one_requests"]}'
+            for view, stats in sorted(sql.items())
+        ]
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsMiddleware:
+    """
+    Record latency, response size and status code of every request
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = MONITORING_CONFIG['METRICS_ENABLED']
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        shard = registry.shard()
+        shard.started += 1
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = self.get_response(request)
+            status = response.status_code
+        finally:
+            view_name = get_view_name(request)
+            shard.latency[view_name].observe(time.perf_counter() - started)
+            shard.responses[(view_name, status)] += 1
+            shard.finished += 1
+
+        if not response.streaming:
+            shard.size[view_name].observe(len(response.content))
+        elif response.has_header('Content-Length'):
+            shard.size[view_name].observe(int(response['Content-Length']))
+        return response
+
+
+def metrics_view(request):
+    """
+    Serve the metrics to local scrapers and staff
+    """
+    if request.META.get('REMOTE_ADDR') not in MONITORING_CONFIG['METRICS_ALLOWED_IPS'] and not is_staff_request(request):
+        return HttpResponseForbidden('Metrics are only served to local scrapers')
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
@@ -0,0 +1,178 @@
+"""
+Per-request SQL instrumentation
+
+QueryInstrumentationMiddleware wraps the database connection of each request
+with ``connection.execute_wrapper`` and records the number of queries, the
+time spent in SQL and how often each query shape (the SQL with literals and
+IN lists normalised) ran. A shape executed more than N_PLUS_ONE_THRESHOLD
+times is reported as a likely N+1 pattern. Totals are kept per URL name for
+the lifetime of the process; staff responses also carry them as headers.
+
+Queries run while a streaming response is consumed happen after the
+middleware returns and are not counted.
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter
+
+from django.db import connection
+
+from .config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+MONITORING_CONFIG = AppConfig.MONITORING_CONFIG
+# Flagged shapes kept per URL name
+MAX_TRACKED_SHAPES = 20
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\(\s*(?:(?:%s|\?)\s*,\s*)+(?:%s|\?)\s*\)')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """
+    Reduce a SQL statement to its shape, so statements that differ only in
+    their parameters compare equal
+    """
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _IN_LIST_RE.sub('(...)', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    """
+    Execute wrapper that counts and times the queries of one request
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.shapes[fingerprint(sql)] += 1
+
+    def repeated(self, threshold):
+        """Get the shapes executed more than ``threshold`` times, most frequent first"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+
+class QueryStats:
+    """
+    Per URL name totals shared by all threads of the process
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view_name, recorder, repeated):
+        with self._lock:
+            stats = self._views.get(view_name)
+            if stats is None:
+                stats = self._views[view_name] = {
+                    'requests': 0,
+                    'queries': 0,
+                    'sql_time': 0.0,
+                    'max_queries': 0,
+                    'n_plus_one_requests': 0,
+                    'repeated_shapes': Counter(),
+                }
+            stats['requests'] += 1
+            stats['queries'] += recorder.count
+            stats['sql_time'] += recorder.duration
+            stats['max_queries'] = max(stats['max_queries'], recorder.count)
+            if repeated:
+                stats['n_plus_one_requests'] += 1
+                shapes = stats['repeated_shapes']
+                for shape, count in repeated:
+                    if shape in shapes or len(shapes) < MAX_TRACKED_SHAPES:
+                        shapes[shape] = max(shapes[shape], count)
+
+    def snapshot(self):
+        """
+        Get a copy of the totals with averages, keyed by URL name
+        """
+        with self._lock:
+            views = {
+                name: dict(stats, repeated_shapes=dict(stats['repeated_shapes']))
+                for name, stats in self._views.items()
+            }
+        for stats in views.values():
+            stats['avg_queries'] = stats['queries'] / stats['requests']
+            stats['avg_sql_ms'] = stats['sql_time'] * 1000 / stats['requests']
+        return views
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+query_stats = QueryStats()
+
+
+def get_view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match and match.view_name else '<unresolved>'
+
+
+def is_staff_request(request):
+    """
+    Check whether a request comes from a staff or admin user.
+
+    Only what the view already loaded is consulted, so the check runs no
+    queries of its own after the instrumented part of the request: a request
+    whose user was never resolved, or whose roles were never read, counts as
+    not staff.
+    """
+    user = request.__dict__.get('_cached_user')
+    if user is None or not user.is_authenticated:
+        return False
+    return user.is_staff or 'admin' in getattr(user, '_role_cache', ())
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Record the SQL each request runs and flag likely N+1 patterns
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = MONITORING_CONFIG['SQL_INSTRUMENTATION']
+        self.threshold = MONITORING_CONFIG['N_PLUS_ONE_THRESHOLD']
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+
+        view_name = get_view_name(request)
+        repeated = recorder.repeated(self.threshold)
+        query_stats.record(view_name, recorder, repeated)
+        if repeated:
+            shape, count = repeated[0]
+            logger.warning(
+                f"Possible N+1 in {view_name}: {count} executions of {shape[:200]}"
+            )
+
+        if MONITORING_CONFIG['SQL_HEADERS_FOR_STAFF'] and is_staff_request(request):
+            response['X-SQL-Queries'] = str(recorder.count)
+            response['X-SQL-Time-Ms'] = f'{recorder.duration * 1000:.2f}'
+            response['X-SQL-Max-Repeats'] = str(max(recorder.shapes.values(), default=0))
+            response['X-SQL-N-Plus-One'] = str(len(repeated))
+        return response
@@ -0,0 +1,96 @@
+"""
+Keyset (seek) pagination helpers
+
+Pages are ordered newest first by ``(created_at, id)`` and addressed by an
+opaque cursor holding the position of the boundary row, so fetching any page
+costs one indexed range scan no matter how deep it is.
+"""
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+
+from .config import AppConfig
+
+
+def get_page_size(value=None, config=None):
+    """
+    Clamp a requested page size to the configured default and maximum
+    """
+    config = config or AppConfig.PAGINATION_CONFIG
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return config['DEFAULT_PAGE_SIZE']
+    return max(1, min(size, config['MAX_PAGE_SIZE']))
+
+
+def encode_cursor(created_at, pk):
+    """
+    Encode a (created_at, id) position as an opaque, URL-safe cursor
+    """
+    raw = json.dumps([created_at.isoformat(), pk], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor made by encode_cursor, raising ValueError if it is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(pk)
+    except (TypeError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def _position(row):
+    if isinstance(row, dict):
+        return row['created_at'], row['id']
+    return row.created_at, row.pk
+
+
+def paginate_keyset(queryset, cursor=None, limit=None, direction='next', config=None):
+    """
+    Return one page of ``queryset`` ordered by (-created_at, -id).
+
+    ``direction='next'`` returns the rows after ``cursor`` (older rows),
+    ``direction='prev'`` the rows before it. Works on model and ``values()``
+    querysets; raises ValueError for a malformed cursor. ``limit`` is clamped
+    to ``config`` (PAGINATION_CONFIG by default).
+    """
+    limit = get_page_size(limit, config)
+    backwards = direction == 'prev' and cursor
+    ordering = ('created_at', 'id') if backwards else ('-created_at', '-id')
+
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        if backwards:
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+            )
+        else:
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            )
+
+    # One extra row tells us whether another page exists without a COUNT
+    rows = list(queryset.order_by(*ordering)[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if backwards:
+        rows.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, bool(cursor)
+
+    return {
+        'items': rows,
+        'has_next': has_next and bool(rows),
+        'has_prev': has_prev and bool(rows),
+        'next_cursor': encode_cursor(*_position(rows[-1])) if has_next and rows else None,
+        'prev_cursor': encode_cursor(*_position(rows[0])) if has_prev and rows else None,
+    }
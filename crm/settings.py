@@ -13,6 +13,10 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
+from .config import AppConfig, is_shared_cache
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -47,7 +51,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'crm.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'crm.middleware.QueryInstrumentationMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -89,6 +95,36 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = AppConfig.CACHE_CONFIG
+
+
+# https://docs.djangoproject.com/en/5.2/topics/http/sessions/
+
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+
+SESSION_ENGINE = SESSION_ENGINES[AppConfig.SESSION_CONFIG['ENGINE']]
+
+SESSION_CACHE_ALIAS = AppConfig.SESSION_CONFIG['CACHE_ALIAS']
+
+# Each worker would keep its own copy of the sessions it has seen, so a
+# logout or session change in one worker would not reach the others
+if AppConfig.SESSION_CONFIG['ENGINE'] in ('cached_db', 'cache') and not is_shared_cache(CACHES, SESSION_CACHE_ALIAS):
+    raise ImproperlyConfigured(
+        "SESSION_CONFIG['ENGINE'] %r needs a cache backend shared by all workers, not %s"
+        % (AppConfig.SESSION_CONFIG['ENGINE'], CACHES[SESSION_CACHE_ALIAS]['BACKEND'])
+    )
+
+SESSION_COOKIE_AGE = AppConfig.SECURITY_CONFIG['SESSION_TIMEOUT']
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -0,0 +1,112 @@
+"""
+Tests for the benchmark suite and the run_benchmarks command
+"""
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import Group, User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase, override_settings
+from crm.benchmarks import Benchmark, benchmark_user, compare, measure, run_suite
+from customer.models import Customer
+
+class MeasureTestCase(SimpleTestCase):
+    """Test case for timing benchmarks and comparing them with a baseline"""
+
+    def test_measure(self):
+        """Timings cover every run and the warm-up is not timed"""
+        calls = []
+        result = measure(Benchmark('noop', lambda: calls.append(1), repeat=4))
+
+        self.assertEqual(len(calls), 5)
+        self.assertEqual(result['runs'], 4)
+        self.assertEqual(result['queries'], 0)
+        self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+
+    def test_failures_are_recorded(self):
+        """A failing benchmark is reported without stopping the others"""
+        def broken():
+            raise ValueError('boom')
+
+        results = run_suite([Benchmark('broken', broken), Benchmark('ok', lambda: None, repeat=1)])
+        self.assertEqual(results['broken'], {'error': 'ValueError: boom'})
+        self.assertEqual(results['ok']['runs'], 1)
+
+    def test_compare(self):
+        """Slower p95 past the threshold, more queries and new failures regress"""
+        base = {'p95_ms': 10.0, 'queries': 3}
+        baseline = {'slow': base, 'noise': base, 'queries': base, 'fails': base}
+        results = {
+            'slow': {'p95_ms': 20.0, 'queries': 3},
+            'noise': {'p95_ms': 11.5, 'queries': 3},
+            'queries': {'p95_ms': 10.0, 'queries': 4},
+            'fails': {'error': 'ValueError: boom'},
+            'new': {'p95_ms': 99.0, 'queries': 99},
+        }
+        self.assertEqual(compare(results, baseline), [
+            'slow: p95 10.0ms -> 20.0ms',
+            'queries: queries 3 -> 4',
+            'fails: now fails (ValueError: boom)',
+        ])
+
+class BenchmarkUserTestCase(TestCase):
+    """Test case for the temporary benchmark admin"""
+
+    def test_user_is_removed(self):
+        """The admin and its customer profile only exist during the run"""
+        with benchmark_user() as user:
+            self.assertTrue(user.groups.filter(name='admin').exists())
+            self.assertTrue(Customer.objects.filter(user=user).exists())
+
+        self.assertFalse(User.objects.exists())
+        self.assertFalse(Customer.objects.exists())
+        self.assertFalse(Group.objects.exists())
+
+    def test_existing_groups_are_kept(self):
+        """Role groups that were there before the run stay"""
+        Group.objects.create(name='admin')
+        with self.assertRaises(ValueError), benchmark_user():
+            raise ValueError('benchmark failed')
+
+        self.assertFalse(User.objects.exists())
+        self.assertEqual(list(Group.objects.values_list('name', flat=True)), ['admin'])
+
+@override_settings(ALLOWED_HOSTS=['localhost'])
+class RunBenchmarksCommandTestCase(TestCase):
+    """Test case for the run_benchmarks command"""
+
+    def setUp(self):
+        """Set up generated data and a baseline path"""
+        call_command(
+            'generate_load_data', customers=10, products=3, orders=20, tags=2, stdout=StringIO()
+        )
+        self.baseline = os.path.join(tempfile.mkdtemp(), 'baseline.json')
+
+    def run_benchmarks(self, *args):
+        out = StringIO()
+        call_command(
+            'run_benchmarks', '--suite', 'views', '--suite', 'utils', '--repeat', '1',
+            '--baseline', self.baseline, *args, stdout=out,
+        )
+        return out.getvalue()
+
+    def test_baseline_round_trip(self):
+        """A saved baseline is compared against the next run"""
+        self.run_benchmarks('--update-baseline')
+        with open(self.baseline, encoding='utf-8') as f:
+            results = json.load(f)['results']
+        for name in ['view:customer.api_list', 'view:product.status', 'utils:product.get_status_board']:
+            self.assertEqual(results[name]['runs'], 1, results[name])
+
+        # Queries only regress upwards, so the same data gives no regressions
+        output = self.run_benchmarks('--threshold', '1000')
+        self.assertIn('No regressions', output)
+        self.assertFalse(User.objects.filter(username__startswith='benchmark-').exists())
+
+    def test_missing_baseline_fails(self):
+        """Comparing without a baseline file is an error"""
+        with self.assertRaises(CommandError):
+            self.run_benchmarks()
@@ -0,0 +1,85 @@
+"""
+Tests for the vectorized Holt-Winters forecasting in scripts/
+"""
+import math
+import sys
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+from crm.config import BASE_DIR
+
+SCRIPTS = str(BASE_DIR / 'scripts')
+if SCRIPTS not in sys.path:
+    sys.path.insert(0, SCRIPTS)
+
+import forecasting  # noqa: E402
+from forecasting import daily_matrix, forecast_matrix, holt_winters, select_alpha  # noqa: E402
+
+class HoltWintersTestCase(SimpleTestCase):
+    """Test case for the batched Holt-Winters recursion"""
+
+    def test_matches_hand_computed_series(self):
+        """A short undamped series follows the recursion worked out by hand"""
+        result = holt_winters(
+            [10.0, 12.0, 11.0], horizon=2, alpha=0.5, beta=0.1,
+            damping=1.0, non_negative=False,
+        )
+        # Level 10 and trend 2 to start; level 12.6525 and trend 1.68975 at the end
+        np.testing.assert_allclose(result['fitted'], [[12.0, 12.9, 14.305]])
+        np.testing.assert_allclose(result['mean'], [[14.34225, 16.032]])
+        np.testing.assert_allclose(result['sigma'], [math.sqrt((0.9 ** 2 + 3.305 ** 2) / 2)])
+
+    def test_series_are_fitted_independently(self):
+        """Each row of a batch gets the same fit it would get alone"""
+        rng = np.random.default_rng(0)
+        y = rng.poisson(20, size=(3, 28)).astype(np.float64)
+
+        batch = holt_winters(y, horizon=7, alpha=[0.1, 0.3, 0.5])
+        single = holt_winters(y[1], horizon=7, alpha=0.3)
+        np.testing.assert_allclose(batch['mean'][1], single['mean'][0])
+        self.assertEqual(batch['lower'].shape, (3, 7))
+
+    def test_select_alpha_per_series(self):
+        """One smoothing level is picked for each series"""
+        y = np.vstack([np.full(21, 5.0), np.arange(21, dtype=np.float64)])
+        alphas = select_alpha(y)
+        self.assertEqual(alphas.shape, (2,))
+
+class ForecastMatrixTestCase(SimpleTestCase):
+    """Test case for forecasting a (series x day) matrix"""
+
+    def setUp(self):
+        """Set up 20 days of records for two sources"""
+        days = pd.date_range('2026-01-01', periods=20, freq='D')
+        self.records = pd.DataFrame({
+            'created_at': np.concatenate([days, days[::2]]),
+            'source': ['website'] * 20 + ['referral'] * 10,
+        })
+
+    def test_shapes(self):
+        """One row per series and future day, starting the day after the history"""
+        matrix = daily_matrix(self.records, key_column='source')
+        self.assertEqual(matrix.shape, (2, 20))
+
+        forecast = forecast_matrix(matrix, horizon=5)
+        self.assertEqual(len(forecast), 10)
+        self.assertEqual(list(forecast.columns), ['key', 'date', 'forecast', 'lower', 'upper'])
+        self.assertEqual(sorted(forecast['key'].unique()), ['referral', 'website'])
+        self.assertEqual(forecast['date'].min(), pd.Timestamp('2026-01-21'))
+        self.assertEqual(forecast['date'].max(), pd.Timestamp('2026-01-25'))
+        self.assertTrue((forecast['lower'] <= forecast['upper']).all())
+
+    def test_given_alpha_skips_tuning(self):
+        """An explicit alpha is used as is, without fitting the candidates"""
+        matrix = daily_matrix(self.records, key_column='source')
+        with mock.patch.object(forecasting, 'select_alpha') as select:
+            forecast_matrix(matrix, horizon=5, alpha=0.3)
+        select.assert_not_called()
+
+    def test_empty_matrix(self):
+        """No history gives an empty forecast with the usual columns"""
+        forecast = forecast_matrix(pd.DataFrame())
+        self.assertTrue(forecast.empty)
+        self.assertIn('forecast', forecast.columns)
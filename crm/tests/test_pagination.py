@@ -0,0 +1,103 @@
+"""
+Tests for the keyset pagination helpers
+"""
+import base64
+from datetime import datetime, timedelta, timezone
+
+from django.test import SimpleTestCase, TestCase
+from crm.pagination import decode_cursor, encode_cursor, get_page_size, paginate_keyset
+from product.models import Order
+
+CONFIG = {'DEFAULT_PAGE_SIZE': 5, 'MAX_PAGE_SIZE': 8}
+
+class CursorTestCase(SimpleTestCase):
+    """Test case for cursor encoding and page sizes"""
+
+    def test_round_trip(self):
+        """A cursor decodes to the position it was made from"""
+        created_at = datetime(2026, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+        cursor = encode_cursor(created_at, 42)
+
+        self.assertNotIn('=', cursor)
+        self.assertEqual(decode_cursor(cursor), (created_at, 42))
+
+    def test_malformed_cursors(self):
+        """Anything encode_cursor could not have made is a ValueError"""
+        def encoded(raw):
+            return base64.urlsafe_b64encode(raw.encode()).decode()
+
+        for cursor in ['not-a-cursor', '', encoded('nonsense'), encoded('[1, 2]'),
+                       encoded('["2026-03-01"]'), encoded('["2026-03-01", "x"]'), encoded('{}')]:
+            with self.subTest(cursor=cursor), self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+    def test_page_size(self):
+        """Page sizes are clamped to the configured range"""
+        self.assertEqual(get_page_size(None, CONFIG), 5)
+        self.assertEqual(get_page_size('abc', CONFIG), 5)
+        self.assertEqual(get_page_size('0', CONFIG), 1)
+        self.assertEqual(get_page_size('100', CONFIG), 8)
+
+class PaginateKeysetTestCase(TestCase):
+    """Test case for paging through orders by (created_at, id)"""
+
+    def setUp(self):
+        """Set up 12 orders sharing only three creation times"""
+        Order.objects.bulk_create([Order(status='pending') for _ in range(12)])
+        start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        ids = list(Order.objects.order_by('id').values_list('id', flat=True))
+        # Five orders at one instant, four at the next and three at the last
+        for group, chunk in enumerate([ids[:5], ids[5:9], ids[9:]]):
+            Order.objects.filter(id__in=chunk).update(created_at=start + timedelta(hours=group))
+        self.expected = list(Order.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+    def page(self, cursor=None, direction='next', queryset=None):
+        queryset = Order.objects.all() if queryset is None else queryset
+        return paginate_keyset(queryset, cursor=cursor, limit=5, direction=direction, config=CONFIG)
+
+    def ids(self, page):
+        return [row['id'] if isinstance(row, dict) else row.id for row in page['items']]
+
+    def test_forward_through_ties(self):
+        """Next cursors visit every order once, newest first, across equal timestamps"""
+        pages = [self.page()]
+        while pages[-1]['has_next']:
+            pages.append(self.page(pages[-1]['next_cursor']))
+
+        self.assertEqual([len(page['items']) for page in pages], [5, 5, 2])
+        self.assertEqual([pk for page in pages for pk in self.ids(page)], self.expected)
+        self.assertFalse(pages[0]['has_prev'])
+        self.assertIsNone(pages[0]['prev_cursor'])
+        self.assertIsNone(pages[-1]['next_cursor'])
+
+    def test_backward_round_trip(self):
+        """Prev cursors lead back through the same pages in the same order"""
+        first = self.page()
+        second = self.page(first['next_cursor'])
+        third = self.page(second['next_cursor'])
+
+        back = self.page(third['prev_cursor'], direction='prev')
+        self.assertEqual(self.ids(back), self.ids(second))
+        self.assertTrue(back['has_next'])
+        self.assertEqual(self.ids(self.page(back['next_cursor'])), self.ids(third))
+
+        start = self.page(back['prev_cursor'], direction='prev')
+        self.assertEqual(self.ids(start), self.ids(first))
+        self.assertFalse(start['has_prev'])
+        self.assertIsNone(start['prev_cursor'])
+
+    def test_values_queryset(self):
+        """values() querysets page the same way as model querysets"""
+        queryset = Order.objects.values('id', 'created_at')
+        first = self.page(queryset=queryset)
+        second = self.page(first['next_cursor'], queryset=queryset)
+        self.assertEqual(self.ids(first) + self.ids(second), self.expected[:10])
+
+    def test_prev_without_cursor(self):
+        """Asking for the previous page without a cursor gives the first page"""
+        self.assertEqual(self.ids(self.page(direction='prev')), self.expected[:5])
+
+    def test_malformed_cursor(self):
+        """A malformed cursor raises ValueError before any query runs"""
+        with self.assertNumQueries(0), self.assertRaises(ValueError):
+            self.page('not-a-cursor')
@@ -0,0 +1,108 @@
+"""
+Tests for the typed chunked loader and the data processor in scripts/
+"""
+import sqlite3
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+from crm.config import BASE_DIR
+from customer.models import Customer
+from product.models import Order, Product
+
+SCRIPTS = str(BASE_DIR / 'scripts')
+if SCRIPTS not in sys.path:
+    sys.path.insert(0, SCRIPTS)
+
+from data_loader import frame_from_cursor, load_orders_frame, read_frame  # noqa: E402
+from data_processor import DataAnalyzer, DataProcessor  # noqa: E402
+
+class ReadFrameTestCase(SimpleTestCase):
+    """Test case for building typed frames from chunks of rows"""
+
+    columns = ['id', 'status', 'price', 'amount', 'name', 'active', 'created_at']
+    schema = {
+        'id': 'int', 'status': 'category', 'price': 'money', 'amount': 'float',
+        'name': 'string', 'active': 'bool', 'created_at': 'datetime',
+    }
+
+    def rows(self, count, start=0):
+        created = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        return [
+            (i, ['pending', 'delivered'][i % 2], 9.99, 0.5, f'Row {i}', i % 3 == 0, created)
+            for i in range(start, start + count)
+        ]
+
+    def test_column_types(self):
+        """Each schema kind gets its compact dtype"""
+        frame = read_frame([self.rows(3), self.rows(2, start=3)], self.columns, self.schema)
+
+        self.assertEqual(len(frame), 5)
+        self.assertEqual(frame['id'].dtype, np.int64)
+        self.assertEqual(frame['status'].dtype, 'category')
+        self.assertEqual(frame['price'].dtype, np.float64)
+        self.assertEqual(frame['amount'].dtype, np.float32)
+        self.assertEqual(frame['name'].dtype, 'string')
+        self.assertEqual(frame['active'].dtype, bool)
+        self.assertEqual(frame['created_at'].dtype, 'datetime64[ns]')
+        # Categories found in later chunks keep the codes of earlier ones
+        self.assertEqual(list(frame['status']), ['pending', 'delivered'] * 2 + ['pending'])
+
+    def test_nulls(self):
+        """NULL ids make a nullable column, NULL floats become NaN"""
+        frame = read_frame(
+            [[(1, 2.5), (None, None)]], ['customer_id', 'amount'],
+            {'customer_id': 'int', 'amount': 'float'},
+        )
+        self.assertEqual(str(frame['customer_id'].dtype), 'Int64')
+        self.assertTrue(frame['customer_id'].isna().iloc[1])
+        self.assertTrue(np.isnan(frame['amount'].iloc[1]))
+
+    def test_float_widens_when_float32_loses_precision(self):
+        """A chunk float32 can't hold closely enough widens the whole column"""
+        frame = read_frame([[(0.5,)], [(16777217.25,)]], ['amount'], {'amount': 'float'})
+        self.assertEqual(frame['amount'].dtype, np.float64)
+        self.assertEqual(list(frame['amount']), [0.5, 16777217.25])
+
+    def test_cursor_is_read_in_chunks(self):
+        """Rows are fetched from a DB-API cursor chunk_size at a time"""
+        connection = sqlite3.connect(':memory:')
+        connection.execute('CREATE TABLE t (id INTEGER, status TEXT)')
+        connection.executemany('INSERT INTO t VALUES (?, ?)', [(i, 'pending') for i in range(7)])
+
+        frame = frame_from_cursor(
+            connection.cursor(), 'SELECT id, status FROM t ORDER BY id',
+            schema={'id': 'int', 'status': 'category'}, chunk_size=3,
+        )
+        self.assertEqual(list(frame['id']), list(range(7)))
+        self.assertEqual(frame['status'].dtype, 'category')
+
+class OrderTotalsTestCase(TestCase):
+    """Test case for money totals over loaded orders"""
+
+    def setUp(self):
+        """Set up 21 orders of a 9.99 product"""
+        customer = Customer.objects.create(name="John Doe", email="john@example.com")
+        product = Product.objects.create(name="Pen", price=9.99)
+        Order.objects.bulk_create([
+            Order(customer=customer, product=product, status='pending') for _ in range(21)
+        ])
+
+    def test_totals_are_exact_to_the_cent(self):
+        """Revenue is summed from float64 amounts"""
+        orders = load_orders_frame(chunk_size=5)
+        self.assertEqual(orders['total_amount'].dtype, np.float64)
+
+        report = DataProcessor().process_order_data(orders)
+        self.assertAlmostEqual(report['total_revenue'], 209.79, places=9)
+
+    def test_narrowed_amounts_are_summed_in_float64(self):
+        """A float32 column passed in by a caller is not accumulated in float32"""
+        orders = load_orders_frame()
+        orders['total_amount'] = np.full(len(orders), 0.1, dtype=np.float32)
+        orders = orders.loc[orders.index.repeat(50000)].reset_index(drop=True)
+
+        analysis = DataAnalyzer().analyze_sales_patterns(orders, horizon=1)
+        expected = float(np.float32(0.1)) * len(orders)
+        self.assertAlmostEqual(analysis['total_revenue'], expected, places=3)
@@ -1,22 +1,31 @@
 """
 API endpoints for customer management
 """
-from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.http import require_http_methods
 from django.core.paginator import Paginator
+from django.db import IntegrityError
 import json
+from accounts.decorators import admin_api
+from crm.config import AppConfig
+from crm.pagination import paginate_keyset
 from .models import Customer
-from .utils import get_customer_statistics, search_customers, validate_customer_data, export_customer_data
+from .utils import (
+    get_customer_statistics, search_customers, validate_customer_data,
+    create_customers_bulk, iter_customer_csv, gzip_stream
+)
 
-@csrf_exempt
+@admin_api
 @require_http_methods(["GET"])
 def customer_list_api(request):
     """
     Get paginated list of customers
+
+    Pass ``pagination=cursor`` (or a ``cursor``) for keyset pagination: the
+    response carries opaque ``next``/``prev`` cursors and only includes a
+    ``total_count`` when ``count=true`` is requested.
     """
     try:
-        page = int(request.GET.get('page', 1))
         per_page = int(request.GET.get('per_page', 10))
         search = request.GET.get('search', '')
         
@@ -25,6 +34,10 @@ def customer_list_api(request):
         else:
             customers = Customer.objects.all().order_by('-created_at')
         
+        if request.GET.get('pagination') == 'cursor' or 'cursor' in request.GET:
+            return _customer_cursor_page(request, customers, per_page)
+        
+        page = int(request.GET.get('page', 1))
         paginator = Paginator(customers, per_page)
         customers_page = paginator.get_page(page)
         
@@ -40,7 +53,29 @@ def customer_list_api(request):
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
-@csrf_exempt
+def _customer_cursor_page(request, customers, per_page):
+    try:
+        page = paginate_keyset(
+            customers.values(),
+            cursor=request.GET.get('cursor') or None,
+            limit=per_page,
+            direction=request.GET.get('direction', 'next'),
+            config=AppConfig.API_CONFIG,
+        )
+    except ValueError:
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+    
+    data = {
+        'customers': page['items'],
+        'next': page['next_cursor'],
+        'prev': page['prev_cursor'],
+    }
+    if request.GET.get('count') == 'true':
+        data['total_count'] = customers.count()
+    
+    return JsonResponse(data, safe=False)
+
+@admin_api
 @require_http_methods(["GET"])
 def customer_detail_api(request, customer_id):
     """
@@ -65,7 +100,7 @@ def customer_detail_api(request, customer_id):
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
-@csrf_exempt
+@admin_api
 @require_http_methods(["POST"])
 def create_customer_api(request):
     """
@@ -103,7 +138,43 @@ def create_customer_api(request):
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
-@csrf_exempt
+@admin_api
+@require_http_methods(["POST"])
+def bulk_create_customers_api(request):
+    """
+    Create many customers from a JSON array, with one result per item
+    """
+    try:
+        items = json.loads(request.body)
+        if isinstance(items, dict):
+            items = items.get('customers')
+        
+        if not isinstance(items, list):
+            return JsonResponse({'error': 'Expected a list of customers'}, status=400)
+        
+        max_items = AppConfig.API_CONFIG['MAX_BULK_ITEMS']
+        if len(items) > max_items:
+            return JsonResponse({'error': f'At most {max_items} customers per request'}, status=400)
+        
+        results = create_customers_bulk(items, batch_size=AppConfig.API_CONFIG['BULK_BATCH_SIZE'])
+        created = sum(1 for result in results if result['status'] == 'created')
+        
+        response_data = {
+            'created': created,
+            'failed': len(results) - created,
+            'results': results
+        }
+        
+        return JsonResponse(response_data, status=201 if created else 400)
+    
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    except IntegrityError:
+        return JsonResponse({'error': 'A customer email was taken concurrently, nothing was created'}, status=409)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+@admin_api
 @require_http_methods(["PUT"])
 def update_customer_api(request, customer_id):
     """
@@ -146,7 +217,7 @@ def update_customer_api(request, customer_id):
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
-@csrf_exempt
+@admin_api
 @require_http_methods(["DELETE"])
 def delete_customer_api(request, customer_id):
     """
@@ -163,7 +234,7 @@ def delete_customer_api(request, customer_id):
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
-@csrf_exempt
+@admin_api
 @require_http_methods(["GET"])
 def customer_statistics_api(request):
     """
@@ -176,23 +247,25 @@ def customer_statistics_api(request):
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
-@csrf_exempt
+@admin_api
 @require_http_methods(["GET"])
 def export_customers_api(request):
     """
-    Export customers data
+    Stream customers as CSV; pass ``gzip=true`` for a gzip-compressed file
     """
     try:
         format_type = request.GET.get('format', 'csv')
-        data = export_customer_data(format_type)
+        if format_type != 'csv':
+            return JsonResponse({'error': f'Unsupported export format: {format_type}'}, status=400)
         
-        if data:
-            response = JsonResponse({'data': data})
-            response['Content-Type'] = 'text/csv'
-            response['Content-Disposition'] = 'attachment; filename="customers.csv"'
-            return response
+        chunks = iter_customer_csv()
+        if request.GET.get('gzip') == 'true':
+            response = StreamingHttpResponse(gzip_stream(chunks), content_type='application/gzip')
+            response['Content-Disposition'] = 'attachment; filename="customers.csv.gz"'
         else:
-            return JsonResponse({'error': 'Export failed'}, status=500)
+            response = StreamingHttpResponse(chunks, content_type='text/csv')
+            response['Content-Disposition'] = 'attachment; filename="customers.csv"'
+        return response
     
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
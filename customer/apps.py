@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class CustomerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'customer'
+
+    def ready(self):
+        import customer.signals
+        # Connects the statistics cache invalidation in every process
+        import customer.utils
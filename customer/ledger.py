@@ -0,0 +1,118 @@
+"""
+Denormalized per-customer order ledger
+
+The ledger holds order counts, per-status counts, the lifetime order total and
+the time of the last order for each customer, so pages can show them without
+scanning the customer's orders. New orders are applied with a single UPDATE;
+edits and deletes recompute the affected customer from one aggregate query.
+"""
+from django.db.models import Count, F, FloatField, Max, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from product.models import Order
+from .models import CustomerLedger
+
+STATUS_FIELDS = {
+    'pending': 'pending_count',
+    'Intransit': 'intransit_count',
+    'delivered': 'delivered_count',
+}
+
+LEDGER_FIELDS = ['order_count', 'lifetime_total', 'last_order_at'] + list(STATUS_FIELDS.values())
+
+
+def _ledger_aggregates():
+    aggregates = {
+        'order_count': Count('id'),
+        'lifetime_total': Coalesce(Sum('product__price'), Value(0.0), output_field=FloatField()),
+        'last_order_at': Max('created_at'),
+    }
+    for status, field in STATUS_FIELDS.items():
+        aggregates[field] = Count('id', filter=Q(status=status))
+    return aggregates
+
+
+def get_customer_ledger(customer):
+    """
+    Get a customer's ledger, or an empty unsaved one if they have no orders yet
+    """
+    try:
+        return customer.ledger
+    except CustomerLedger.DoesNotExist:
+        return CustomerLedger(customer=customer)
+
+
+def refresh_customer_ledger(customer_id):
+    """
+    Recompute one customer's ledger from their orders
+    """
+    if customer_id is None:
+        return
+    values = Order.objects.filter(customer_id=customer_id).aggregate(**_ledger_aggregates())
+    CustomerLedger.objects.update_or_create(customer_id=customer_id, defaults=values)
+
+
+def record_new_order(order):
+    """
+    Apply a newly created order to its customer's ledger
+    """
+    if order.customer_id is None:
+        return
+
+    price = order.product.price if order.product_id else None
+    updates = {
+        'order_count': F('order_count') + 1,
+        'lifetime_total': F('lifetime_total') + (price or 0),
+        'last_order_at': Greatest(
+            Coalesce(F('last_order_at'), Value(order.created_at)),
+            Value(order.created_at),
+        ),
+    }
+    if order.status in STATUS_FIELDS:
+        field = STATUS_FIELDS[order.status]
+        updates[field] = F(field) + 1
+
+    if not CustomerLedger.objects.filter(customer_id=order.customer_id).update(**updates):
+        refresh_customer_ledger(order.customer_id)
+
+
+def rebuild_customer_ledgers(customer_ids=None, batch_size=1000):
+    """
+    Rebuild ledgers from one grouped query over orders, written in batches.
+
+    Returns the number of ledgers written.
+    """
+    orders = Order.objects.filter(customer__isnull=False)
+    ledgers = CustomerLedger.objects.all()
+    if customer_ids is not None:
+        orders = orders.filter(customer_id__in=customer_ids)
+        ledgers = ledgers.filter(customer_id__in=customer_ids)
+
+    rows = orders.order_by().values('customer_id').annotate(**_ledger_aggregates())
+
+    written = 0
+    batch = []
+    for row in rows.iterator(chunk_size=batch_size):
+        batch.append(CustomerLedger(**row))
+        if len(batch) >= batch_size:
+            written += _write_ledgers(batch)
+            batch = []
+    if batch:
+        written += _write_ledgers(batch)
+
+    # Customers whose orders are all gone keep a zeroed ledger
+    zeroed = {field: 0 for field in LEDGER_FIELDS}
+    zeroed['last_order_at'] = None
+    ledgers.exclude(customer_id__in=orders.values('customer_id')).update(**zeroed)
+
+    return written
+
+
+def _write_ledgers(batch):
+    CustomerLedger.objects.bulk_create(
+        batch,
+        update_conflicts=True,
+        unique_fields=['customer'],
+        update_fields=LEDGER_FIELDS,
+    )
+    return len(batch)
@@ -2,10 +2,10 @@
 Management command to generate customer reports
 """
 from django.core.management.base import BaseCommand
-from customer.models import Customer
-from customer.utils import get_customer_statistics, get_customer_analytics
-from datetime import datetime, timedelta
+from customer.reports import build_customer_report, update_customer_report
+from datetime import datetime
 import json
+import os
 
 class Command(BaseCommand):
     help = 'Generate customer reports and statistics'
@@ -24,6 +24,17 @@ class Command(BaseCommand):
             default='json',
             help='Report format (default: json)'
         )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Update the last stored report, scanning only customers created or changed since'
+        )
+        parser.add_argument(
+            '--snapshot',
+            type=str,
+            default='customer_report_snapshot.json',
+            help='Where the last report is stored for incremental runs (default: customer_report_snapshot.json)'
+        )
 
     def handle(self, *args, **options):
         try:
@@ -34,33 +45,15 @@ class Command(BaseCommand):
                 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
                 output_file = f'customer_report_{timestamp}.json'
             
-            # Get statistics
-            stats = get_customer_statistics()
-            analytics = get_customer_analytics()
-            
-            # Additional analysis
-            customers_by_source = Customer.objects.values('source').annotate(
-                count=Customer.objects.model.objects.count()
-            ).order_by('-count')
-            
-            recent_customers = Customer.objects.filter(
-                created_at__gte=datetime.now() - timedelta(days=7)
-            ).count()
-            
-            report_data = {
-                'generated_at': datetime.now().isoformat(),
-                'statistics': stats,
-                'analytics': analytics,
-                'customers_by_source': list(customers_by_source),
-                'recent_customers_7_days': recent_customers,
-                'summary': {
-                    'total_customers': stats['total'],
-                    'active_customers': stats['active'],
-                    'inactive_customers': stats['inactive'],
-                    'recent_customers': stats['recent'],
-                    'monthly_growth': analytics['monthly_growth']
-                }
-            }
+            if options['incremental']:
+                report_data = update_customer_report(self.load_snapshot(options['snapshot']))
+            else:
+                report_data = build_customer_report()
+            self.save_snapshot(options['snapshot'], report_data)
+
+            stats = report_data['statistics']
+            analytics = report_data['analytics']
+            customers_by_source = report_data['customers_by_source']
             
             if format_type == 'json':
                 with open(output_file, 'w', encoding='utf-8') as f:
@@ -94,8 +87,22 @@ class Command(BaseCommand):
             self.stdout.write(f"Active Customers: {stats['active']}")
             self.stdout.write(f"Recent Customers (30 days): {stats['recent']}")
             self.stdout.write(f"Monthly Growth: {analytics['monthly_growth']}")
+            self.stdout.write(f"Mode: {report_data['mode']}")
             
         except Exception as e:
             self.stdout.write(
                 self.style.ERROR(f'Error generating customer report: {str(e)}')
             )
+
+    def load_snapshot(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save_snapshot(self, path, report_data):
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(report_data, f)
+        os.replace(tmp, path)
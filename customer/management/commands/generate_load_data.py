@@ -0,0 +1,198 @@
+"""
+Management command to generate reproducible load-test data
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from crm.cache import invalidate_stats
+from customer.ledger import rebuild_customer_ledgers
+from customer.models import Customer
+from customer.rollups import rebuild_signup_rollups
+from product.models import Order, Product, Tag
+from datetime import date, datetime, timedelta, timezone
+import random
+import time
+
+# Generated rows are recognisable so --clear never touches real data
+EMAIL_DOMAIN = 'load.example.com'
+PRODUCT_PREFIX = 'Load product'
+TAG_PREFIX = 'load-tag'
+# Creation dates end here rather than at the current time, so runs repeat
+DEFAULT_ANCHOR = date(2026, 1, 1)
+
+FIRST_NAMES = ['John', 'Jane', 'Bob', 'Alice', 'Maria', 'David', 'Grace', 'Peter', 'Amina', 'Chen']
+LAST_NAMES = ['Doe', 'Smith', 'Johnson', 'Brown', 'Banda', 'Phiri', 'Mwale', 'Garcia', 'Lee', 'Zulu']
+SOURCES = [('website', 50), ('referral', 20), ('social', 15), ('ads', 10), ('import', 5)]
+STATUSES = [('delivered', 60), ('Intransit', 15), ('pending', 25)]
+
+
+def bulk_create_with_timestamps(model, objs, fields, batch_size):
+    """
+    Insert objs keeping the timestamps set on them.
+
+    bulk_create stamps auto_now and auto_now_add fields with the current time,
+    so the generated times are put back with a follow-up bulk_update, which
+    writes the values as they are.
+    """
+    times = [[getattr(obj, field) for field in fields] for obj in objs]
+    model.objects.bulk_create(objs, batch_size=batch_size)
+    for obj, values in zip(objs, times):
+        for field, value in zip(fields, values):
+            setattr(obj, field, value)
+    model.objects.bulk_update(objs, fields, batch_size=batch_size)
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a reproducible data set of customers, products with tags and orders '
+        'for load testing and benchmarks. The same --seed and --anchor always produce the same data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', type=int, default=100000, help='Number of customers (default: 100000)')
+        parser.add_argument('--products', type=int, default=10000, help='Number of products (default: 10000)')
+        parser.add_argument('--orders', type=int, default=1000000, help='Number of orders (default: 1000000)')
+        parser.add_argument('--tags', type=int, default=50, help='Number of product tags (default: 50)')
+        parser.add_argument('--days', type=int, default=730, help='Spread creation dates over this many days (default: 730)')
+        parser.add_argument(
+            '--anchor',
+            type=date.fromisoformat,
+            default=DEFAULT_ANCHOR,
+            help=f'Latest creation date, as YYYY-MM-DD (default: {DEFAULT_ANCHOR})'
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk insert (default: 5000)')
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Delete previously generated data first'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            started = time.monotonic()
+            rng = random.Random(options['seed'])
+            self.batch_size = options['batch_size']
+            anchor = options['anchor']
+            self.now = datetime(anchor.year, anchor.month, anchor.day, tzinfo=timezone.utc)
+            self.start = self.now - timedelta(days=options['days'])
+
+            if options['clear']:
+                self.clear()
+
+            tags = self.create_tags(options['tags'])
+            products = self.create_products(rng, options['products'], tags)
+            customers = self.create_customers(rng, options['customers'])
+            orders = self.create_orders(rng, options['orders'], customers, products)
+
+            # Everything above bypassed signals; bring derived data up to date
+            self.stdout.write('Rebuilding ledgers and signup rollup...')
+            rebuild_customer_ledgers()
+            rebuild_signup_rollups()
+            invalidate_stats('customer.Customer', 'product.Product', 'product.Order')
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Successfully generated {len(customers)} customers, {len(products)} products, '
+                    f'{len(tags)} tags and {orders} orders in {time.monotonic() - started:.1f}s'
+                )
+            )
+
+        except Exception as e:
+            self.stdout.write(
+                self.style.ERROR(f'Error generating load data: {str(e)}')
+            )
+
+    def clear(self):
+        customers = Customer.objects.filter(email__endswith='@' + EMAIL_DOMAIN)
+        products = Product.objects.filter(name__startswith=PRODUCT_PREFIX)
+        tags = Tag.objects.filter(name__startswith=TAG_PREFIX)
+
+        # Deleting the customers and products also removes their ledgers and
+        # tag links; the derived data is rebuilt at the end anyway
+        with transaction.atomic():
+            for queryset in [
+                Order.objects.filter(Q(customer__in=customers) | Q(product__in=products)),
+                customers,
+                products,
+                tags,
+            ]:
+                queryset.delete()
+        self.stdout.write('Cleared previously generated data')
+
+    def random_time(self, rng, after=None):
+        start = after or self.start
+        span = (self.now - start).total_seconds()
+        return start + timedelta(seconds=int(rng.random() * span))
+
+    def create_tags(self, count):
+        return Tag.objects.bulk_create([Tag(name=f'{TAG_PREFIX}-{i}') for i in range(count)])
+
+    def create_products(self, rng, count, tags):
+        products = [
+            Product(
+                name=f'{PRODUCT_PREFIX} {i}',
+                price=round(rng.uniform(1, 500), 2),
+                description=f'Generated product {i}',
+                created_at=self.random_time(rng),
+            )
+            for i in range(count)
+        ]
+        with transaction.atomic():
+            bulk_create_with_timestamps(Product, products, ['created_at'], self.batch_size)
+
+            if tags:
+                Through = Product.tags.through
+                links = [
+                    Through(product_id=product.id, tag_id=tag.id)
+                    for product in products
+                    for tag in rng.sample(tags, rng.randint(0, min(3, len(tags))))
+                ]
+                Through.objects.bulk_create(links, batch_size=self.batch_size)
+        self.stdout.write(f'Created {count} products')
+        return products
+
+    def create_customers(self, rng, count):
+        sources, weights = zip(*SOURCES)
+        customers = []
+        for i in range(count):
+            created_at = self.random_time(rng)
+            customers.append(Customer(
+                name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                email=f'customer{i}@{EMAIL_DOMAIN}',
+                phone=f'0{rng.randint(700000000, 999999999)}',
+                source=rng.choices(sources, weights)[0],
+                is_active=rng.random() < 0.85,
+                created_at=created_at,
+                updated_at=created_at,
+            ))
+
+        with transaction.atomic():
+            bulk_create_with_timestamps(
+                Customer, customers, ['created_at', 'updated_at'], self.batch_size
+            )
+        self.stdout.write(f'Created {count} customers')
+        return customers
+
+    def create_orders(self, rng, count, customers, products):
+        if not customers or not products:
+            return 0
+
+        statuses, weights = zip(*STATUSES)
+        created = 0
+        # Orders are generated and inserted batch by batch to keep memory flat
+        while created < count:
+            batch = []
+            for _ in range(min(self.batch_size, count - created)):
+                customer = rng.choice(customers)
+                batch.append(Order(
+                    customer_id=customer.id,
+                    product_id=rng.choice(products).id,
+                    status=rng.choices(statuses, weights)[0],
+                    created_at=self.random_time(rng, after=customer.created_at),
+                ))
+            with transaction.atomic():
+                bulk_create_with_timestamps(Order, batch, ['created_at'], self.batch_size)
+            created += len(batch)
+            self.stdout.write(f'Created {created}/{count} orders')
+        return created
@@ -0,0 +1,40 @@
+"""
+Management command to rebuild the per-customer order ledger
+"""
+from django.core.management.base import BaseCommand
+from customer.ledger import rebuild_customer_ledgers
+
+class Command(BaseCommand):
+    help = 'Rebuild customer order ledgers (counts, totals, last order) from orders'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--customer',
+            type=int,
+            nargs='+',
+            dest='customer_ids',
+            default=None,
+            help='Only rebuild the ledgers of these customer ids'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of ledgers written per batch (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            written = rebuild_customer_ledgers(
+                customer_ids=options['customer_ids'],
+                batch_size=options['batch_size']
+            )
+
+            self.stdout.write(
+                self.style.SUCCESS(f'Successfully rebuilt {written} customer ledgers')
+            )
+
+        except Exception as e:
+            self.stdout.write(
+                self.style.ERROR(f'Error rebuilding customer ledgers: {str(e)}')
+            )
@@ -0,0 +1,26 @@
+"""
+Management command to rebuild the customer full-text search index
+"""
+from django.core.management.base import BaseCommand
+from django.db import connection
+from customer.search import get_search_backend
+
+class Command(BaseCommand):
+    help = 'Recreate the customer full-text search index and its sync triggers'
+
+    def handle(self, *args, **options):
+        try:
+            backend = get_search_backend()
+            with connection.schema_editor() as schema_editor:
+                backend.rebuild(schema_editor)
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Successfully rebuilt customer search index ({backend.__class__.__name__})'
+                )
+            )
+
+        except Exception as e:
+            self.stdout.write(
+                self.style.ERROR(f'Error rebuilding search index: {str(e)}')
+            )
@@ -0,0 +1,29 @@
+"""
+Management command to rebuild the daily customer signup rollup
+"""
+from django.core.management.base import BaseCommand
+from customer.rollups import rebuild_signup_rollups
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily signup counts per source from the customer table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rollup rows written per batch (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            written = rebuild_signup_rollups(batch_size=options['batch_size'])
+
+            self.stdout.write(
+                self.style.SUCCESS(f'Successfully rebuilt {written} signup rollup rows')
+            )
+
+        except Exception as e:
+            self.stdout.write(
+                self.style.ERROR(f'Error rebuilding signup rollup: {str(e)}')
+            )
@@ -0,0 +1,97 @@
+"""
+Management command to run the benchmark suite and check it against a baseline
+"""
+from django.core.management.base import BaseCommand, CommandError
+from crm.benchmarks import (
+    DEFAULT_THRESHOLD, SUITES, benchmark_user, compare, load_baseline, run_suite, save_baseline,
+)
+from crm.config import BASE_DIR
+
+class Command(BaseCommand):
+    help = (
+        'Time every view, utils function and data processing method against the '
+        'current database (see generate_load_data) and fail when p95 latency or '
+        'query counts regress past the stored baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--baseline',
+            type=str,
+            default=str(BASE_DIR / 'benchmark_baseline.json'),
+            help='Baseline JSON file (default: benchmark_baseline.json)'
+        )
+        parser.add_argument(
+            '--update-baseline',
+            action='store_true',
+            help='Store this run as the new baseline instead of comparing'
+        )
+        parser.add_argument(
+            '--suite',
+            choices=sorted(SUITES),
+            action='append',
+            help='Run only this suite; may be given more than once'
+        )
+        parser.add_argument(
+            '--only',
+            type=str,
+            help='Run only benchmarks whose name contains this text'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            help='Cap the number of timed runs per benchmark'
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=DEFAULT_THRESHOLD,
+            help=f'Allowed p95 ratio over the baseline (default: {DEFAULT_THRESHOLD})'
+        )
+
+    def handle(self, *args, **options):
+        regressions = []
+        try:
+            results = {}
+            with benchmark_user() as user:
+                for suite in options['suite'] or SUITES:
+                    self.stdout.write(f'Running {suite} benchmarks...')
+                    results.update(run_suite(
+                        SUITES[suite](user),
+                        repeat=options['repeat'],
+                        only=options['only'],
+                        log=self.report,
+                    ))
+
+            if options['update_baseline']:
+                save_baseline(options['baseline'], results)
+                self.stdout.write(
+                    self.style.SUCCESS(f"Successfully saved {len(results)} results to {options['baseline']}")
+                )
+                return
+
+            regressions = compare(results, load_baseline(options['baseline']), options['threshold'])
+            if not regressions:
+                self.stdout.write(
+                    self.style.SUCCESS(f'No regressions in {len(results)} benchmarks')
+                )
+
+        except Exception as e:
+            self.stdout.write(
+                self.style.ERROR(f'Error running benchmarks: {str(e)}')
+            )
+            raise CommandError('Benchmark run failed')
+
+        if regressions:
+            for regression in regressions:
+                self.stdout.write(self.style.ERROR(regression))
+            raise CommandError(f'{len(regressions)} benchmark regressions')
+
+    def report(self, name, result):
+        if 'error' in result:
+            self.stdout.write(self.style.WARNING(f"  {name}: {result['error']}"))
+        else:
+            self.stdout.write(
+                f"  {name}: p50 {result['p50_ms']}ms, p95 {result['p95_ms']}ms, "
+                f"{result['queries']} queries"
+            )
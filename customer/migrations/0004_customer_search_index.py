@@ -0,0 +1,62 @@
+# Generated by Django 5.2 on 2026-10-17 12:05
+
+from django.db import migrations
+
+# The DDL is frozen here rather than read from customer.search, so later
+# changes to the search backends cannot alter what this migration does.
+SQLITE_INSTALL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS customer_customer_fts USING fts5("
+    "name, email, phone, content='customer_customer', content_rowid='id', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS customer_customer_fts_ai AFTER INSERT ON customer_customer BEGIN "
+    "INSERT INTO customer_customer_fts(rowid, name, email, phone) "
+    "VALUES (new.id, new.name, new.email, new.phone); END",
+    "CREATE TRIGGER IF NOT EXISTS customer_customer_fts_ad AFTER DELETE ON customer_customer BEGIN "
+    "INSERT INTO customer_customer_fts(customer_customer_fts, rowid, name, email, phone) "
+    "VALUES ('delete', old.id, old.name, old.email, old.phone); END",
+    "CREATE TRIGGER IF NOT EXISTS customer_customer_fts_au "
+    "AFTER UPDATE OF name, email, phone ON customer_customer BEGIN "
+    "INSERT INTO customer_customer_fts(customer_customer_fts, rowid, name, email, phone) "
+    "VALUES ('delete', old.id, old.name, old.email, old.phone); "
+    "INSERT INTO customer_customer_fts(rowid, name, email, phone) "
+    "VALUES (new.id, new.name, new.email, new.phone); END",
+    "INSERT INTO customer_customer_fts(customer_customer_fts) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL = [
+    'DROP TRIGGER IF EXISTS customer_customer_fts_ai',
+    'DROP TRIGGER IF EXISTS customer_customer_fts_ad',
+    'DROP TRIGGER IF EXISTS customer_customer_fts_au',
+    'DROP TABLE IF EXISTS customer_customer_fts',
+]
+
+POSTGRES_INSTALL = [
+    "CREATE INDEX IF NOT EXISTS customer_search_gin ON customer_customer USING GIN ("
+    "to_tsvector('simple', coalesce(customer_customer.name, '') || ' ' || "
+    "coalesce(customer_customer.email, '') || ' ' || coalesce(customer_customer.phone, '')))",
+]
+
+POSTGRES_UNINSTALL = ['DROP INDEX IF EXISTS customer_search_gin']
+
+INSTALL = {'sqlite': SQLITE_INSTALL, 'postgresql': POSTGRES_INSTALL}
+UNINSTALL = {'sqlite': SQLITE_UNINSTALL, 'postgresql': POSTGRES_UNINSTALL}
+
+
+def install_search_index(apps, schema_editor):
+    for statement in INSTALL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def uninstall_search_index(apps, schema_editor):
+    for statement in UNINSTALL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customer', '0003_customer_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2 on 2026-10-17 12:48
+
+from django.db import migrations, models
+
+SQLITE_INSTALL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS customer_customer_fts USING fts5("
+    "name, email, phone, content='customer_customer', content_rowid='id', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS customer_customer_fts_ai AFTER INSERT ON customer_customer BEGIN "
+    "INSERT INTO customer_customer_fts(rowid, name, email, phone) "
+    "VALUES (new.id, new.name, new.email, new.phone); END",
+    "CREATE TRIGGER IF NOT EXISTS customer_customer_fts_ad AFTER DELETE ON customer_customer BEGIN "
+    "INSERT INTO customer_customer_fts(customer_customer_fts, rowid, name, email, phone) "
+    "VALUES ('delete', old.id, old.name, old.email, old.phone); END",
+    "CREATE TRIGGER IF NOT EXISTS customer_customer_fts_au "
+    "AFTER UPDATE OF name, email, phone ON customer_customer BEGIN "
+    "INSERT INTO customer_customer_fts(customer_customer_fts, rowid, name, email, phone) "
+    "VALUES ('delete', old.id, old.name, old.email, old.phone); "
+    "INSERT INTO customer_customer_fts(rowid, name, email, phone) "
+    "VALUES (new.id, new.name, new.email, new.phone); END",
+    "INSERT INTO customer_customer_fts(customer_customer_fts) VALUES ('rebuild')",
+]
+
+
+def reinstall_search_index(apps, schema_editor):
+    # Adding these columns rebuilds the table on SQLite, which drops its triggers
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in SQLITE_INSTALL:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customer', '0004_customer_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='source',
+            field=models.CharField(default='website', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.RunPython(reinstall_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-17 21:20
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill_signup_rollup(apps, schema_editor):
+    Customer = apps.get_model('customer', 'Customer')
+    CustomerSignupRollup = apps.get_model('customer', 'CustomerSignupRollup')
+    rows = (
+        Customer.objects.annotate(day=TruncDate('created_at'))
+        .order_by().values('day', 'source').annotate(count=Count('id'))
+    )
+    CustomerSignupRollup.objects.bulk_create(
+        [CustomerSignupRollup(**row) for row in rows], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customer', '0006_customer_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerSignupRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('source', models.CharField(max_length=50)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'source'), name='customer_signup_day_source_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_signup_rollup, migrations.RunPython.noop),
+    ]
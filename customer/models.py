@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.db.models.functions import Lower
 
 class Customer(models.Model):
   user = models.OneToOneField(User, null=True, on_delete=models.CASCADE)
@@ -7,7 +8,42 @@ class Customer(models.Model):
   phone = models.CharField(max_length=200, null=True)
   profile_pic = models.ImageField(null=True, blank=True)
   email = models.CharField(max_length=200, null=True, unique=True)
+  source = models.CharField(max_length=50, default='website')
+  is_active = models.BooleanField(default=True)
   created_at = models.DateTimeField(auto_now_add=True)
+  updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+  class Meta:
+    indexes = [
+      models.Index(fields=['created_at', 'id'], name='customer_created_id_idx'),
+      # Serves the case-insensitive prefix search of the customer lookup
+      models.Index(Lower('name'), name='customer_name_lower_idx'),
+    ]
+
+  def __str__(self):
+    return self.name[:50]
+
+class CustomerLedger(models.Model):
+  customer = models.OneToOneField(Customer, primary_key=True, related_name='ledger', on_delete=models.CASCADE)
+  order_count = models.PositiveIntegerField(default=0)
+  lifetime_total = models.FloatField(default=0)
+  pending_count = models.PositiveIntegerField(default=0)
+  intransit_count = models.PositiveIntegerField(default=0)
+  delivered_count = models.PositiveIntegerField(default=0)
+  last_order_at = models.DateTimeField(null=True, blank=True)
+
+  def __str__(self):
+    return f'Ledger for customer {self.customer_id}'
+
+class CustomerSignupRollup(models.Model):
+  day = models.DateField()
+  source = models.CharField(max_length=50)
+  count = models.PositiveIntegerField(default=0)
+
+  class Meta:
+    constraints = [
+      models.UniqueConstraint(fields=['day', 'source'], name='customer_signup_day_source_uniq'),
+    ]
 
   def __str__(self):
-    return self.name[:50]
\ No newline at end of file
+    return f'{self.day} {self.source}: {self.count}'
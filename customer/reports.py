@@ -0,0 +1,139 @@
+"""
+Customer report computation
+
+A full report is one grouped query over the customer table with conditional
+aggregates. A stored report can be brought up to date incrementally: customers
+created since it was taken are added to its per-source totals and the
+time-windowed counts are recounted from the created_at index, both in one
+query. Edits to older customers and deletions can't be applied as a delta, so
+they make the next run fall back to a full build. Deletions are found by
+recounting, on the created_at index, the customers the stored report covered.
+"""
+from datetime import datetime, timedelta
+
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Customer
+
+SNAPSHOT_VERSION = 2
+
+
+def _windows(now):
+    return {
+        'recent': now - timedelta(days=30),
+        'recent_7_days': now - timedelta(days=7),
+        'monthly_growth': now.replace(day=1, hour=0, minute=0, second=0, microsecond=0),
+    }
+
+
+def _window_aggregates(windows):
+    return {
+        name: Count('id', filter=Q(created_at__gte=start))
+        for name, start in windows.items()
+    }
+
+
+def build_customer_report(now=None):
+    """
+    Compute the customer report from scratch with one grouped query
+    """
+    now = now or timezone.now()
+    windows = _windows(now)
+
+    # Customers created after ``now`` are left for the next incremental run
+    rows = Customer.objects.filter(created_at__lte=now).order_by().values('source').annotate(
+        total=Count('id'),
+        active=Count('id', filter=Q(is_active=True)),
+        **_window_aggregates(windows)
+    )
+
+    by_source = {}
+    window_counts = dict.fromkeys(windows, 0)
+    for row in rows:
+        by_source[row['source']] = {'total': row['total'], 'active': row['active']}
+        for name in windows:
+            window_counts[name] += row[name]
+
+    return _assemble(now, by_source, window_counts, 'full')
+
+
+def update_customer_report(report, now=None):
+    """
+    Bring a stored report up to date by scanning only customers created or
+    changed since it was taken, or rebuild it when that isn't possible
+    """
+    if not report or report.get('snapshot_version') != SNAPSHOT_VERSION:
+        return build_customer_report(now)
+
+    as_of = datetime.fromisoformat(report['as_of'])
+    # Fewer customers than the report counted means some were deleted; more
+    # means a row committed late with an earlier timestamp
+    if Customer.objects.filter(created_at__lte=as_of).count() != report['statistics']['total']:
+        return build_customer_report(now)
+
+    now = now or timezone.now()
+    windows = _windows(now)
+    changed = Q(updated_at__gt=as_of)
+
+    rows = Customer.objects.filter(
+        changed | Q(created_at__gte=min(windows.values())),
+        created_at__lte=now,
+    ).order_by().values('source').annotate(
+        new=Count('id', filter=changed),
+        new_active=Count('id', filter=changed & Q(is_active=True)),
+        edited=Count('id', filter=changed & Q(created_at__lte=as_of)),
+        **_window_aggregates(windows)
+    )
+
+    by_source = {source: dict(counts) for source, counts in report['by_source'].items()}
+    window_counts = dict.fromkeys(windows, 0)
+    for row in rows:
+        if row['edited']:
+            # The stored report counted these customers with values we no longer know
+            return build_customer_report(now)
+        counts = by_source.setdefault(row['source'], {'total': 0, 'active': 0})
+        counts['total'] += row['new']
+        counts['active'] += row['new_active']
+        for name in windows:
+            window_counts[name] += row[name]
+
+    return _assemble(now, by_source, window_counts, 'incremental')
+
+
+def _assemble(now, by_source, window_counts, mode):
+    total = sum(counts['total'] for counts in by_source.values())
+    active = sum(counts['active'] for counts in by_source.values())
+    customers_by_source = sorted(
+        ({'source': source, 'count': counts['total']} for source, counts in by_source.items() if counts['total']),
+        key=lambda row: -row['count'],
+    )
+    statistics = {
+        'total': total,
+        'active': active,
+        'recent': window_counts['recent'],
+        'inactive': total - active,
+    }
+
+    return {
+        'generated_at': now.isoformat(),
+        'mode': mode,
+        'statistics': statistics,
+        'analytics': {
+            'monthly_growth': window_counts['monthly_growth'],
+            'source_distribution': customers_by_source,
+        },
+        'customers_by_source': customers_by_source,
+        'recent_customers_7_days': window_counts['recent_7_days'],
+        'summary': {
+            'total_customers': total,
+            'active_customers': active,
+            'inactive_customers': total - active,
+            'recent_customers': window_counts['recent'],
+            'monthly_growth': window_counts['monthly_growth'],
+        },
+        # Snapshot state for the next incremental run
+        'snapshot_version': SNAPSHOT_VERSION,
+        'as_of': now.isoformat(),
+        'by_source': by_source,
+    }
@@ -0,0 +1,112 @@
+"""
+Daily customer signup rollup
+
+One row per (day, source) holds the number of customers who signed up that
+day from that source. Signals keep it current as customers are created,
+change source or are deleted, so signup trends are read from a few rows per
+day instead of scanning the customer table.
+"""
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Greatest, TruncDate, TruncMonth
+from django.utils import timezone
+
+from .models import Customer, CustomerSignupRollup
+
+
+def signup_day(created_at):
+    """
+    Get the rollup day of a signup time, in the current time zone like TruncDate
+    """
+    if timezone.is_aware(created_at):
+        created_at = timezone.localtime(created_at)
+    return created_at.date()
+
+
+def record_signups(counts):
+    """
+    Apply signup count changes, given as a mapping of (day, source) to delta
+    """
+    for (day, source), delta in counts.items():
+        if not delta:
+            continue
+        rows = CustomerSignupRollup.objects.filter(day=day, source=source)
+        # A row that has drifted below the truth stops at 0 rather than
+        # failing the customer write that triggered it
+        count = Greatest(F('count') + delta, Value(0))
+        if rows.update(count=count):
+            continue
+        try:
+            with transaction.atomic():
+                CustomerSignupRollup.objects.create(day=day, source=source, count=max(delta, 0))
+        except IntegrityError:
+            # Another writer created the row first
+            rows.update(count=count)
+
+
+def record_new_customers(customers):
+    """
+    Count customers saved without signals, e.g. by ``bulk_create``
+    """
+    record_signups(Counter((signup_day(customer.created_at), customer.source) for customer in customers))
+
+
+def rebuild_signup_rollups(batch_size=1000):
+    """
+    Recompute the whole rollup from the customer table and return the row count
+    """
+    rows = [
+        CustomerSignupRollup(day=row['day'], source=row['source'], count=row['count'])
+        for row in Customer.objects.annotate(day=TruncDate('created_at'))
+        .order_by().values('day', 'source').annotate(count=Count('id'))
+    ]
+    with transaction.atomic():
+        CustomerSignupRollup.objects.all().delete()
+        CustomerSignupRollup.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def get_signup_rollup(start=None, end=None, source=None):
+    """
+    Get the rollup rows between two days (inclusive), optionally for one source
+    """
+    rows = CustomerSignupRollup.objects.filter(count__gt=0)
+    if start:
+        rows = rows.filter(day__gte=start)
+    if end:
+        rows = rows.filter(day__lte=end)
+    if source:
+        rows = rows.filter(source=source)
+    return rows
+
+
+def get_daily_signups(start=None, end=None, source=None):
+    """
+    Get ``{'day', 'count'}`` rows of signups per day, oldest first
+    """
+    return list(
+        get_signup_rollup(start, end, source).values('day')
+        .annotate(count=Sum('count')).order_by('day')
+    )
+
+
+def get_monthly_signups(start=None, end=None, source=None):
+    """
+    Get ``{'month', 'count'}`` rows of signups per month, oldest first
+    """
+    return list(
+        get_signup_rollup(start, end, source).annotate(month=TruncMonth('day'))
+        .values('month').annotate(count=Sum('count')).order_by('month')
+    )
+
+
+def get_signups_by_source(start=None, end=None):
+    """
+    Get ``{'source', 'count'}`` rows, most signups first
+    """
+    return list(
+        get_signup_rollup(start, end).values('source')
+        .annotate(count=Sum('count')).order_by('-count', 'source')
+    )
@@ -0,0 +1,151 @@
+"""
+Full-text search backends for customers
+
+Each backend turns a free-text query into a ranked customer queryset. The
+SQLite backend keeps an FTS5 index in sync with the customer table through
+triggers; the Postgres backend relies on a GIN expression index. Any other
+database falls back to ``icontains`` matching.
+
+The backend is picked from the database vendor unless
+``AppConfig.SEARCH_CONFIG['CUSTOMER_BACKEND']`` names one explicitly.
+"""
+import re
+
+from django.db import connection as default_connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from crm.config import AppConfig
+
+SEARCH_FIELDS = ['name', 'email', 'phone']
+
+
+def search_terms(query):
+    """
+    Split a free-text query into lowercase word terms
+    """
+    return re.findall(r'\w+', (query or '').lower())
+
+
+class BaseSearchBackend:
+    """Interface shared by the customer search backends"""
+
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+    def install(self, schema_editor):
+        """Create the index structures; the migrations keep their own frozen copy"""
+
+    def uninstall(self, schema_editor):
+        """Drop the index structures"""
+
+    def rebuild(self, schema_editor):
+        """Recreate the index from the customer table"""
+        self.uninstall(schema_editor)
+        self.install(schema_editor)
+
+
+class LikeSearchBackend(BaseSearchBackend):
+    """Unindexed substring matching, used when no full-text index is available"""
+
+    def search(self, queryset, query):
+        condition = Q()
+        for field in SEARCH_FIELDS:
+            condition |= Q(**{f'{field}__icontains': query})
+        return queryset.filter(condition)
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """SQLite FTS5 external-content index with prefix matching and bm25 ranking"""
+
+    table = 'customer_customer_fts'
+
+    def search(self, queryset, query):
+        terms = search_terms(query)
+        if not terms:
+            return queryset.none()
+
+        match = ' '.join(f'"{term}"*' for term in terms)
+        return queryset.extra(
+            tables=[self.table],
+            where=[f'{self.table}.rowid = customer_customer.id', f'{self.table} MATCH %s'],
+            params=[match],
+            select={'search_rank': f'{self.table}.rank'},
+            order_by=['search_rank'],
+        )
+
+    def install(self, schema_editor):
+        columns = ', '.join(SEARCH_FIELDS)
+        new_values = ', '.join(f'new.{field}' for field in SEARCH_FIELDS)
+        old_values = ', '.join(f'old.{field}' for field in SEARCH_FIELDS)
+        statements = [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+            f"{columns}, content='customer_customer', content_rowid='id', prefix='2 3')",
+            f"CREATE TRIGGER IF NOT EXISTS {self.table}_ai AFTER INSERT ON customer_customer BEGIN "
+            f"INSERT INTO {self.table}(rowid, {columns}) VALUES (new.id, {new_values}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {self.table}_ad AFTER DELETE ON customer_customer BEGIN "
+            f"INSERT INTO {self.table}({self.table}, rowid, {columns}) "
+            f"VALUES ('delete', old.id, {old_values}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {self.table}_au AFTER UPDATE OF {columns} ON customer_customer BEGIN "
+            f"INSERT INTO {self.table}({self.table}, rowid, {columns}) "
+            f"VALUES ('delete', old.id, {old_values}); "
+            f"INSERT INTO {self.table}(rowid, {columns}) VALUES (new.id, {new_values}); END",
+            f"INSERT INTO {self.table}({self.table}) VALUES ('rebuild')",
+        ]
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    def uninstall(self, schema_editor):
+        for suffix in ('ai', 'ad', 'au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {self.table}_{suffix}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {self.table}')
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """Postgres tsvector search backed by a GIN expression index"""
+
+    index = 'customer_search_gin'
+    # Keep in step with the indexed expression so the planner can use the index
+    document = "to_tsvector('simple', " + " || ' ' || ".join(
+        f"coalesce(customer_customer.{field}, '')" for field in SEARCH_FIELDS
+    ) + ")"
+
+    def search(self, queryset, query):
+        terms = search_terms(query)
+        if not terms:
+            return queryset.none()
+
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        return queryset.extra(
+            where=[f"{self.document} @@ to_tsquery('simple', %s)"],
+            params=[tsquery],
+            select={'search_rank': f"ts_rank({self.document}, to_tsquery('simple', %s))"},
+            select_params=[tsquery],
+            order_by=['-search_rank'],
+        )
+
+    def install(self, schema_editor):
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {self.index} ON customer_customer '
+            f'USING GIN ({self.document})'
+        )
+
+    def uninstall(self, schema_editor):
+        schema_editor.execute(f'DROP INDEX IF EXISTS {self.index}')
+
+
+VENDOR_BACKENDS = {
+    'sqlite': SQLiteFTSBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_search_backend(connection=None):
+    """
+    Get the customer search backend for a database connection
+    """
+    connection = connection or default_connection
+    path = AppConfig.SEARCH_CONFIG.get('CUSTOMER_BACKEND')
+    if path:
+        return import_string(path)()
+    return VENDOR_BACKENDS.get(connection.vendor, LikeSearchBackend)()
@@ -0,0 +1,89 @@
+from django.db.models.signals import post_init, post_save, post_delete
+from product.models import Order, Product
+from .ledger import record_new_order, refresh_customer_ledger, rebuild_customer_ledgers
+from .models import Customer
+from .rollups import record_signups, signup_day
+
+def remember_order_state(sender, instance, **kwargs):
+  # Read through __dict__ so deferred fields are never loaded just for this
+  state = instance.__dict__
+  instance._ledger_state = (state.get('customer_id'), state.get('product_id'), state.get('status'))
+
+post_init.connect(remember_order_state, sender=Order)
+
+
+def order_saved(sender, instance, created, raw=False, **kwargs):
+  if raw:
+    return
+
+  if created:
+    record_new_order(instance)
+  else:
+    old_customer_id, old_product_id, old_status = instance._ledger_state
+    if (old_customer_id, old_product_id, old_status) != (instance.customer_id, instance.product_id, instance.status):
+      refresh_customer_ledger(instance.customer_id)
+      if old_customer_id != instance.customer_id:
+        refresh_customer_ledger(old_customer_id)
+
+  remember_order_state(sender, instance)
+
+post_save.connect(order_saved, sender=Order)
+
+
+def order_deleted(sender, instance, **kwargs):
+  refresh_customer_ledger(instance.customer_id)
+
+post_delete.connect(order_deleted, sender=Order)
+
+
+def remember_product_price(sender, instance, **kwargs):
+  instance._ledger_price = instance.__dict__.get('price')
+
+post_init.connect(remember_product_price, sender=Product)
+
+
+def product_saved(sender, instance, created, raw=False, **kwargs):
+  if created or raw or instance._ledger_price == instance.price:
+    return
+
+  customer_ids = Order.objects.filter(product=instance, customer__isnull=False).values('customer_id')
+  rebuild_customer_ledgers(customer_ids=customer_ids)
+  instance._ledger_price = instance.price
+
+post_save.connect(product_saved, sender=Product)
+
+
+def signup_key(state):
+  created_at, source = state
+  return (signup_day(created_at), source) if created_at else None
+
+
+def remember_customer_signup(sender, instance, **kwargs):
+  state = instance.__dict__
+  instance._signup_state = (state.get('created_at'), state.get('source'))
+
+post_init.connect(remember_customer_signup, sender=Customer)
+
+
+def customer_saved(sender, instance, created, raw=False, **kwargs):
+  if raw:
+    return
+
+  new_key = signup_key((instance.created_at, instance.source))
+  old_key = None if created else signup_key(instance._signup_state)
+  if created:
+    record_signups({new_key: 1})
+  elif old_key and old_key != new_key:
+    record_signups({old_key: -1, new_key: 1})
+
+  remember_customer_signup(sender, instance)
+
+post_save.connect(customer_saved, sender=Customer)
+
+
+def customer_deleted(sender, instance, **kwargs):
+  old_key = signup_key(instance._signup_state)
+  if old_key:
+    record_signups({old_key: -1})
+
+post_delete.connect(customer_deleted, sender=Customer)
@@ -0,0 +1,209 @@
+"""
+Tests for the customer API endpoints
+"""
+import csv
+import gzip
+import io
+import json
+from django.contrib.auth.models import Group, User
+from django.test import Client, TestCase
+from django.urls import reverse
+from customer.models import Customer
+from customer.utils import gzip_stream, iter_customer_csv
+
+def create_admin(username='boss'):
+    """Create a user holding the admin role"""
+    Group.objects.get_or_create(name='customer')
+    admin = User.objects.create_user(username, password='secret-pass-1')
+    admin.groups.add(Group.objects.get_or_create(name='admin')[0])
+    return admin
+
+class CustomerApiAccessTestCase(TestCase):
+    """Test case for who may call the customer API"""
+
+    def setUp(self):
+        """Set up a customer"""
+        self.customer = Customer.objects.create(name="Jane", email="jane@example.com")
+        self.delete_url = reverse('delete_customer_api', args=[self.customer.id])
+
+    def test_anonymous_requests_are_refused(self):
+        """Without a session nothing is read or changed"""
+        self.assertEqual(self.client.get(reverse('customer_list_api')).status_code, 401)
+        self.assertEqual(self.client.delete(self.delete_url).status_code, 401)
+        self.assertTrue(Customer.objects.filter(id=self.customer.id).exists())
+
+    def test_non_admins_are_refused(self):
+        """Logged in users without the admin role are forbidden"""
+        Group.objects.get_or_create(name='customer')
+        self.client.force_login(User.objects.create_user('carol', password='secret-pass-1'))
+        self.assertEqual(self.client.delete(self.delete_url).status_code, 403)
+        self.assertTrue(Customer.objects.filter(id=self.customer.id).exists())
+
+    def test_writes_need_csrf_token(self):
+        """Session authenticated writes are subject to CSRF checks"""
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(create_admin())
+        self.assertEqual(client.delete(self.delete_url).status_code, 403)
+        self.assertTrue(Customer.objects.filter(id=self.customer.id).exists())
+
+        self.client.force_login(create_admin('boss2'))
+        self.assertEqual(self.client.delete(self.delete_url).status_code, 200)
+        self.assertFalse(Customer.objects.filter(id=self.customer.id).exists())
+
+class CustomerCursorPaginationTestCase(TestCase):
+    """Test case for cursor pagination in customer_list_api"""
+
+    def setUp(self):
+        """Set up test customers and log in an admin without a customer profile"""
+        admin = create_admin()
+        Customer.objects.filter(user=admin).delete()
+        self.client.force_login(admin)
+        for i in range(25):
+            Customer.objects.create(name=f"Customer {i}", email=f"customer{i}@example.com")
+        self.url = reverse('customer_list_api')
+
+    def test_walk_all_pages(self):
+        """Following next cursors visits every customer once, newest first"""
+        seen = []
+        response = self.client.get(self.url, {'pagination': 'cursor', 'per_page': 10})
+        while True:
+            data = response.json()
+            self.assertNotIn('total_count', data)
+            seen.extend(customer['id'] for customer in data['customers'])
+            if not data['next']:
+                break
+            response = self.client.get(self.url, {'cursor': data['next'], 'per_page': 10})
+
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(seen, sorted(seen, reverse=True))
+
+    def test_prev_cursor(self):
+        """The prev cursor returns the page before"""
+        first = self.client.get(self.url, {'pagination': 'cursor', 'per_page': 10}).json()
+        second = self.client.get(self.url, {'cursor': first['next'], 'per_page': 10}).json()
+        back = self.client.get(self.url, {
+            'cursor': second['prev'], 'direction': 'prev', 'per_page': 10
+        }).json()
+        self.assertEqual(back['customers'], first['customers'])
+
+    def test_count_on_request(self):
+        """The total count is only computed when asked for"""
+        data = self.client.get(self.url, {'pagination': 'cursor', 'count': 'true'}).json()
+        self.assertEqual(data['total_count'], 25)
+
+    def test_invalid_cursor(self):
+        """A malformed cursor is rejected"""
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+class BulkCreateCustomersTestCase(TestCase):
+    """Test case for bulk_create_customers_api"""
+
+    def setUp(self):
+        """Set up an existing customer and log in an admin"""
+        self.client.force_login(create_admin())
+        Customer.objects.create(name="Existing", email="taken@example.com")
+        self.url = reverse('bulk_create_customers_api')
+
+    def post(self, payload):
+        return self.client.post(self.url, json.dumps(payload), content_type='application/json')
+
+    def test_per_item_results(self):
+        """Valid items are created and invalid ones reported"""
+        response = self.post([
+            {'name': 'Lead One', 'email': 'one@example.com', 'phone': '1234567890'},
+            {'name': 'Lead Two', 'email': 'taken@example.com'},
+            {'email': 'nameless@example.com'},
+            {'name': 'Lead Three', 'email': 'one@example.com'},
+            {'name': 'Lead Four'},
+        ])
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual((data['created'], data['failed']), (2, 3))
+
+        statuses = [result['status'] for result in data['results']]
+        self.assertEqual(statuses, ['created', 'error', 'error', 'error', 'created'])
+        self.assertIn('Email already exists', data['results'][1]['errors'])
+        self.assertIn('Name is required', data['results'][2]['errors'])
+        self.assertIn('Duplicate email in request', data['results'][3]['errors'])
+        self.assertTrue(Customer.objects.filter(id=data['results'][0]['id'], name='Lead One').exists())
+
+    def test_wrongly_typed_fields(self):
+        """Non-string fields fail their own item, not the whole batch"""
+        response = self.post([
+            {'name': 'Lead One', 'phone': 1234567890},
+            {'name': 'Lead Two', 'email': ['two@example.com']},
+            {'name': 'Lead Three', 'email': 'three@example.com'},
+        ])
+        self.assertEqual(response.status_code, 201)
+        results = response.json()['results']
+        self.assertEqual([result['status'] for result in results], ['error', 'error', 'created'])
+        self.assertIn('Phone must be a string', results[0]['errors'])
+        self.assertIn('Email must be a string', results[1]['errors'])
+
+    def test_admin_required(self):
+        """Anonymous callers cannot create customers"""
+        self.client.logout()
+        response = self.post([{'name': 'Lead One'}])
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(Customer.objects.filter(name='Lead One').exists())
+
+    def test_constant_queries(self):
+        """Validation and insertion do not scale queries with the item count"""
+        payload = [{'name': f'Lead {i}', 'email': f'lead{i}@example.com'} for i in range(100)]
+        # Session, user and roles, then email lookup, savepoint, insert,
+        # signup rollup update, release
+        with self.assertNumQueries(8):
+            response = self.post(payload)
+        self.assertEqual(response.json()['created'], 100)
+
+    def test_rejects_non_list(self):
+        """The payload must be a list of customers"""
+        response = self.post({'name': 'Not a list'})
+        self.assertEqual(response.status_code, 400)
+
+class ExportCustomersTestCase(TestCase):
+    """Test case for the streaming customer export"""
+
+    def setUp(self):
+        """Set up customers and log in an admin without a customer profile"""
+        admin = create_admin()
+        Customer.objects.filter(user=admin).delete()
+        self.client.force_login(admin)
+        for i in range(5):
+            Customer.objects.create(name=f"Customer {i}", email=f"customer{i}@example.com", phone=f"09770000{i:02}")
+        self.url = reverse('export_customers_api')
+
+    def rows(self, body):
+        return list(csv.reader(io.StringIO(body)))
+
+    def assert_export(self, rows):
+        self.assertEqual(rows[0], ['Name', 'Email', 'Phone', 'Source', 'Created At'])
+        self.assertEqual([row[:3] for row in rows[1:]], [
+            [f'Customer {i}', f'customer{i}@example.com', f'09770000{i:02}'] for i in range(5)
+        ])
+
+    def test_csv_stream(self):
+        """The plain export streams a header and one row per customer"""
+        response = self.client.get(self.url)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assert_export(self.rows(b''.join(response.streaming_content).decode()))
+
+    def test_gzip_stream(self):
+        """The gzip export decompresses to the same CSV"""
+        response = self.client.get(self.url, {'gzip': 'true'})
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        body = gzip.decompress(b''.join(response.streaming_content)).decode()
+        self.assert_export(self.rows(body))
+
+    def test_small_blocks(self):
+        """Rows split over many blocks still compress and read back whole"""
+        chunks = list(iter_customer_csv(chunk_size=2))
+        self.assertEqual(len(chunks), 3)
+        self.assert_export(self.rows(gzip.decompress(b''.join(gzip_stream(chunks))).decode()))
+
+    def test_admin_required(self):
+        """Customer data is not exported to anonymous callers"""
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
@@ -0,0 +1,109 @@
+"""
+Tests for the chunked, parallel and resumable export_customers command
+"""
+import csv
+import glob
+import gzip
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TransactionTestCase
+from customer.management.commands.export_customers import Command
+from customer.models import Customer
+
+class ExportCustomersCommandTestCase(TransactionTestCase):
+    """Test case for the export_customers command"""
+
+    def setUp(self):
+        """Set up 25 customers and an empty working directory"""
+        # Worker threads use their own connections, so the rows must be committed
+        Customer.objects.bulk_create([
+            Customer(name=f"Customer {i}", email=f"customer{i}@example.com", phone=f"07{i:08d}")
+            for i in range(25)
+        ])
+        self.directory = tempfile.mkdtemp()
+        cwd = os.getcwd()
+        os.chdir(self.directory)
+        self.addCleanup(os.chdir, cwd)
+
+    def export(self, *args):
+        out = StringIO()
+        call_command('export_customers', '--chunk-size', '4', '--workers', '3', *args, stdout=out)
+        return out.getvalue()
+
+    def interrupted(self):
+        """Patch the export to fail on the chunks after the first twelve ids"""
+        export_chunk = Command.export_chunk
+        last_id = Customer.objects.order_by('id').first().id + 12
+
+        def fail_late_chunks(command, start, end, *args):
+            if start >= last_id:
+                raise OSError('disk full')
+            return export_chunk(command, start, end, *args)
+
+        return mock.patch.object(Command, 'export_chunk', fail_late_chunks)
+
+    def read_csv(self, path):
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', newline='', encoding='utf-8') as f:
+            return list(csv.reader(f))
+
+    def test_csv_chunks_in_id_order(self):
+        """Chunks exported in parallel are assembled behind one header in id order"""
+        output = self.export('--output', 'customers.csv')
+        self.assertIn('Successfully exported 25 customers', output)
+
+        rows = self.read_csv('customers.csv')
+        self.assertEqual(rows[0], ['Name', 'Email', 'Phone', 'Source', 'Created At', 'Is Active'])
+        self.assertEqual([row[0] for row in rows[1:]], [f"Customer {i}" for i in range(25)])
+        # Parts and checkpoint are removed once the export is complete
+        self.assertEqual(os.listdir(self.directory), ['customers.csv'])
+
+    def test_gzip_json(self):
+        """Gzipped NDJSON parts concatenate into one readable stream"""
+        self.export('--output', 'customers.ndjson.gz', '--format', 'json', '--gzip')
+
+        with gzip.open('customers.ndjson.gz', 'rt', encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(len(records), 25)
+        self.assertEqual(records[3]['email'], 'customer3@example.com')
+
+    def test_default_output_is_timestamped(self):
+        """Without --output the file name carries the export time"""
+        self.export('--gzip')
+        self.assertEqual(len(glob.glob('customers_export_*.csv.gz')), 1)
+        self.assertEqual(len(self.read_csv(glob.glob('customers_export_*.csv.gz')[0])), 26)
+
+    def test_resume_without_output(self):
+        """An interrupted export started without --output resumes on the same command"""
+        with self.interrupted():
+            output = self.export('--workers', '1')
+        self.assertIn('disk full', output)
+        self.assertEqual(glob.glob('customers_export_*.csv'), [])
+
+        export_chunk = Command.export_chunk
+        with mock.patch.object(Command, 'export_chunk', autospec=True, side_effect=export_chunk) as chunk:
+            output = self.export()
+        self.assertIn('3 chunks already completed', output)
+        # Only the 4 remaining of the 7 chunks are exported again
+        self.assertEqual(chunk.call_count, 4)
+
+        exported = glob.glob('customers_export_*.csv')
+        self.assertEqual(len(exported), 1)
+        self.assertIn(f'Resuming export to {exported[0]}', output)
+        rows = self.read_csv(exported[0])
+        self.assertEqual([row[0] for row in rows[1:]], [f"Customer {i}" for i in range(25)])
+
+    def test_restart_ignores_checkpoint(self):
+        """--restart exports every chunk again"""
+        with self.interrupted():
+            self.export('--output', 'customers.csv', '--workers', '1')
+        self.assertTrue(os.path.exists('customers.csv.checkpoint.json'))
+
+        output = self.export('--output', 'customers.csv', '--restart')
+        self.assertNotIn('Resuming', output)
+        self.assertEqual(len(self.read_csv('customers.csv')), 26)
@@ -0,0 +1,148 @@
+"""
+Tests for the SQL instrumentation and request metrics middleware
+"""
+import threading
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from crm.metrics import MetricsRegistry, registry
+from crm.middleware import QueryRecorder, fingerprint, query_stats
+from customer.models import Customer
+from .test_api import create_admin
+
+class FingerprintTestCase(TestCase):
+    """Test case for query shape normalisation"""
+
+    def test_parameters_are_ignored(self):
+        """Statements differing only in literals and IN lists share a shape"""
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id = 1 AND name = 'a''b'"),
+            fingerprint("SELECT *  FROM t WHERE id = 42 AND name = 'c'"),
+        )
+        self.assertEqual(
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s)'),
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s, %s)'),
+        )
+
+    def test_repeated_shapes(self):
+        """Only shapes above the threshold are reported"""
+        recorder = QueryRecorder()
+        for i in range(6):
+            recorder(lambda *args: None, f'SELECT * FROM t WHERE id = {i}', None, False, {})
+        recorder(lambda *args: None, 'SELECT 1', None, False, {})
+
+        self.assertEqual(recorder.count, 7)
+        self.assertEqual(recorder.repeated(5), [('SELECT * FROM t WHERE id = ?', 6)])
+        self.assertEqual(recorder.repeated(6), [])
+
+class QueryInstrumentationMiddlewareTestCase(TestCase):
+    """Test case for QueryInstrumentationMiddleware"""
+
+    def setUp(self):
+        """Set up a customer and reset the process totals"""
+        self.customer = Customer.objects.create(name="Jane", email="jane@example.com")
+        self.url = reverse('customer_detail_api', args=[self.customer.id])
+        query_stats.reset()
+
+    def test_totals_per_url_name(self):
+        """Each request is added to the totals of its URL name"""
+        self.client.force_login(create_admin())
+        self.client.get(self.url)
+        self.client.get(self.url)
+
+        stats = query_stats.snapshot()['customer_detail_api']
+        self.assertEqual(stats['requests'], 2)
+        self.assertGreater(stats['queries'], 0)
+        self.assertEqual(stats['n_plus_one_requests'], 0)
+
+    def test_headers_only_for_staff(self):
+        """Anonymous responses carry no SQL headers, admin responses do"""
+        self.assertNotIn('X-SQL-Queries', self.client.get(self.url))
+
+        self.client.force_login(create_admin())
+
+        response = self.client.get(self.url)
+        self.assertGreater(int(response['X-SQL-Queries']), 0)
+        self.assertIn('X-SQL-Time-Ms', response)
+        self.assertEqual(response['X-SQL-N-Plus-One'], '0')
+
+    def test_headers_add_no_queries(self):
+        """The header count covers every query the request runs"""
+        self.client.force_login(create_admin())
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(int(response['X-SQL-Queries']), len(ctx.captured_queries))
+
+    def test_unresolved_user_gets_no_headers(self):
+        """A view that never loads the user is not checked for staff"""
+        self.client.force_login(create_admin())
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-SQL-Queries', response)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+class MetricsEndpointTestCase(TestCase):
+    """Test case for MetricsMiddleware and the /metrics endpoint"""
+
+    def setUp(self):
+        """Set up an admin and a customer and reset the counters"""
+        self.client.force_login(create_admin())
+        self.customer = Customer.objects.create(name="Jane", email="jane@example.com")
+        registry.reset()
+        query_stats.reset()
+
+    def test_requests_are_exported_per_url_name(self):
+        """Latency, size and status series are labelled with the URL name"""
+        self.client.get(reverse('customer_detail_api', args=[self.customer.id]))
+        self.client.get(reverse('customer_detail_api', args=[self.customer.id + 1]))
+
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('crm_http_request_duration_seconds_count{view="customer_detail_api"} 2', body)
+        self.assertIn('crm_http_request_duration_seconds_bucket{view="customer_detail_api",le="+Inf"} 2', body)
+        self.assertIn('crm_http_response_size_bytes_count{view="customer_detail_api"} 2', body)
+        self.assertIn('crm_http_responses_total{view="customer_detail_api",status="200"} 1', body)
+        self.assertIn('crm_http_responses_total{view="customer_detail_api",status="404"} 1', body)
+        # The scrape itself is still in flight
+        self.assertIn('crm_http_requests_in_flight 1', body)
+
+    def test_remote_clients_are_refused(self):
+        """Only local scrapers and staff can read the metrics"""
+        self.client.logout()
+        response = self.client.get(reverse('metrics'), REMOTE_ADDR='203.0.113.9')
+        self.assertEqual(response.status_code, 403)
+
+class MetricsRegistryTestCase(TestCase):
+    """Test case for the per-thread metric shards"""
+
+    def test_exited_threads_are_retired(self):
+        """Shards of finished threads fold into one total and stop piling up"""
+        metrics = MetricsRegistry()
+
+        def handle_request():
+            shard = metrics.shard()
+            shard.started += 1
+            shard.responses[('home', 200)] += 1
+            shard.finished += 1
+
+        for _ in range(50):
+            thread = threading.Thread(target=handle_request)
+            thread.start()
+            thread.join()
+        handle_request()
+
+        self.assertEqual(len(metrics._shards), 1)
+        total = metrics.collect()
+        self.assertEqual(total.started, 51)
+        self.assertEqual(total.finished, 51)
+        self.assertEqual(total.responses[('home', 200)], 51)
+
+        metrics.reset()
+        self.assertEqual(metrics.collect().started, 0)
@@ -0,0 +1,73 @@
+"""
+Tests for the per-customer order ledger
+"""
+from django.test import TestCase
+from customer.models import Customer, CustomerLedger
+from customer.ledger import get_customer_ledger, rebuild_customer_ledgers
+from product.models import Order, Product
+
+class CustomerLedgerTestCase(TestCase):
+    """Test case for ledger maintenance"""
+
+    def setUp(self):
+        """Set up a customer and two products"""
+        self.customer = Customer.objects.create(name="John Doe", email="john@example.com")
+        self.other = Customer.objects.create(name="Jane Smith", email="jane@example.com")
+        self.cheap = Product.objects.create(name="Pen", price=2.0)
+        self.dear = Product.objects.create(name="Lamp", price=30.0)
+
+    def ledger(self, customer):
+        return CustomerLedger.objects.get(customer=customer)
+
+    def test_new_orders_update_ledger(self):
+        """Creating orders increments counts and totals"""
+        Order.objects.create(customer=self.customer, product=self.cheap, status='pending')
+        last = Order.objects.create(customer=self.customer, product=self.dear, status='delivered')
+
+        ledger = self.ledger(self.customer)
+        self.assertEqual(ledger.order_count, 2)
+        self.assertEqual(ledger.lifetime_total, 32.0)
+        self.assertEqual(ledger.pending_count, 1)
+        self.assertEqual(ledger.delivered_count, 1)
+        self.assertEqual(ledger.last_order_at, last.created_at)
+
+    def test_status_change_and_delete(self):
+        """Editing and deleting orders keeps the ledger consistent"""
+        order = Order.objects.create(customer=self.customer, product=self.dear, status='pending')
+        order.status = 'Intransit'
+        order.save()
+        ledger = self.ledger(self.customer)
+        self.assertEqual((ledger.pending_count, ledger.intransit_count), (0, 1))
+
+        order.customer = self.other
+        order.save()
+        self.assertEqual(self.ledger(self.customer).order_count, 0)
+        self.assertEqual(self.ledger(self.other).lifetime_total, 30.0)
+
+        order.delete()
+        self.assertEqual(self.ledger(self.other).order_count, 0)
+        self.assertIsNone(self.ledger(self.other).last_order_at)
+
+    def test_price_change_updates_totals(self):
+        """Changing a product price is reflected in lifetime totals"""
+        Order.objects.create(customer=self.customer, product=self.cheap, status='pending')
+        self.cheap.price = 5.0
+        self.cheap.save()
+        self.assertEqual(self.ledger(self.customer).lifetime_total, 5.0)
+
+    def test_rebuild(self):
+        """Rebuilding recomputes every ledger from orders"""
+        Order.objects.create(customer=self.customer, product=self.cheap, status='pending')
+        Order.objects.create(customer=self.customer, product=self.dear, status='pending')
+        CustomerLedger.objects.all().delete()
+
+        self.assertEqual(rebuild_customer_ledgers(batch_size=1), 1)
+        ledger = self.ledger(self.customer)
+        self.assertEqual((ledger.order_count, ledger.pending_count), (2, 2))
+        self.assertEqual(ledger.lifetime_total, 32.0)
+
+    def test_customer_without_orders(self):
+        """Customers without orders read an empty ledger"""
+        ledger = get_customer_ledger(self.other)
+        self.assertEqual(ledger.order_count, 0)
+        self.assertEqual(ledger.lifetime_total, 0)
@@ -0,0 +1,75 @@
+"""
+Tests for the generate_load_data management command
+"""
+from datetime import datetime, timedelta, timezone
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import F, Sum
+from django.test import TestCase
+from customer.models import Customer, CustomerLedger, CustomerSignupRollup
+from product.models import Order, Product, Tag
+
+ANCHOR = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+class GenerateLoadDataTestCase(TestCase):
+    """Test case for the reproducible load-test data generator"""
+
+    def generate(self, *args):
+        out = StringIO()
+        call_command(
+            'generate_load_data', *args, customers=20, products=5, orders=50, tags=3,
+            days=30, seed=1, batch_size=7, stdout=out,
+        )
+        self.assertIn('Successfully generated', out.getvalue())
+
+    def test_rows_and_derived_data(self):
+        """Rows are created with ledgers and the signup rollup rebuilt"""
+        self.generate()
+
+        self.assertEqual(Customer.objects.count(), 20)
+        self.assertEqual(Product.objects.count(), 5)
+        self.assertEqual(Tag.objects.count(), 3)
+        self.assertEqual(Order.objects.count(), 50)
+        self.assertEqual(CustomerLedger.objects.aggregate(n=Sum('order_count'))['n'], 50)
+        self.assertEqual(CustomerSignupRollup.objects.aggregate(n=Sum('count'))['n'], 20)
+
+    def test_generated_timestamps_are_kept(self):
+        """Creation times fall in the requested window, orders after their customer"""
+        self.generate()
+        start = ANCHOR - timedelta(days=30)
+
+        for model in (Customer, Product, Order):
+            times = model.objects.values_list('created_at', flat=True)
+            self.assertTrue(all(start <= created_at <= ANCHOR for created_at in times), model)
+        self.assertFalse(Customer.objects.exclude(updated_at=F('created_at')).exists())
+        for order in Order.objects.select_related('customer'):
+            self.assertGreaterEqual(order.created_at, order.customer.created_at)
+
+        # The model fields are left as they were
+        self.assertTrue(Order._meta.get_field('created_at').auto_now_add)
+        self.assertTrue(Customer._meta.get_field('updated_at').auto_now)
+
+    def test_same_seed_same_data(self):
+        """Clearing and generating again reproduces the data set"""
+        self.generate()
+        first = list(Order.objects.order_by('created_at', 'status').values_list('created_at', 'status'))
+
+        self.generate('--clear')
+        second = list(Order.objects.order_by('created_at', 'status').values_list('created_at', 'status'))
+        self.assertEqual(first, second)
+        self.assertEqual(Customer.objects.count(), 20)
+
+    def test_clear_keeps_real_data(self):
+        """Only generated rows are deleted by --clear"""
+        customer = Customer.objects.create(name="John Doe", email="john@example.com")
+        product = Product.objects.create(name="Pen", price=1.5)
+        Order.objects.create(customer=customer, product=product, status='pending')
+        self.generate()
+
+        self.generate('--clear')
+        self.assertTrue(Customer.objects.filter(pk=customer.pk).exists())
+        self.assertEqual(Order.objects.filter(customer=customer).count(), 1)
+        self.assertEqual(Customer.objects.count(), 21)
+        self.assertEqual(Order.objects.count(), 51)
+
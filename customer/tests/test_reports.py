@@ -0,0 +1,76 @@
+"""
+Tests for the customer report
+"""
+import json
+from django.core.cache import cache
+from django.test import TestCase
+from customer.models import Customer
+from customer.reports import build_customer_report, update_customer_report
+
+class CustomerReportTestCase(TestCase):
+    """Test case for full and incremental customer reports"""
+
+    def setUp(self):
+        """Set up customers from two sources"""
+        cache.clear()
+        Customer.objects.create(name="John Doe", email="john@example.com", source="website")
+        Customer.objects.create(name="Jane Smith", email="jane@example.com", source="referral", is_active=False)
+        self.bob = Customer.objects.create(name="Bob Johnson", email="bob@example.com", source="website")
+
+    def stored(self, report):
+        # Reports go through a JSON file between runs
+        return json.loads(json.dumps(report))
+
+    def test_full_report_single_query(self):
+        """The full report is one grouped query"""
+        with self.assertNumQueries(1):
+            report = build_customer_report()
+
+        self.assertEqual(report['statistics'], {'total': 3, 'active': 2, 'recent': 3, 'inactive': 1})
+        self.assertEqual(report['customers_by_source'], [
+            {'source': 'website', 'count': 2},
+            {'source': 'referral', 'count': 1},
+        ])
+        self.assertEqual(report['recent_customers_7_days'], 3)
+
+    def test_incremental_adds_new_customers(self):
+        """New customers are added to the stored report, also in a later process"""
+        report = self.stored(build_customer_report())
+        Customer.objects.create(name="Alice Brown", email="alice@example.com", source="referral")
+        # Each command run starts with an empty process-local cache
+        cache.clear()
+
+        # The deletion check and the delta query
+        with self.assertNumQueries(2):
+            updated = update_customer_report(report)
+
+        self.assertEqual(updated['mode'], 'incremental')
+        full = build_customer_report()
+        self.assertEqual(updated['statistics'], full['statistics'])
+        self.assertEqual(updated['customers_by_source'], full['customers_by_source'])
+
+    def test_edits_and_deletes_rebuild(self):
+        """Changes to already reported customers force a full rebuild"""
+        report = self.stored(build_customer_report())
+        self.bob.is_active = False
+        self.bob.save()
+        updated = update_customer_report(report)
+        self.assertEqual(updated['mode'], 'full')
+        self.assertEqual(updated['statistics']['active'], 1)
+
+        report = self.stored(updated)
+        self.bob.delete()
+        cache.clear()
+        updated = update_customer_report(report)
+        self.assertEqual(updated['mode'], 'full')
+        self.assertEqual(updated['statistics']['total'], 2)
+
+    def test_deletes_without_signals_rebuild(self):
+        """Rows removed behind the ORM's back are noticed too"""
+        report = self.stored(build_customer_report())
+        deleted = Customer.objects.filter(pk=self.bob.pk)
+        deleted._raw_delete(deleted.db)
+
+        updated = update_customer_report(report)
+        self.assertEqual(updated['mode'], 'full')
+        self.assertEqual(updated['statistics']['total'], 2)
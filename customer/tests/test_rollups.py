@@ -0,0 +1,59 @@
+"""
+Tests for the daily customer signup rollup
+"""
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from customer.models import Customer, CustomerSignupRollup
+from customer.rollups import get_daily_signups, get_signups_by_source, rebuild_signup_rollups
+from customer.utils import create_customers_bulk
+
+class SignupRollupTestCase(TestCase):
+    """Test case for rollup maintenance"""
+
+    def setUp(self):
+        """Set up customers from two sources"""
+        self.john = Customer.objects.create(name="John Doe", email="john@example.com", source="website")
+        Customer.objects.create(name="Jane Smith", email="jane@example.com", source="referral")
+        Customer.objects.create(name="Bob Johnson", email="bob@example.com", source="website")
+
+    def test_drifted_row_does_not_block_deletes(self):
+        """Deleting a customer whose rollup row is already 0 still succeeds"""
+        CustomerSignupRollup.objects.update(count=0)
+        self.john.delete()
+        self.assertFalse(Customer.objects.filter(pk=self.john.pk).exists())
+        self.assertEqual(set(CustomerSignupRollup.objects.values_list('count', flat=True)), {0})
+
+    def test_signals_keep_rollup_current(self):
+        """Creating, moving and deleting customers adjusts the counts"""
+        self.assertEqual(get_signups_by_source(), [
+            {'source': 'website', 'count': 2},
+            {'source': 'referral', 'count': 1},
+        ])
+
+        self.john.source = 'referral'
+        self.john.save()
+        self.assertEqual(get_signups_by_source(), [
+            {'source': 'referral', 'count': 2},
+            {'source': 'website', 'count': 1},
+        ])
+
+        self.john.delete()
+        self.assertEqual(sum(row['count'] for row in get_daily_signups()), 2)
+
+    def test_bulk_create_counted(self):
+        """Customers inserted with bulk_create are counted too"""
+        create_customers_bulk([{'name': f'Bulk {i}', 'source': 'import'} for i in range(3)])
+        self.assertIn({'source': 'import', 'count': 3}, get_signups_by_source())
+
+    def test_rebuild_from_customers(self):
+        """The backfill recounts customers the signals never saw"""
+        old = Customer.objects.create(name="Old Customer", email="old@example.com")
+        long_ago = timezone.now() - timedelta(days=400)
+        Customer.objects.filter(pk=old.pk).update(created_at=long_ago)
+
+        rebuild_signup_rollups()
+        self.assertEqual(get_daily_signups(), [
+            {'day': long_ago.date(), 'count': 1},
+            {'day': timezone.now().date(), 'count': 3},
+        ])
@@ -0,0 +1,44 @@
+"""
+Tests for customer full-text search
+"""
+from django.test import TestCase
+from customer.models import Customer
+from customer.search import search_terms
+from customer.utils import search_customers
+
+class CustomerFullTextSearchTestCase(TestCase):
+    """Test case for the indexed customer search"""
+
+    def setUp(self):
+        """Set up test customers"""
+        self.john = Customer.objects.create(name="John Doe", email="john@example.com", phone="1234567890")
+        self.jane = Customer.objects.create(name="Jane Smith", email="jane@example.com", phone="0987654321")
+
+    def names(self, query):
+        return [customer.name for customer in search_customers(query)]
+
+    def test_prefix_match(self):
+        """Word prefixes match in any indexed field"""
+        self.assertEqual(self.names("jo"), ["John Doe"])
+        self.assertEqual(self.names("0987"), ["Jane Smith"])
+        self.assertEqual(self.names("SMI"), ["Jane Smith"])
+
+    def test_all_terms_must_match(self):
+        """Every term of the query has to match"""
+        self.assertEqual(self.names("jane example"), ["Jane Smith"])
+        self.assertEqual(self.names("jane doe"), [])
+
+    def test_index_follows_changes(self):
+        """Updates and deletes are reflected in the index"""
+        self.jane.name = "Janet Brown"
+        self.jane.save()
+        self.assertEqual(self.names("smith"), [])
+        self.assertEqual(self.names("brown"), ["Janet Brown"])
+
+        self.jane.delete()
+        self.assertEqual(self.names("brown"), [])
+
+    def test_query_without_terms(self):
+        """Punctuation-only queries match nothing"""
+        self.assertEqual(search_terms("@@ --"), [])
+        self.assertEqual(self.names("@@ --"), [])
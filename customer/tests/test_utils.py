@@ -6,6 +6,7 @@ from unittest.mock import patch, MagicMock
 from datetime import datetime, timedelta
 from django.test import TestCase
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from customer.models import Customer
 from customer.utils import (
     get_customer_statistics,
@@ -57,10 +58,16 @@ class CustomerUtilsTestCase(TestCase):
     def test_search_customers(self):
         """Test customer search function"""
         # Search by name
-        results = search_customers("John")
+        results = search_customers("John Doe")
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0].name, "John Doe")
         
+        # Terms match word prefixes, so "John" also finds "Johnson"
+        results = search_customers("John")
+        self.assertEqual(
+            sorted(customer.name for customer in results), ["Bob Johnson", "John Doe"]
+        )
+        
         # Search by email
         results = search_customers("jane@example.com")
         self.assertEqual(len(results), 1)
@@ -254,6 +261,41 @@ class CustomerAnalyticsTestCase(TestCase):
         self.assertIsInstance(analytics['source_distribution'], list)
         self.assertGreater(len(analytics['source_distribution']), 0)
 
+class CustomerStatisticsCacheTestCase(TestCase):
+    """Test case for cached customer statistics"""
+    
+    def setUp(self):
+        """Start from an empty cache"""
+        cache.clear()
+        Customer.objects.create(name="Cached", email="cached@example.com")
+    
+    @patch('crm.cache.cache_is_shared', lambda: True)
+    def test_statistics_are_cached(self):
+        """Repeated calls are served from a shared cache"""
+        get_customer_statistics()
+        with self.assertNumQueries(0):
+            stats = get_customer_statistics()
+        self.assertEqual(stats['total'], 1)
+    
+    def test_process_local_cache_is_bypassed(self):
+        """Without a shared cache, statistics are computed on every call"""
+        get_customer_statistics()
+        # A write in another worker sends no signal to this one
+        Customer.objects.filter(name="Cached").update(is_active=False)
+        self.assertEqual(get_customer_statistics()['inactive'], 1)
+    
+    @patch('crm.cache.cache_is_shared', lambda: True)
+    def test_writes_invalidate_statistics(self):
+        """Saving or deleting a customer invalidates the cached statistics"""
+        self.assertEqual(get_customer_statistics()['total'], 1)
+        
+        customer = Customer.objects.create(name="Another", email="another@example.com", is_active=False)
+        stats = get_customer_statistics()
+        self.assertEqual((stats['total'], stats['inactive']), (2, 1))
+        
+        customer.delete()
+        self.assertEqual(get_customer_statistics()['total'], 1)
+
 class CustomerExportTestCase(TestCase):
     """Test case for customer data export"""
     
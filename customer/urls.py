@@ -1,12 +1,22 @@
 from django.urls import path
-from . import views
+from . import views, api
 
 
 urlpatterns = [
   path('customer/<int:pk>/', views.customer, name='customer_detail'),
   path('customers/', views.customers, name='customers_list'),
   path('create_customer/', views.createCustomer, name='create_customer'),
+  path('customers/lookup/', views.customerLookup, name='customer_lookup'),
   # path('update_customer/<int:pk>/', views.updateCustomer, name='update_customer'),
   # path('delete_customer/<int:pk>/', views.deleteCustomer, name='delete_customer'),
 
+  path('api/customers/', api.customer_list_api, name='customer_list_api'),
+  path('api/customers/create/', api.create_customer_api, name='create_customer_api'),
+  path('api/customers/bulk/', api.bulk_create_customers_api, name='bulk_create_customers_api'),
+  path('api/customers/statistics/', api.customer_statistics_api, name='customer_statistics_api'),
+  path('api/customers/export/', api.export_customers_api, name='export_customers_api'),
+  path('api/customers/<int:customer_id>/', api.customer_detail_api, name='customer_detail_api'),
+  path('api/customers/<int:customer_id>/update/', api.update_customer_api, name='update_customer_api'),
+  path('api/customers/<int:customer_id>/delete/', api.delete_customer_api, name='delete_customer_api'),
+
 ]
\ No newline at end of file
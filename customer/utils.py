@@ -1,10 +1,17 @@
 """
 Utility functions for customer management
 """
+import csv
+import zlib
 from datetime import datetime, timedelta
-from django.db.models import Q, Count, Sum
+from django.db import transaction
+from django.utils import timezone
+from crm.cache import invalidate_stats, versioned_stat
 from .models import Customer
+from .rollups import get_monthly_signups, get_signups_by_source, record_new_customers, signup_day
+from .search import get_search_backend
 
+@versioned_stat('customer_statistics', ['customer.Customer'])
 def get_customer_statistics():
     """
     Get comprehensive customer statistics
@@ -27,50 +34,45 @@ def get_customer_statistics():
 
 def search_customers(query):
     """
-    Search customers by name, email, or phone
+    Search customers by name, email, or phone, best matches first
     """
-    return Customer.objects.filter(
-        Q(name__icontains=query) |
-        Q(email__icontains=query) |
-        Q(phone__icontains=query)
-    )
+    return get_search_backend().search(Customer.objects.all(), query)
 
 def get_customer_analytics():
     """
     Get customer analytics data
     """
-    # Monthly customer growth
-    current_month = datetime.now().month
-    current_year = datetime.now().year
-    
-    monthly_customers = Customer.objects.filter(
-        created_at__year=current_year,
-        created_at__month=current_month
-    ).count()
+    # Monthly customer growth, read from the daily signup rollup
+    month_start = signup_day(timezone.now()).replace(day=1)
+    monthly_customers = sum(
+        row['count'] for row in get_monthly_signups(start=month_start)
+    )
     
     # Customer source analysis
-    source_stats = Customer.objects.values('source').annotate(
-        count=Count('id')
-    ).order_by('-count')
+    source_stats = get_signups_by_source()
     
     return {
         'monthly_growth': monthly_customers,
-        'source_distribution': list(source_stats)
+        'source_distribution': source_stats
     }
 
-def validate_customer_data(data):
-    """
-    Validate customer data before saving
-    """
+CUSTOMER_TEXT_FIELDS = ('name', 'email', 'phone', 'source')
+
+def _type_errors(data):
+    return [
+        f'{field.capitalize()} must be a string'
+        for field in CUSTOMER_TEXT_FIELDS
+        if data.get(field) is not None and not isinstance(data[field], str)
+    ]
+
+def _customer_errors(data, email_taken):
     errors = []
     
     if not data.get('name'):
         errors.append('Name is required')
     
-    if data.get('email'):
-        # Check if email already exists
-        if Customer.objects.filter(email=data['email']).exists():
-            errors.append('Email already exists')
+    if data.get('email') and email_taken:
+        errors.append('Email already exists')
     
     if data.get('phone'):
         # Basic phone validation
@@ -79,29 +81,138 @@ def validate_customer_data(data):
     
     return errors
 
-def export_customer_data(format='csv'):
+def validate_customer_data(data):
     """
-    Export customer data in specified format
+    Validate customer data before saving
     """
-    customers = Customer.objects.all()
+    errors = _type_errors(data)
+    if errors:
+        return errors
     
-    if format == 'csv':
-        import csv
-        from io import StringIO
-        
-        output = StringIO()
-        writer = csv.writer(output)
-        writer.writerow(['Name', 'Email', 'Phone', 'Source', 'Created At'])
+    # Check if email already exists
+    email_taken = bool(data.get('email')) and Customer.objects.filter(email=data['email']).exists()
+    return _customer_errors(data, email_taken)
+
+def validate_customers_bulk(items):
+    """
+    Validate many customer records at once, returning one error list per item.
+
+    Existing emails are looked up with a single ``email__in`` query; an email
+    repeated within ``items`` is reported on every occurrence after the first.
+    """
+    emails = {
+        item['email'] for item in items
+        if isinstance(item, dict) and item.get('email') and isinstance(item['email'], str)
+    }
+    taken = set(Customer.objects.filter(email__in=emails).values_list('email', flat=True)) if emails else set()
+    
+    seen = set()
+    results = []
+    for item in items:
+        if not isinstance(item, dict):
+            results.append(['Invalid customer record'])
+            continue
         
-        for customer in customers:
-            writer.writerow([
-                customer.name,
-                customer.email,
-                customer.phone,
-                customer.source,
-                customer.created_at.strftime('%Y-%m-%d')
-            ])
+        errors = _type_errors(item)
+        if errors:
+            results.append(errors)
+            continue
         
-        return output.getvalue()
+        errors = _customer_errors(item, item.get('email') in taken)
+        email = item.get('email')
+        if email:
+            if email in seen and email not in taken:
+                errors.append('Duplicate email in request')
+            seen.add(email)
+        results.append(errors)
+    
+    return results
+
+def create_customers_bulk(items, batch_size=500):
+    """
+    Validate and insert many customers, returning one result per item.
+
+    Valid records are inserted with ``bulk_create`` in batches inside a single
+    transaction; invalid ones are reported and skipped.
+    """
+    errors = validate_customers_bulk(items)
+    
+    valid = [
+        (index, Customer(
+            name=item['name'],
+            email=item.get('email') or None,
+            phone=item.get('phone', ''),
+            source=item.get('source', 'website'),
+        ))
+        for index, (item, item_errors) in enumerate(zip(items, errors))
+        if not item_errors
+    ]
+    
+    customers = [customer for index, customer in valid]
+    with transaction.atomic():
+        Customer.objects.bulk_create(customers, batch_size=batch_size)
+        # bulk_create sends no post_save signals
+        record_new_customers(customers)
+    
+    if valid:
+        invalidate_stats('customer.Customer')
+    
+    results = [{'index': index, 'status': 'error', 'errors': item_errors} for index, item_errors in enumerate(errors)]
+    for index, customer in valid:
+        results[index] = {
+            'index': index,
+            'status': 'created',
+            'id': customer.id,
+            'created_at': customer.created_at.isoformat(),
+        }
+    
+    return results
+
+CSV_EXPORT_HEADER = ['Name', 'Email', 'Phone', 'Source', 'Created At']
+
+class _Echo:
+    """File-like object whose write() hands the line back to the caller"""
+
+    def write(self, value):
+        return value
+
+def iter_customer_csv(chunk_size=2000):
+    """
+    Yield customer CSV data in blocks of about ``chunk_size`` rows.
+
+    Rows are streamed from a server-side cursor over ``values_list``, so memory
+    use stays flat however many customers there are.
+    """
+    writer = csv.writer(_Echo())
+    rows = Customer.objects.order_by('id').values_list(
+        'name', 'email', 'phone', 'source', 'created_at'
+    )
+
+    block = [writer.writerow(CSV_EXPORT_HEADER)]
+    for name, email, phone, source, created_at in rows.iterator(chunk_size=chunk_size):
+        block.append(writer.writerow([name, email, phone, source, created_at.strftime('%Y-%m-%d')]))
+        if len(block) >= chunk_size:
+            yield ''.join(block)
+            block = []
+    if block:
+        yield ''.join(block)
+
+def gzip_stream(chunks):
+    """
+    Gzip-compress an iterable of text chunks on the fly
+    """
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+def export_customer_data(format='csv'):
+    """
+    Export customer data in specified format
+    """
+    if format == 'csv':
+        return ''.join(iter_customer_csv())
     
     return None
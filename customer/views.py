@@ -1,9 +1,11 @@
-from django.shortcuts import render, redirect
+from django.shortcuts import render, redirect, get_object_or_404
+from django.http import JsonResponse
+from django.db.models.functions import Lower
 from accounts.decorators import allowed_user
 from django.contrib.auth.decorators import login_required
 from .forms import CustomerForm
 from .models import Customer
-from product.models import Order
+from .ledger import get_customer_ledger
 
 # @login_required(login_url='login')
 # @allowed_user(allowed_roles=['admin'])
@@ -17,26 +19,20 @@ from product.models import Order
 @login_required(login_url='login')
 @allowed_user(allowed_roles=['admin'])
 def customers(request):
-  customers = Customer.objects.all()
+  customers = Customer.objects.select_related('ledger')
   return render(request, 'customer/customers.html', {'customers':customers})
 
 
 @login_required(login_url='login')
 @allowed_user(allowed_roles=['admin'])
 def customer(request, pk):
-  customers = Customer.objects.all()
-  customer_name = Customer.objects.get(id=pk)
-  order = customer_name.order_set.all()
-
-  total_order=0.0
-  orders = Order.objects.filter(customer_id=pk)
-
-  for item in orders:
-    total_order += item.product.price
+  customer_name = get_object_or_404(Customer.objects.select_related('ledger'), id=pk)
+  ledger = get_customer_ledger(customer_name)
+  order = customer_name.order_set.select_related('product').order_by('-created_at')
 
   context = {
-    'customers':customers,
-    'total_order':total_order,
+    'ledger':ledger,
+    'total_order':ledger.lifetime_total,
     'customer':customer_name,
     'orders':order,
   }
@@ -57,4 +53,17 @@ def createCustomer(request):
     'form':form,
   }
     
-  return render(request, 'customer/create_customer.html', context)
\ No newline at end of file
+  return render(request, 'customer/create_customer.html', context)
+
+
+@login_required(login_url='login')
+@allowed_user(allowed_roles=['admin'])
+def customerLookup(request):
+  # A range on lower(name) can use the functional index, unlike istartswith
+  prefix = request.GET.get('q', '').strip().lower()
+  customers = Customer.objects.alias(name_lower=Lower('name')).order_by('name_lower')
+  if prefix:
+    customers = customers.filter(name_lower__gte=prefix, name_lower__lt=prefix + '\uffff')
+
+  results = list(customers.values('id', 'name')[:10])
+  return JsonResponse({'results': results})
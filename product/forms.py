@@ -1,5 +1,13 @@
-from django.forms import ModelForm
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.forms import BaseInlineFormSet, ModelChoiceField, ModelForm, inlineformset_factory
+from django.utils.functional import cached_property
+
+from crm.cache import invalidate_stats
+from customer.ledger import refresh_customer_ledger
+from customer.models import Customer
 from .models import Order, Product
+from .utils import get_product_choices
 
 class OrderForm(ModelForm):
   class Meta:
@@ -10,4 +18,104 @@ class OrderForm(ModelForm):
 class ProductForm(ModelForm):
   class Meta:
     model = Product
-    fields = '__all__'
\ No newline at end of file
+    fields = '__all__'
+
+
+class SharedProductChoiceField(ModelChoiceField):
+  """Product select resolved from objects loaded once for the whole formset"""
+
+  products = None
+
+  def to_python(self, value):
+    if self.products is None or value in self.empty_values:
+      return super().to_python(value)
+    try:
+      product = self.products.get(int(value))
+    except (TypeError, ValueError):
+      product = None
+    if product is None:
+      raise ValidationError(
+        self.error_messages['invalid_choice'],
+        code='invalid_choice',
+        params={'value': value},
+      )
+    return product
+
+
+class OrderLineForm(ModelForm):
+  """
+  One order line.
+
+  The product is a declared field left out of Meta.fields: the field already
+  matches the id against the products loaded for the formset, so it is kept
+  out of model validation and its per-line existence query, and is set on
+  the order in clean().
+  """
+
+  product = SharedProductChoiceField(queryset=Product.objects.all())
+
+  class Meta:
+    model = Order
+    fields = ('status',)
+
+  def __init__(self, *args, **kwargs):
+    super().__init__(*args, **kwargs)
+    if self.instance.product_id is not None:
+      self.initial.setdefault('product', self.instance.product_id)
+
+  def clean(self):
+    cleaned_data = super().clean()
+    if 'product' in cleaned_data:
+      self.instance.product = cleaned_data['product']
+    return cleaned_data
+
+
+class BaseOrderLineFormSet(BaseInlineFormSet):
+  """
+  Inline order lines for one customer.
+
+  Every form shares one cached choices list for its product select, and the
+  submitted products are fetched in a single query, so the number of queries
+  does not grow with the number of lines.
+  """
+
+  @cached_property
+  def product_choices(self):
+    return [('', '---------')] + get_product_choices()
+
+  @cached_property
+  def submitted_products(self):
+    ids = set()
+    for i in range(self.total_form_count()):
+      value = self.data.get(self.add_prefix(i) + '-product')
+      if value and str(value).isdigit():
+        ids.add(int(value))
+    return Product.objects.in_bulk(ids) if ids else {}
+
+  def _construct_form(self, i, **kwargs):
+    form = super()._construct_form(i, **kwargs)
+    field = form.fields['product']
+    field.choices = self.product_choices
+    if self.is_bound:
+      field.products = self.submitted_products
+    return form
+
+  def save_new_orders(self):
+    """
+    Insert the new orders with one bulk_create and return them.
+
+    bulk_create sends no signals, so the customer's ledger and the order
+    statistics are refreshed here instead.
+    """
+    orders = self.save(commit=False)
+    with transaction.atomic():
+      Order.objects.bulk_create(orders)
+      refresh_customer_ledger(self.instance.pk)
+    invalidate_stats('product.Order')
+    return orders
+
+
+OrderLineFormSet = inlineformset_factory(
+  Customer, Order, form=OrderLineForm, formset=BaseOrderLineFormSet, extra=4,
+  fields=('status',),
+)
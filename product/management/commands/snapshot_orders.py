@@ -0,0 +1,108 @@
+"""
+Management command to write a columnar snapshot of orders for analytics
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from django.utils import timezone
+from datetime import timezone as dt_timezone
+from crm.columnar import NULL_INT, ColumnarWriter, replace_snapshot
+from crm.config import AppConfig
+from product.models import Order
+import numpy as np
+import time
+
+ORDER_COLUMNS = {
+    'id': 'int',
+    'customer_id': 'int',
+    'product_id': 'int',
+    'status': 'category',
+    'total_amount': 'float',
+    'created_at': 'datetime',
+}
+
+class Command(BaseCommand):
+    help = (
+        'Append orders created since the last run to the columnar order snapshot. '
+        'Rows are never updated in place; use --rebuild to pick up edited orders '
+        'or changed prices.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=str(AppConfig.ANALYTICS_CONFIG['ORDER_SNAPSHOT_PATH']),
+            help='Snapshot directory (default: ANALYTICS_CONFIG ORDER_SNAPSHOT_PATH)'
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Write a fresh snapshot of every order and swap it in'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=50000,
+            help='Number of orders read and committed per chunk (default: 50000)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            path = options['output']
+            chunk_size = options['chunk_size']
+            started = time.monotonic()
+
+            if options['rebuild']:
+                written = replace_snapshot(path, lambda tmp: self.append_orders(tmp, chunk_size))
+            else:
+                written = self.append_orders(path, chunk_size)
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Successfully wrote {written} orders to {path} '
+                    f'in {time.monotonic() - started:.1f}s'
+                )
+            )
+
+        except Exception as e:
+            self.stdout.write(
+                self.style.ERROR(f'Error writing order snapshot: {str(e)}')
+            )
+
+    def append_orders(self, path, chunk_size):
+        """Append orders past the snapshot's last id, committing chunk by chunk"""
+        writer = ColumnarWriter(path, ORDER_COLUMNS)
+        orders = Order.objects.filter(
+            id__gt=writer.meta.get('last_id', 0)
+        ).order_by('id').annotate(
+            total_amount=F('product__price')
+        ).values_list(*ORDER_COLUMNS)
+
+        written = 0
+        chunk = []
+        for row in orders.iterator(chunk_size=chunk_size):
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                written += self.write_chunk(writer, chunk)
+                chunk = []
+        if chunk:
+            written += self.write_chunk(writer, chunk)
+        return written
+
+    def write_chunk(self, writer, chunk):
+        ids, customer_ids, product_ids, statuses, amounts, created = zip(*chunk)
+        writer.append({
+            'id': ids,
+            'customer_id': [NULL_INT if value is None else value for value in customer_ids],
+            'product_id': [NULL_INT if value is None else value for value in product_ids],
+            'status': statuses,
+            'total_amount': np.array(amounts, dtype=np.float64),
+            'created_at': np.array(
+                [timezone.make_naive(value, dt_timezone.utc) if timezone.is_aware(value) else value for value in created],
+                dtype='datetime64[ns]',
+            ),
+        })
+        # Committing each chunk lets an interrupted run resume where it stopped
+        writer.meta['last_id'] = ids[-1]
+        writer.commit()
+        return len(chunk)
@@ -1,11 +1,47 @@
-target = 7
-
-nums = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
-i = 0
-for item in nums:
-    for second_item in nums:
-        i += 1
-        if nums.count() < i:
-            second_item = nums[i]
-            if item + second_item == 7:
-                print(f'{item}, {second_item}')
+from django.db import models
+from django.db.models.functions import Lower
+from customer.models import Customer
+
+class Tag(models.Model):
+  name = models.CharField(max_length=200, null=True)
+
+  def __str__(self):
+    return self.name
+
+class Product(models.Model):
+  name = models.CharField(max_length=70, null=True)
+  price = models.FloatField(null=True)
+  description = models.CharField(max_length=100, null=True)
+  created_at = models.DateTimeField(auto_now_add=True)
+  tags = models.ManyToManyField(Tag)
+
+  class Meta:
+    indexes = [
+      # Serves the case-insensitive prefix search of the product lookup
+      models.Index(Lower('name'), name='product_name_lower_idx'),
+    ]
+
+  def __str__(self):
+    return self.name
+
+class Order(models.Model):
+  STATUS = (
+    ('delivered', 'delivered'),
+    ('Intransit', 'Intransit'),
+    ('pending', 'pending'),
+  )
+  customer = models.ForeignKey(Customer, null=True, on_delete=models.CASCADE)
+  product = models.ForeignKey(Product, null=True, on_delete=models.CASCADE)
+  status = models.CharField(max_length=100, null=True, choices=STATUS)
+  created_at = models.DateTimeField(auto_now_add=True)
+
+  class Meta:
+    indexes = [
+      models.Index(fields=['created_at', 'id'], name='order_created_id_idx'),
+      models.Index(fields=['status', 'created_at'], name='order_status_created_idx'),
+      models.Index(fields=['customer', 'created_at'], name='order_customer_created_idx'),
+      models.Index(fields=['product', 'created_at'], name='order_product_created_idx'),
+    ]
+
+  def __str__(self):
+    return f'{self.product} for {self.customer}'
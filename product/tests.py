@@ -1,3 +1,207 @@
+"""
+Tests for order entry, the status board and the columnar order snapshot
+"""
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from customer.models import Customer, CustomerLedger
+from .forms import OrderLineFormSet
+from .models import Order, Product
+from .utils import generate_sales_report, get_status_board, open_order_snapshot
 
-# Create your tests here.
+class OrderLineFormSetTestCase(TestCase):
+    """Test case for bulk order entry"""
+
+    def setUp(self):
+        """Set up a customer and a few products"""
+        cache.clear()
+        self.customer = Customer.objects.create(name="John Doe", email="john@example.com")
+        self.products = [
+            Product.objects.create(name=f"Product {i}", price=10.0) for i in range(3)
+        ]
+
+    def post_data(self, lines):
+        data = {
+            'order_set-TOTAL_FORMS': str(lines),
+            'order_set-INITIAL_FORMS': '0',
+            'order_set-MIN_NUM_FORMS': '0',
+            'order_set-MAX_NUM_FORMS': '1000',
+        }
+        for i in range(lines):
+            data[f'order_set-{i}-product'] = str(self.products[i % 3].id)
+            data[f'order_set-{i}-status'] = 'pending'
+        return data
+
+    def submit(self, lines):
+        formset = OrderLineFormSet(
+            self.post_data(lines), instance=self.customer, queryset=Order.objects.none()
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertTrue(formset.is_valid(), formset.errors)
+            formset.save_new_orders()
+        return len(ctx.captured_queries)
+
+    def test_saves_orders_and_ledger(self):
+        """Submitted lines become orders and the ledger is refreshed"""
+        self.submit(4)
+        self.assertEqual(Order.objects.filter(customer=self.customer).count(), 4)
+        ledger = CustomerLedger.objects.get(customer=self.customer)
+        self.assertEqual(ledger.order_count, 4)
+        self.assertEqual(ledger.lifetime_total, 40.0)
+
+    def test_constant_queries(self):
+        """The query count does not depend on the number of lines"""
+        # The first submission creates the ledger row and fills the caches
+        self.submit(1)
+        self.assertEqual(self.submit(2), self.submit(8))
+
+    def test_unknown_product_rejected(self):
+        """A product id that does not exist is a validation error"""
+        data = self.post_data(1)
+        data['order_set-0-product'] = '999999'
+        formset = OrderLineFormSet(data, instance=self.customer, queryset=Order.objects.none())
+        self.assertFalse(formset.is_valid())
+        self.assertIn('product', formset.forms[0].errors)
+
+    def test_choices_shared_between_forms(self):
+        """Rendering the unbound formset queries the products only once"""
+        formset = OrderLineFormSet(instance=self.customer, queryset=Order.objects.none())
+        with CaptureQueriesContext(connection) as ctx:
+            for form in formset:
+                str(form['product'])
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(len(formset.forms[0].fields['product'].choices), 4)
+
+    def test_choices_are_live_without_shared_cache(self):
+        """A product added by another worker is offered at once"""
+        OrderLineFormSet(instance=self.customer, queryset=Order.objects.none()).forms
+        # Added elsewhere, so no signal reaches this process
+        Product.objects.bulk_create([Product(name="Product 3", price=10.0)])
+
+        formset = OrderLineFormSet(instance=self.customer, queryset=Order.objects.none())
+        self.assertEqual(len(formset.forms[0].fields['product'].choices), 5)
+
+    def test_existing_order_keeps_its_product(self):
+        """An order line bound to an existing order shows and keeps its product"""
+        order = Order.objects.create(
+            customer=self.customer, product=self.products[1], status='pending'
+        )
+        formset = OrderLineFormSet(instance=self.customer)
+        self.assertEqual(formset.forms[0]['product'].value(), self.products[1].id)
+
+        data = self.post_data(0)
+        data.update({
+            'order_set-TOTAL_FORMS': '1',
+            'order_set-INITIAL_FORMS': '1',
+            'order_set-0-id': str(order.id),
+            'order_set-0-product': str(self.products[2].id),
+            'order_set-0-status': 'delivered',
+        })
+        formset = OrderLineFormSet(data, instance=self.customer)
+        self.assertTrue(formset.is_valid(), formset.errors)
+        formset.save()
+        order.refresh_from_db()
+        self.assertEqual((order.product, order.status), (self.products[2], 'delivered'))
+
+
+class StatusBoardTestCase(TestCase):
+    """Test case for the per-lane status board"""
+
+    def setUp(self):
+        """Set up orders in every lane"""
+        cache.clear()
+        customer = Customer.objects.create(name="John Doe", email="john@example.com")
+        product = Product.objects.create(name="Widget", price=10.0)
+        for status, count in [('pending', 7), ('delivered', 3), ('Intransit', 0)]:
+            Order.objects.bulk_create([
+                Order(customer=customer, product=product, status=status) for i in range(count)
+            ])
+
+    def lane(self, board, status):
+        return next(lane for lane in board['lanes'] if lane['status'] == status)
+
+    def test_lanes_and_totals(self):
+        """Each lane holds its newest orders and its total"""
+        board = get_status_board(per_lane=5)
+        self.assertEqual(board['total_orders'], 10)
+
+        pending = self.lane(board, 'pending')
+        self.assertEqual((pending['total'], len(pending['orders']), pending['has_more']), (7, 5, True))
+        ids = [order.id for order in pending['orders']]
+        self.assertEqual(ids, sorted(ids, reverse=True))
+        self.assertFalse(self.lane(board, 'delivered')['has_more'])
+        self.assertEqual(self.lane(board, 'Intransit')['orders'], [])
+
+    def test_lane_cursor(self):
+        """A lane cursor continues that lane only"""
+        first = get_status_board(per_lane=5)
+        cursor = self.lane(first, 'pending')['next_cursor']
+        board = get_status_board({'pending': cursor}, per_lane=5)
+
+        pending = self.lane(board, 'pending')
+        seen = [order.id for order in self.lane(first, 'pending')['orders'] + pending['orders']]
+        self.assertEqual(len(set(seen)), 7)
+        self.assertFalse(pending['has_more'])
+        self.assertEqual(len(self.lane(board, 'delivered')['orders']), 3)
+
+    def test_totals_are_live_without_shared_cache(self):
+        """Another worker's status change shows up in this worker's totals"""
+        get_status_board()
+        # Changed elsewhere, so no signal reaches this process
+        Order.objects.filter(status='pending').update(status='Intransit')
+
+        board = get_status_board()
+        self.assertEqual(self.lane(board, 'pending')['total'], 0)
+        self.assertEqual(self.lane(board, 'Intransit')['total'], 7)
+
+    def test_one_grouped_count_without_shared_cache(self):
+        """The live totals add a single grouped count to the lane scans"""
+        with self.assertNumQueries(4):
+            get_status_board()
+
+    @mock.patch('crm.cache.cache_is_shared', lambda: True)
+    def test_one_query_per_lane(self):
+        """With the counts in a shared cache, the board costs one query per lane"""
+        get_status_board()
+        with self.assertNumQueries(3):
+            get_status_board()
+
+class OrderSnapshotTestCase(TestCase):
+    """Test case for the snapshot_orders command and its readers"""
+
+    def setUp(self):
+        """Set up a few priced orders and a snapshot directory"""
+        customer = Customer.objects.create(name="John Doe", email="john@example.com")
+        pen = Product.objects.create(name="Pen", price=2.0)
+        lamp = Product.objects.create(name="Lamp", price=30.0)
+        for product, status in [(pen, 'pending'), (lamp, 'delivered'), (pen, 'delivered')]:
+            Order.objects.create(customer=customer, product=product, status=status)
+        self.path = os.path.join(tempfile.mkdtemp(), 'orders')
+
+    def snapshot(self, *args):
+        call_command('snapshot_orders', '--output', self.path, *args, stdout=StringIO())
+        return open_order_snapshot(self.path)
+
+    def test_append_only_new_orders(self):
+        """A second run appends only orders created since the first"""
+        self.assertEqual(len(self.snapshot()), 3)
+        Order.objects.create(product=Product.objects.get(name="Lamp"), status='pending')
+        snapshot = self.snapshot()
+
+        self.assertEqual(len(snapshot), 4)
+        self.assertEqual(list(snapshot.column('customer_id'))[-1], -1)
+        frame = snapshot.to_frame()
+        self.assertEqual(frame['status'].value_counts().to_dict(), {'pending': 2, 'delivered': 2})
+
+    def test_sales_report_from_snapshot(self):
+        """The sales report reads totals from the mapped columns"""
+        report = generate_sales_report(snapshot=self.snapshot())
+        self.assertEqual(report['total_sales'], 34.0)
+        self.assertEqual(report['total_orders'], 3)
+        self.assertEqual(report['daily_sales'][0]['order_count'], 3)
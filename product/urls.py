@@ -4,6 +4,7 @@ from . import views
 
 urlpatterns = [
   path('products/', views.products, name='product_list'),
+  path('products/lookup/', views.productLookup, name='product_lookup'),
   path('status/', views.status, name='statuses'),
 
   path('orders/', views.totalOrders, name='total_orders'),
@@ -1,10 +1,23 @@
 """
 Utility functions for product management
 """
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone as dt_timezone
 from django.db.models import Q, Count, Sum, Avg
+from django.utils import timezone
+import numpy as np
+from crm.cache import versioned_stat
+from crm.columnar import ColumnarSnapshot
+from crm.config import AppConfig
+from crm.pagination import paginate_keyset
 from .models import Product, Order
 
+STATUS_LANES = [
+    ('delivered', 'Delivered Products'),
+    ('Intransit', 'In-transit Products'),
+    ('pending', 'Pending Products'),
+]
+
+@versioned_stat('product_statistics', ['product.Product', 'product.Order'])
 def get_product_statistics():
     """
     Get comprehensive product statistics
@@ -29,6 +42,13 @@ def get_product_statistics():
         'avg_order_value': avg_order_value
     }
 
+@versioned_stat('product_choices', ['product.Product'])
+def get_product_choices():
+    """
+    Get the (id, name) choices for product select widgets, shared by every form
+    """
+    return list(Product.objects.order_by('name', 'id').values_list('id', 'name'))
+
 def get_product_analytics():
     """
     Get detailed product analytics
@@ -143,29 +163,60 @@ def export_product_data(format='csv'):
     
     return None
 
-def generate_sales_report(start_date=None, end_date=None):
+def open_order_snapshot(path=None):
+    """
+    Open the columnar order snapshot written by the snapshot_orders command
+    """
+    return ColumnarSnapshot(str(path or AppConfig.ANALYTICS_CONFIG['ORDER_SNAPSHOT_PATH']))
+
+def _sales_report_from_snapshot(snapshot, start_date, end_date):
+    def as_utc(value):
+        if timezone.is_aware(value):
+            value = timezone.make_naive(value, dt_timezone.utc)
+        return np.datetime64(value, 'ns')
+
+    created = snapshot.column('created_at')
+    in_range = (created >= as_utc(start_date)) & (created <= as_utc(end_date))
+    amounts = np.nan_to_num(snapshot.column('total_amount')[in_range])
+    days, day_index = np.unique(created[in_range].astype('datetime64[D]'), return_inverse=True)
+
+    daily_totals = np.bincount(day_index, weights=amounts, minlength=len(days))
+    daily_counts = np.bincount(day_index, minlength=len(days))
+    daily_sales = [
+        {'day': str(day), 'daily_total': float(total), 'order_count': int(count)}
+        for day, total, count in zip(days, daily_totals, daily_counts)
+    ]
+    return float(amounts.sum()), int(in_range.sum()), daily_sales
+
+def generate_sales_report(start_date=None, end_date=None, snapshot=None):
     """
     Generate comprehensive sales report
+
+    Pass a snapshot from ``open_order_snapshot`` to compute it from the
+    memory-mapped order columns instead of querying the database
     """
     if not start_date:
         start_date = datetime.now() - timedelta(days=30)
     if not end_date:
         end_date = datetime.now()
     
-    orders = Order.objects.filter(
-        created_at__range=[start_date, end_date]
-    )
-    
-    total_sales = orders.aggregate(total=Sum('total_amount'))['total'] or 0
-    total_orders = orders.count()
-    
-    # Daily sales breakdown
-    daily_sales = orders.extra(
-        select={'day': 'date(created_at)'}
-    ).values('day').annotate(
-        daily_total=Sum('total_amount'),
-        order_count=Count('id')
-    ).order_by('day')
+    if snapshot is not None:
+        total_sales, total_orders, daily_sales = _sales_report_from_snapshot(snapshot, start_date, end_date)
+    else:
+        orders = Order.objects.filter(
+            created_at__range=[start_date, end_date]
+        )
+        
+        total_sales = orders.aggregate(total=Sum('total_amount'))['total'] or 0
+        total_orders = orders.count()
+        
+        # Daily sales breakdown
+        daily_sales = list(orders.extra(
+            select={'day': 'date(created_at)'}
+        ).values('day').annotate(
+            daily_total=Sum('total_amount'),
+            order_count=Count('id')
+        ).order_by('day'))
     
     return {
         'period': {
@@ -175,5 +226,48 @@ def generate_sales_report(start_date=None, end_date=None):
         'total_sales': total_sales,
         'total_orders': total_orders,
         'avg_order_value': total_sales / total_orders if total_orders > 0 else 0,
-        'daily_sales': list(daily_sales)
+        'daily_sales': daily_sales
+    }
+
+@versioned_stat('order_status_counts', ['product.Order'])
+def get_order_status_counts():
+    """
+    Get the number of orders of every status with one grouped query
+    """
+    return dict(Order.objects.order_by().values_list('status').annotate(count=Count('id')))
+
+def get_status_board(cursors=None, per_lane=None):
+    """
+    Load the newest orders of every status lane.
+
+    Each lane is one range scan of the (status, created_at) index reading at
+    most ``per_lane + 1`` rows, so the page cost does not grow with the number
+    of orders per status. Lane totals come from one grouped count, cached only
+    when the cache is shared by all workers and counted live otherwise.
+    ``cursors`` maps a status to a cursor from a previous board; that lane then
+    continues after the cursor. Raises ValueError for a malformed cursor.
+    """
+    cursors = cursors or {}
+    counts = get_order_status_counts()
+    orders = Order.objects.select_related('customer', 'product').only(
+        'id', 'status', 'created_at',
+        'customer__id', 'customer__name',
+        'product__id', 'product__name',
+    )
+
+    lanes = []
+    for status, title in STATUS_LANES:
+        page = paginate_keyset(orders.filter(status=status), cursor=cursors.get(status), limit=per_lane)
+        lanes.append({
+            'status': status,
+            'title': title,
+            'orders': page['items'],
+            'total': counts.get(status, 0),
+            'has_more': page['has_next'],
+            'next_cursor': page['next_cursor'],
+        })
+
+    return {
+        'total_orders': sum(counts.values()),
+        'lanes': lanes,
     }
@@ -2,8 +2,10 @@ from django.contrib.auth.decorators import login_required
 from accounts.decorators import allowed_user
 from .models import Order, Product
 from django.shortcuts import render, redirect, get_object_or_404
-from .forms import OrderForm, ProductForm
-from django.forms import inlineformset_factory
+from django.http import JsonResponse
+from django.db.models.functions import Lower
+from .forms import OrderForm, OrderLineFormSet, ProductForm
+from .utils import STATUS_LANES, get_status_board
 from customer.models import Customer
 
 
@@ -26,16 +28,25 @@ def products(request):
 @login_required(login_url='login')
 @allowed_user(allowed_roles=['admin'])
 def status(request):
-  orders = Order.objects.all().count()
-  intransit_orders = Order.objects.filter(status='Intransit')
-  pending_orders = Order.objects.filter(status='pending')
-  delivered_orders = Order.objects.filter(status='delivered')
+  cursors = {
+    lane: request.GET[lane + '_cursor']
+    for lane, title in STATUS_LANES
+    if request.GET.get(lane + '_cursor')
+  }
+  try:
+    board = get_status_board(cursors)
+  except ValueError:
+    board = get_status_board()
+
+  for lane in board['lanes']:
+    if lane['has_more']:
+      params = request.GET.copy()
+      params[lane['status'] + '_cursor'] = lane['next_cursor']
+      lane['more_url'] = '?' + params.urlencode()
 
   context = {
-    'orders':orders,
-    'intransit_orders':intransit_orders,
-    'pending_orders':pending_orders,
-    'delivered_orders':delivered_orders,
+    'orders':board['total_orders'],
+    'lanes':board['lanes'],
   }
 
   return render(request, 'product/status.html', context)
@@ -44,17 +55,16 @@ def status(request):
 @login_required(login_url='login')
 @allowed_user(allowed_roles=['admin'])
 def createOrder(request, pk):
-  OrderFormSet = inlineformset_factory(Customer, Order, extra=4, fields=('product', 'status'))
   customer = get_object_or_404(Customer, id=pk)
   
   if request.method == 'POST':
-    formset = OrderFormSet(request.POST, instance=customer, queryset=Order.objects.none())
+    formset = OrderLineFormSet(request.POST, instance=customer, queryset=Order.objects.none())
 
     if formset.is_valid():
-      formset.save()
+      formset.save_new_orders()
       return redirect('/')
   else:
-    formset = OrderFormSet(
+    formset = OrderLineFormSet(
       queryset=Order.objects.none(), 
       instance=customer,
     )
@@ -122,4 +132,17 @@ def createProduct(request):
       return redirect('product_list')
 
   context = {'form':form}
-  return render(request, 'product/create_product.html', context)
\ No newline at end of file
+  return render(request, 'product/create_product.html', context)
+
+
+@login_required(login_url='login')
+@allowed_user(allowed_roles=['admin'])
+def productLookup(request):
+  # A range on lower(name) can use the functional index, unlike istartswith
+  prefix = request.GET.get('q', '').strip().lower()
+  products = Product.objects.alias(name_lower=Lower('name')).order_by('name_lower')
+  if prefix:
+    products = products.filter(name_lower__gte=prefix, name_lower__lt=prefix + '\uffff')
+
+  results = list(products.values('id', 'name')[:10])
+  return JsonResponse({'results': results})
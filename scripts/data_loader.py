@@ -0,0 +1,293 @@
+"""
+Chunked loaders that build typed DataFrames straight from the database
+"""
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 50000
+
+# Largest rounding error float32 may introduce before a column stays float64
+FLOAT32_TOLERANCE = 0.005
+
+CUSTOMER_SCHEMA = {
+    'id': 'int',
+    'name': 'string',
+    'email': 'string',
+    'phone': 'string',
+    'source': 'category',
+    'is_active': 'bool',
+    'created_at': 'datetime',
+}
+
+PRODUCT_SCHEMA = {
+    'id': 'int',
+    'name': 'string',
+    'price': 'money',
+    'description': 'string',
+    'created_at': 'datetime',
+}
+
+ORDER_SCHEMA = {
+    'id': 'int',
+    'customer_id': 'int',
+    'product_id': 'int',
+    'status': 'category',
+    'total_amount': 'money',
+    'created_at': 'datetime',
+}
+
+
+class _CategoryColumn:
+    """Categorical column built from integer codes and a growing dictionary"""
+
+    def __init__(self):
+        self.codes: List[np.ndarray] = []
+        self.lookup: Dict[Any, int] = {}
+
+    def append(self, values: Sequence) -> None:
+        lookup = self.lookup
+        codes = np.fromiter(
+            (-1 if value is None else lookup.setdefault(value, len(lookup)) for value in values),
+            dtype=np.int32,
+            count=len(values),
+        )
+        self.codes.append(codes)
+
+    def finish(self) -> pd.Categorical:
+        codes = np.concatenate(self.codes) if self.codes else np.empty(0, dtype=np.int32)
+        return pd.Categorical.from_codes(codes, categories=list(self.lookup))
+
+
+class _FloatColumn:
+    """Float column kept as float32 for as long as that loses nothing that matters"""
+
+    def __init__(self, narrow: bool = True):
+        self.chunks: List[np.ndarray] = []
+        self.narrow = narrow
+
+    def append(self, values: Sequence) -> None:
+        chunk = np.fromiter(
+            (np.nan if value is None else value for value in values),
+            dtype=np.float64,
+            count=len(values),
+        )
+        if self.narrow:
+            narrowed = chunk.astype(np.float32)
+            error = np.abs(narrowed.astype(np.float64) - chunk)
+            if np.nanmax(error, initial=0) <= FLOAT32_TOLERANCE:
+                self.chunks.append(narrowed)
+                return
+            self.narrow = False
+            self.chunks = [previous.astype(np.float64) for previous in self.chunks]
+        self.chunks.append(chunk)
+
+    def finish(self) -> np.ndarray:
+        dtype = np.float32 if self.narrow else np.float64
+        return np.concatenate(self.chunks) if self.chunks else np.empty(0, dtype=dtype)
+
+
+class _IntColumn:
+    """Integer column, nullable only if a NULL was actually seen"""
+
+    def __init__(self):
+        self.chunks: List[np.ndarray] = []
+        self.masks: List[np.ndarray] = []
+
+    def append(self, values: Sequence) -> None:
+        mask = np.fromiter((value is None for value in values), dtype=bool, count=len(values))
+        self.chunks.append(np.fromiter(
+            (0 if value is None else value for value in values),
+            dtype=np.int64,
+            count=len(values),
+        ))
+        self.masks.append(mask)
+
+    def finish(self):
+        values = np.concatenate(self.chunks) if self.chunks else np.empty(0, dtype=np.int64)
+        mask = np.concatenate(self.masks) if self.masks else np.empty(0, dtype=bool)
+        if mask.any():
+            return pd.arrays.IntegerArray(values, mask)
+        return values
+
+
+class _DatetimeColumn:
+    """Timezone-naive UTC datetime64 column"""
+
+    def __init__(self):
+        self.chunks: List[np.ndarray] = []
+
+    def append(self, values: Sequence) -> None:
+        # Aware datetimes from the ORM and naive text from a raw cursor both end up in UTC
+        parsed = pd.to_datetime(pd.Series(values, dtype=object), utc=True, format='mixed')
+        self.chunks.append(parsed.dt.tz_localize(None).to_numpy(dtype='datetime64[ns]'))
+
+    def finish(self) -> np.ndarray:
+        return np.concatenate(self.chunks) if self.chunks else np.empty(0, dtype='datetime64[ns]')
+
+
+class _ObjectColumn:
+    """Column of arbitrary values, with ``string`` and ``bool`` conversions"""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.chunks: List[np.ndarray] = []
+
+    def append(self, values: Sequence) -> None:
+        if self.kind == 'bool' and None not in values:
+            self.chunks.append(np.fromiter((bool(value) for value in values), dtype=bool, count=len(values)))
+        else:
+            chunk = np.empty(len(values), dtype=object)
+            chunk[:] = values
+            self.chunks.append(chunk)
+
+    def finish(self):
+        if not self.chunks:
+            return np.empty(0, dtype=object)
+        values = np.concatenate(self.chunks)
+        if self.kind == 'string':
+            return pd.array(values, dtype='string')
+        return values
+
+
+class _MoneyColumn(_FloatColumn):
+    """Float64 column: totals of float32 amounts drift by whole units over many rows"""
+
+    def __init__(self):
+        super().__init__(narrow=False)
+
+
+COLUMN_TYPES = {
+    'category': _CategoryColumn,
+    'float': _FloatColumn,
+    'money': _MoneyColumn,
+    'int': _IntColumn,
+    'datetime': _DatetimeColumn,
+}
+
+
+def _column(kind: Optional[str]):
+    column_type = COLUMN_TYPES.get(kind)
+    return column_type() if column_type else _ObjectColumn(kind or 'object')
+
+
+def read_frame(
+    chunks: Iterable[Sequence[Tuple]],
+    columns: Sequence[str],
+    schema: Optional[Dict[str, str]] = None,
+) -> pd.DataFrame:
+    """
+    Build a typed DataFrame from chunks of row tuples.
+
+    ``schema`` maps column names to ``category``, ``float``, ``money``,
+    ``int``, ``datetime``, ``bool`` or ``string``; other columns are kept as
+    objects. ``float`` columns may be narrowed to float32, ``money`` columns
+    never are.
+    Each chunk is converted to compact arrays as soon as it arrives, so the
+    Python row objects of only one chunk are alive at a time.
+    """
+    schema = schema or {}
+    builders = [_column(schema.get(name)) for name in columns]
+    rows_read = 0
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        for builder, values in zip(builders, zip(*chunk)):
+            builder.append(values)
+        rows_read += len(chunk)
+        logger.debug(f"Loaded {rows_read} rows")
+
+    return pd.DataFrame({name: builder.finish() for name, builder in zip(columns, builders)})
+
+
+def _batched(rows: Iterable[Tuple], size: int) -> Iterator[List[Tuple]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def frame_from_queryset(
+    queryset,
+    columns: Sequence[str],
+    schema: Optional[Dict[str, str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> pd.DataFrame:
+    """
+    Load ``columns`` of a Django queryset into a typed DataFrame, streaming
+    rows from the database in chunks
+    """
+    rows = queryset.values_list(*columns).iterator(chunk_size=chunk_size)
+    return read_frame(_batched(rows, chunk_size), columns, schema)
+
+
+def frame_from_cursor(
+    cursor,
+    sql: str,
+    params: Sequence = (),
+    schema: Optional[Dict[str, str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> pd.DataFrame:
+    """
+    Load the result of a SQL query on a DB-API cursor (e.g. ``sqlite3``) into
+    a typed DataFrame, fetching ``chunk_size`` rows at a time
+    """
+    cursor.execute(sql, params)
+    columns = [description[0] for description in cursor.description]
+    chunks = iter(lambda: cursor.fetchmany(chunk_size), [])
+    return read_frame(chunks, columns, schema)
+
+
+def load_customers_frame(chunk_size: int = DEFAULT_CHUNK_SIZE) -> pd.DataFrame:
+    """
+    Load every customer through the ORM; Django must be set up
+    """
+    from customer.models import Customer
+
+    return frame_from_queryset(
+        Customer.objects.order_by('id'), list(CUSTOMER_SCHEMA), CUSTOMER_SCHEMA, chunk_size
+    )
+
+
+def load_products_frame(chunk_size: int = DEFAULT_CHUNK_SIZE) -> pd.DataFrame:
+    """
+    Load every product through the ORM; Django must be set up
+    """
+    from product.models import Product
+
+    return frame_from_queryset(
+        Product.objects.order_by('id'), list(PRODUCT_SCHEMA), PRODUCT_SCHEMA, chunk_size
+    )
+
+
+def load_orders_frame(chunk_size: int = DEFAULT_CHUNK_SIZE) -> pd.DataFrame:
+    """
+    Load every order, priced from its product, through the ORM; Django must be set up
+    """
+    from django.db.models import F
+    from product.models import Order
+
+    orders = Order.objects.order_by('id').annotate(total_amount=F('product__price'))
+    return frame_from_queryset(orders, list(ORDER_SCHEMA), ORDER_SCHEMA, chunk_size)
+
+
+def load_orders_snapshot(path: str) -> pd.DataFrame:
+    """
+    Load the columnar order snapshot written by the snapshot_orders command.
+
+    Columns are memory-mapped rather than read, so several worker processes
+    share one copy of the data and nothing touches the database; missing
+    customer and product ids are -1.
+    """
+    from crm.columnar import ColumnarSnapshot
+
+    return ColumnarSnapshot(path).to_frame(list(ORDER_SCHEMA))
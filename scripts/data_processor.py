@@ -5,13 +5,35 @@ import csv
 import json
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
 import logging
+from forecasting import daily_matrix, forecast_matrix
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Either plain records or a frame from data_loader, whose typed columns
+# (categoricals, narrowed floats) take a fraction of the memory
+Records = Union[List[Dict], pd.DataFrame]
+
+# Amount columns are always summed in float64, even from a frame a caller narrowed
+MONEY_COLUMNS = ('price', 'total_amount')
+
+def _to_frame(data: Records) -> pd.DataFrame:
+    """
+    Get a DataFrame the caller's data can be safely modified through
+    """
+    if isinstance(data, pd.DataFrame):
+        # Shallow copy: added or replaced columns never reach the caller's frame
+        df = data.copy(deep=False)
+    else:
+        df = pd.DataFrame(data)
+    for column in MONEY_COLUMNS:
+        if column in df.columns and df[column].dtype == 'float32':
+            df[column] = df[column].astype('float64')
+    return df
+
 class DataProcessor:
     """Main data processing class"""
     
@@ -19,12 +41,12 @@ class DataProcessor:
         self.processed_data = {}
         self.statistics = {}
     
-    def process_customer_data(self, data: List[Dict]) -> Dict[str, Any]:
+    def process_customer_data(self, data: Records) -> Dict[str, Any]:
         """
         Process customer data and generate insights
         """
         try:
-            df = pd.DataFrame(data)
+            df = _to_frame(data)
             
             # Basic statistics
             total_customers = len(df)
@@ -66,17 +88,17 @@ class DataProcessor:
             logger.error(f"Error processing customer data: {str(e)}")
             return {}
     
-    def process_product_data(self, data: List[Dict]) -> Dict[str, Any]:
+    def process_product_data(self, data: Records) -> Dict[str, Any]:
         """
         Process product data and generate insights
         """
         try:
-            df = pd.DataFrame(data)
+            df = _to_frame(data)
             
             # Basic statistics
             total_products = len(df)
-            total_value = df['price'].sum() if 'price' in df.columns else 0
-            avg_price = df['price'].mean() if 'price' in df.columns else 0
+            total_value = float(df['price'].sum()) if 'price' in df.columns else 0
+            avg_price = float(df['price'].mean()) if 'price' in df.columns else 0
             
             # Stock analysis
             if 'quantity' in df.columns:
@@ -115,17 +137,17 @@ class DataProcessor:
             logger.error(f"Error processing product data: {str(e)}")
             return {}
     
-    def process_order_data(self, data: List[Dict]) -> Dict[str, Any]:
+    def process_order_data(self, data: Records) -> Dict[str, Any]:
         """
         Process order data and generate insights
         """
         try:
-            df = pd.DataFrame(data)
+            df = _to_frame(data)
             
             # Basic statistics
             total_orders = len(df)
-            total_revenue = df['total_amount'].sum() if 'total_amount' in df.columns else 0
-            avg_order_value = df['total_amount'].mean() if 'total_amount' in df.columns else 0
+            total_revenue = float(df['total_amount'].sum()) if 'total_amount' in df.columns else 0
+            avg_order_value = float(df['total_amount'].mean()) if 'total_amount' in df.columns else 0
             
             # Date analysis
             if 'created_at' in df.columns:
@@ -206,16 +228,16 @@ class DataProcessor:
             logger.error(f"Error generating report: {str(e)}")
             return {}
     
-    def export_to_csv(self, data: List[Dict], filename: str) -> bool:
+    def export_to_csv(self, data: Records, filename: str) -> bool:
         """
         Export data to CSV file
         """
         try:
-            if not data:
+            if len(data) == 0:
                 logger.warning("No data to export")
                 return False
             
-            df = pd.DataFrame(data)
+            df = _to_frame(data)
             df.to_csv(filename, index=False)
             logger.info(f"Data exported to {filename}")
             return True
@@ -257,31 +279,44 @@ class DataAnalyzer:
     def __init__(self):
         self.analysis_results = {}
     
-    def analyze_customer_trends(self, customer_data: List[Dict]) -> Dict[str, Any]:
+    def analyze_customer_trends(self, customer_data: Records, horizon: int = 30) -> Dict[str, Any]:
         """
         Analyze customer trends and patterns
+
+        Accepts one record per customer with ``created_at``, or rows of the
+        daily signup rollup with ``day`` and ``count`` (see
+        ``customer.rollups.get_daily_signups``), which stay small for long histories
         """
         try:
-            df = pd.DataFrame(customer_data)
+            df = _to_frame(customer_data)
             
-            if 'created_at' in df.columns:
+            if 'day' in df.columns and 'count' in df.columns:
+                daily_signups = df.groupby(pd.to_datetime(df['day']).dt.date)['count'].sum()
+            elif 'created_at' in df.columns:
                 df['created_at'] = pd.to_datetime(df['created_at'])
                 
                 # Growth trends
                 df['date'] = df['created_at'].dt.date
                 daily_signups = df.groupby('date').size()
-                
+            else:
+                daily_signups = None
+            
+            if daily_signups is not None:
                 # Calculate growth rate
                 growth_rate = daily_signups.pct_change().mean()
                 
-                # Predict future growth
                 trend = daily_signups.rolling(window=7).mean()
                 
+                # Predict future growth from the gap-free daily series
+                series = daily_signups.set_axis(pd.to_datetime(daily_signups.index)).asfreq('D', fill_value=0)
+                forecast = forecast_matrix(series.to_frame('all').T, horizon=horizon)
+                
                 analysis = {
-                    'total_customers': len(df),
+                    'total_customers': int(daily_signups.sum()),
                     'growth_rate': growth_rate,
                     'daily_signups_avg': daily_signups.mean(),
                     'trend_data': trend.to_dict(),
+                    'forecast': forecast.drop(columns='key').to_dict('records'),
                     'peak_signup_day': daily_signups.idxmax().strftime('%Y-%m-%d'),
                     'analysis_timestamp': datetime.now().isoformat()
                 }
@@ -293,18 +328,21 @@ class DataAnalyzer:
             logger.error(f"Error analyzing customer trends: {str(e)}")
             return {}
     
-    def analyze_sales_patterns(self, order_data: List[Dict]) -> Dict[str, Any]:
+    def analyze_sales_patterns(self, order_data: Records, horizon: int = 30) -> Dict[str, Any]:
         """
         Analyze sales patterns and seasonality
         """
         try:
-            df = pd.DataFrame(order_data)
+            df = _to_frame(order_data)
             
             if 'created_at' in df.columns and 'total_amount' in df.columns:
                 df['created_at'] = pd.to_datetime(df['created_at'])
                 
-                # Daily sales patterns
-                daily_sales = df.groupby(df['created_at'].dt.date)['total_amount'].sum()
+                # Daily sales patterns, keyed by datetime64 days rather than Python dates
+                daily_sales = df.groupby(df['created_at'].dt.normalize())['total_amount'].sum()
+                forecast = forecast_matrix(
+                    daily_matrix(df, value_column='total_amount'), horizon=horizon
+                )
                 
                 # Weekly patterns
                 df['day_of_week'] = df['created_at'].dt.day_name()
@@ -319,12 +357,13 @@ class DataAnalyzer:
                 peak_sales_amount = daily_sales.max()
                 
                 analysis = {
-                    'total_revenue': df['total_amount'].sum(),
-                    'avg_daily_sales': daily_sales.mean(),
+                    'total_revenue': float(df['total_amount'].sum()),
+                    'avg_daily_sales': float(daily_sales.mean()),
                     'peak_sales_day': peak_sales_day.strftime('%Y-%m-%d'),
-                    'peak_sales_amount': peak_sales_amount,
+                    'peak_sales_amount': float(peak_sales_amount),
                     'weekly_pattern': weekly_pattern.to_dict(),
                     'monthly_pattern': monthly_pattern.to_dict(),
+                    'forecast': forecast.drop(columns='key').to_dict('records'),
                     'analysis_timestamp': datetime.now().isoformat()
                 }
                 
@@ -334,6 +373,33 @@ class DataAnalyzer:
         except Exception as e:
             logger.error(f"Error analyzing sales patterns: {str(e)}")
             return {}
+    
+    def forecast_series(
+        self,
+        data: Records,
+        key_column: str,
+        value_column: Optional[str] = None,
+        time_column: str = 'created_at',
+        horizon: int = 30,
+    ) -> pd.DataFrame:
+        """
+        Forecast one daily series per value of ``key_column`` (e.g. per
+        product or per source) in a single batched pass
+
+        Sums ``value_column`` per day, or counts records without one. Returns
+        one row per key and future day with ``forecast``, ``lower`` and ``upper``.
+        """
+        try:
+            df = _to_frame(data)
+            matrix = daily_matrix(df, time_column, key_column, value_column)
+            forecast = forecast_matrix(matrix, horizon=horizon)
+            
+            self.analysis_results[f'forecast_by_{key_column}'] = forecast
+            return forecast
+            
+        except Exception as e:
+            logger.error(f"Error forecasting series: {str(e)}")
+            return pd.DataFrame()
 
 def main():
     """Main function for data processing"""